@@ -0,0 +1,123 @@
+"""
+Benchmark de `src.descarga` contra el servidor local
+`benchmarks.servidor_feed`.
+
+Uso:
+    python -m benchmarks.bench_descarga [--archivos 120]
+        [--entries 100] [--latencia 0.05] [--kbps 2000]
+        [--fallos 0.0] [--concurrencia 1 8]
+
+Genera un feed sintético (por defecto, un mes de páginas cada 6
+horas), lo sirve con latencia y ancho de banda limitados y lo
+descarga una vez con cada concurrencia indicada. Comprueba que cada
+descarga trae todas las páginas con el mismo contenido que sirve el
+servidor y que una segunda ejecución no descarga nada (304 en la
+página principal).
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.servidor_feed import RUTA, servir
+
+
+def _comprobar(servidor_feed, destino: Path, archivos: int) -> None:
+    descargadas = sorted(destino.glob("*/*.atom"))
+    if len(descargadas) != archivos:
+        raise AssertionError(
+            f"{len(descargadas)} páginas descargadas de {archivos}"
+        )
+
+    for path in descargadas:
+        servida = servidor_feed.pagina(f"{RUTA}{path.name}")
+        (original,) = servidor_feed.directorio.glob(f"*/{path.name}")
+        if (
+            path.parent.name != original.parent.name
+            or servida.contenido != path.read_bytes()
+        ):
+            raise AssertionError(f"{path.name} no coincide con el servidor")
+
+
+def ejecutar(args: argparse.Namespace, trabajo: Path) -> dict:
+    from benchmarks.feed_sintetico import generar_feeds
+    from src.descarga import cosechar
+
+    origen = trabajo / "origen"
+    resumen = generar_feeds(
+        origen, entries_por_archivo=args.entries, archivos=args.archivos
+    )
+    print(f"Feed sintético: {resumen.archivos} páginas, "
+          f"{resumen.bytes / 2**20:.1f} MB")
+
+    tiempos = {}
+    with servir(
+        origen,
+        latencia=args.latencia,
+        kbps=args.kbps,
+        fallos=args.fallos
+    ) as servidor_feed:
+        for concurrencia in args.concurrencia:
+            destino = trabajo / f"destino_{concurrencia}"
+            estado = trabajo / f"estado_{concurrencia}.json"
+
+            print(f"\nConcurrencia {concurrencia}:")
+            inicio = time.perf_counter()
+            asyncio.run(cosechar(
+                url=servidor_feed.url_feed,
+                destino=destino,
+                concurrencia=concurrencia,
+                espera_base=0.05,
+                estado_path=estado
+            ))
+            tiempos[concurrencia] = time.perf_counter() - inicio
+            _comprobar(servidor_feed, destino, args.archivos)
+
+            # Sin cambios en el servidor: solo la página principal (304)
+            repetidas = asyncio.run(cosechar(
+                url=servidor_feed.url_feed,
+                destino=destino,
+                concurrencia=concurrencia,
+                espera_base=0.05,
+                estado_path=estado
+            ))
+            if any(pagina.estado == "descargada" for pagina in repetidas):
+                raise AssertionError("la segunda descarga no es vacía")
+
+    base = tiempos[args.concurrencia[0]]
+    print("\nConcurrencia   tiempo   aceleración")
+    for concurrencia, segundos in tiempos.items():
+        print(f"  {concurrencia:>10} {segundos:8.2f}s {base / segundos:8.1f}x")
+
+    return tiempos
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark de la descarga del feed"
+    )
+    parser.add_argument("--archivos", type=int, default=120,
+                        help="páginas del feed (120 = un mes)")
+    parser.add_argument("--entries", type=int, default=100,
+                        help="entries por página")
+    parser.add_argument("--latencia", type=float, default=0.05,
+                        help="segundos antes de cada respuesta")
+    parser.add_argument("--kbps", type=float, default=2000,
+                        help="ancho de banda por conexión")
+    parser.add_argument("--fallos", type=float, default=0.0,
+                        help="fracción de respuestas 503")
+    parser.add_argument("--concurrencia", type=int, nargs="+",
+                        default=[1, 8])
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="bench_descarga_") as tmp:
+        ejecutar(args, Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Benchmark del parseo de entries: plan de extracción precompilado con
+construcción columnar frente a la implementación original basada en
+llamadas `find` por campo y un diccionario por entry.
+
+Uso:
+    python -m benchmarks.bench_parse_entry [ruta.atom] [--repeticiones N]
+
+Mide entries/segundo de ambas implementaciones sobre los mismos
+elementos <entry> (ya cargados en memoria, sin contar la lectura del
+XML) y comprueba que producen los mismos valores.
+"""
+
+import argparse
+import re
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+
+from src.atom_parser import get_text, parse_entries, safe_float
+from src.config import (
+    RAW_DATA_DIR,
+    XML_NAMESPACES,
+    ZONA_HORARIA,
+    MAPA_TIPO_CONTRATO,
+    MAPA_TIPO_ORGANO,
+    MAPA_ACTIVIDAD_ORGANO,
+)
+from src.transform.tipos import a_booleanos, a_enteros
+
+
+FEED_POR_DEFECTO = (
+    RAW_DATA_DIR / "2020" / "contratosMenoresPerfilesContratantes.atom"
+)
+
+
+# ======================================================
+# IMPLEMENTACIÓN DE REFERENCIA
+# ======================================================
+
+def parse_entry_find(entry):
+    """
+    Implementación original basada en `find`/`get_text` por campo.
+    Se conserva solo como referencia para el benchmark.
+    """
+    data = defaultdict(lambda: None)
+
+    try:
+        # ----------------------------------------------
+        # Identificadores básicos del entry
+        # ----------------------------------------------
+        data["id_entry"] = get_text(entry, "atom:id")
+        data["titulo"] = get_text(entry, "atom:title")
+        data["fecha_actualizacion"] = pd.to_datetime(
+            get_text(entry, "atom:updated"),
+            errors="coerce"
+        )
+
+        # ----------------------------------------------
+        # Información embebida en <atom:summary>
+        # ----------------------------------------------
+        summary_text = get_text(entry, "atom:summary") or ""
+
+        id_match = re.search(
+            r"(?i)Id\s*licitaci[oó]n:\s*([^;]+)",
+            summary_text
+        )
+        organo_match = re.search(
+            r"(?i)[ÓO]rgano\s*de\s*Contrataci[oó]n:\s*([^;]+)",
+            summary_text
+        )
+        importe_match = re.search(
+            r"(?i)Importe:\s*([-\d\.,\s€]+)",
+            summary_text
+        )
+        estado_match = re.search(
+            r"(?i)Estado:\s*([^;]+)",
+            summary_text
+        )
+
+        data["id_licitacion"] = (
+            id_match.group(1).strip() if id_match else None
+        )
+        data["organo_contratacion_resumen"] = (
+            organo_match.group(1).strip() if organo_match else None
+        )
+        data["importe_resumen"] = (
+            safe_float(importe_match.group(1)) if importe_match else None
+        )
+        data["estado_resumen"] = (
+            estado_match.group(1).strip() if estado_match else None
+        )
+
+        # ----------------------------------------------
+        # ContractFolderStatus
+        # ----------------------------------------------
+        cfs = entry.find(
+            "cac_place_ext:ContractFolderStatus",
+            XML_NAMESPACES
+        )
+
+        if cfs is not None:
+            data["id_expediente"] = get_text(
+                cfs, "cbc:ContractFolderID"
+            )
+            data["estado"] = get_text(
+                cfs, "cbc_place_ext:ContractFolderStatusCode"
+            )
+
+            # ------------------------------------------
+            # Órgano de contratación
+            # ------------------------------------------
+            lcp = cfs.find(
+                "cac_place_ext:LocatedContractingParty",
+                XML_NAMESPACES
+            )
+
+            if lcp is not None:
+                tipo_codigo = get_text(
+                    lcp, "cbc:ContractingPartyTypeCode"
+                )
+                data["tipo_organo_codigo"] = tipo_codigo
+                data["tipo_organo_nombre"] = (
+                    MAPA_TIPO_ORGANO.get(tipo_codigo)
+                )
+
+                actividad_codigo = get_text(
+                    lcp, "cbc:ActivityCode"
+                )
+                data["actividad_organo_codigo"] = actividad_codigo
+                data["actividad_organo_nombre"] = (
+                    MAPA_ACTIVIDAD_ORGANO.get(actividad_codigo)
+                )
+
+                party = lcp.find("cac:Party", XML_NAMESPACES)
+
+                if party is not None:
+                    for pid in party.findall(
+                        "cac:PartyIdentification",
+                        XML_NAMESPACES
+                    ):
+                        id_elem = pid.find("cbc:ID", XML_NAMESPACES)
+                        if id_elem is not None:
+                            scheme = (
+                                id_elem.get("schemeName")
+                                or id_elem.get("schemeID")
+                            )
+                            value = (
+                                id_elem.text.strip()
+                                if id_elem.text else None
+                            )
+
+                            if scheme == "DIR3":
+                                data["id_dir3"] = value
+                            elif scheme == "NIF":
+                                data["nif_organo"] = value
+                            elif scheme == "ID_PLATAFORMA":
+                                data["id_plataforma"] = value
+
+                    data["nombre_organo"] = get_text(
+                        party, "cac:PartyName/cbc:Name"
+                    )
+                    data["codigo_postal_organo"] = get_text(
+                        party, "cac:PostalAddress/cbc:PostalZone"
+                    )
+                    data["localidad_organo"] = get_text(
+                        party, "cac:PostalAddress/cbc:CityName"
+                    )
+                    data["pais_organo"] = get_text(
+                        party, "cac:PostalAddress/cac:Country/cbc:Name"
+                    )
+                    data["email_organo"] = get_text(
+                        party, "cac:Contact/cbc:ElectronicMail"
+                    )
+                    data["telefono_organo"] = get_text(
+                        party, "cac:Contact/cbc:Telephone"
+                    )
+
+            # ------------------------------------------
+            # Proyecto de contratación
+            # ------------------------------------------
+            pp = cfs.find(
+                "cac:ProcurementProject",
+                XML_NAMESPACES
+            )
+
+            if pp is not None:
+                data["objeto_contrato"] = get_text(pp, "cbc:Name")
+
+                tipo_code = get_text(pp, "cbc:TypeCode")
+                data["codigo_tipo_contrato"] = tipo_code
+                data["nombre_tipo_contrato"] = (
+                    MAPA_TIPO_CONTRATO.get(tipo_code)
+                )
+
+                data["codigo_subtipo_contrato"] = get_text(
+                    pp, "cbc:SubTypeCode"
+                )
+
+                ba = pp.find(
+                    "cac:BudgetAmount",
+                    XML_NAMESPACES
+                )
+                if ba is not None:
+                    data["importe_estimado"] = safe_float(
+                        get_text(
+                            ba,
+                            "cbc:EstimatedOverallContractAmount"
+                        )
+                    )
+                    data["importe_total"] = safe_float(
+                        get_text(ba, "cbc:TotalAmount")
+                    )
+                    data["importe_sin_impuestos"] = safe_float(
+                        get_text(
+                            ba,
+                            "cbc:TaxExclusiveAmount"
+                        )
+                    )
+
+                data["codigo_cpv_principal"] = get_text(
+                    pp,
+                    "cac:RequiredCommodityClassification/"
+                    "cbc:ItemClassificationCode"
+                )
+                data["codigo_region_nuts"] = get_text(
+                    pp,
+                    "cac:RealizedLocation/"
+                    "cbc:CountrySubentityCode"
+                )
+
+                duracion = pp.find(
+                    "cac:PlannedPeriod/"
+                    "cbc:ContractDurationMeasure",
+                    XML_NAMESPACES
+                )
+                if duracion is not None:
+                    data["duracion_contrato_valor"] = duracion.text
+                    data["duracion_contrato_unidad"] = (
+                        duracion.get("unitCode")
+                    )
+
+            # ------------------------------------------
+            # Resultado de la licitación
+            # ------------------------------------------
+            trs = cfs.find(
+                "cac:TenderResult",
+                XML_NAMESPACES
+            )
+
+            if trs is not None:
+                data["fecha_adjudicacion"] = pd.to_datetime(
+                    get_text(trs, "cbc:AwardDate"),
+                    errors="coerce"
+                )
+                data["ofertas_recibidas"] = get_text(
+                    trs, "cbc:ReceivedTenderQuantity"
+                )
+                data["es_pyme_empresa"] = get_text(
+                    trs, "cbc:SMEAwardedIndicator"
+                )
+
+                wp = trs.find(
+                    "cac:WinningParty",
+                    XML_NAMESPACES
+                )
+                if wp is not None:
+                    data["nif_empresa"] = get_text(
+                        wp, "cac:PartyIdentification/cbc:ID"
+                    )
+                    data["empresa_ganadora"] = get_text(
+                        wp, "cac:PartyName/cbc:Name"
+                    )
+                    data["pais_empresa"] = get_text(
+                        wp,
+                        "cac:PhysicalLocation/"
+                        "cac:Address/cac:Country/"
+                        "cbc:IdentificationCode"
+                    )
+
+                data["importe_adjudicado_con_IVA"] = safe_float(
+                    get_text(
+                        trs,
+                        "cac:AwardedTenderedProject/"
+                        "cac:LegalMonetaryTotal/"
+                        "cbc:PayableAmount"
+                    )
+                )
+                data["importe_adjudicado_sin_IVA"] = safe_float(
+                    get_text(
+                        trs,
+                        "cac:AwardedTenderedProject/"
+                        "cac:LegalMonetaryTotal/"
+                        "cbc:TaxExclusiveAmount"
+                    )
+                )
+
+    except Exception as e:
+        data["parse_error"] = str(e)
+
+    return data
+
+
+# ======================================================
+# BENCHMARK
+# ======================================================
+
+def parse_entries_find(entries: list) -> pd.DataFrame:
+    """
+    Camino original completo: un diccionario por entry y DataFrame al
+    final.
+    """
+    return pd.DataFrame([parse_entry_find(entry) for entry in entries])
+
+
+def medir(funcion, entries: list, repeticiones: int) -> float:
+    """
+    Devuelve entries/segundo de `funcion` (mejor de `repeticiones`).
+    """
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(entries)
+        mejor = min(mejor, time.perf_counter() - inicio)
+
+    return len(entries) / mejor
+
+
+def comprobar_equivalencia(entries: list) -> list:
+    """
+    Compara ambas implementaciones y devuelve las columnas comunes
+    cuyos valores difieren.
+
+    Las fechas con zona se comparan en hora local sin zona y el número
+    de ofertas y el indicador PYME ya tipados, que es como los devuelve
+    el parser columnar.
+    """
+    original = parse_entries_find(entries)
+    nuevo = parse_entries(entries)
+
+    fecha = original["fecha_actualizacion"]
+    if fecha.dt.tz is not None:
+        original["fecha_actualizacion"] = (
+            fecha.dt.tz_convert(ZONA_HORARIA).dt.tz_localize(None)
+        )
+
+    original["ofertas_recibidas"] = a_enteros(original["ofertas_recibidas"])
+    original["es_pyme_empresa"] = a_booleanos(original["es_pyme_empresa"])
+
+    distintas = []
+    for columna in original.columns:
+        try:
+            pd.testing.assert_series_equal(
+                original[columna], nuevo[columna], check_dtype=False
+            )
+        except AssertionError:
+            distintas.append(columna)
+
+    return distintas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("feed", nargs="?", type=Path,
+                        default=FEED_POR_DEFECTO)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    root = ET.parse(args.feed).getroot()
+    entries = root.findall("atom:entry", XML_NAMESPACES)
+
+    print(f"Feed: {args.feed} ({len(entries)} entries)")
+
+    distintas = comprobar_equivalencia(entries)
+    print(f"Columnas con valores distintos: {distintas or 'ninguna'}")
+
+    eps_find = medir(parse_entries_find, entries, args.repeticiones)
+    eps_plan = medir(parse_entries, entries, args.repeticiones)
+
+    print(f"find() por campo:     {eps_find:>10,.0f} entries/s")
+    print(f"plan columnar:        {eps_plan:>10,.0f} entries/s")
+    print(f"Aceleración:          {eps_plan / eps_find:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
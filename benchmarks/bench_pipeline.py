@@ -0,0 +1,276 @@
+"""
+Benchmark de extremo a extremo del pipeline sobre un feed sintético.
+
+Uso:
+    python -m benchmarks.bench_pipeline [--entries N] [--archivos N]
+        [--republicacion 0.1] [--malformados 0.0] [--workers N]
+        [--database-url URL] [--salida resultados.json]
+        [--comparar anterior.json]
+
+Genera el feed con `benchmarks.feed_sintetico` en un directorio
+temporal y mide, por etapa, segundos, entries/segundo y pico de RSS
+del proceso:
+
+    parse_atom_file          (la página más grande)
+    load_all_atom_folders    (sin caché del parseo)
+    llenar_cache_parseo      (parseo + escritura de la caché)
+    leer_cache_parseo        (todo desde la caché)
+    limpiar_contratos
+    insertar_maestras        (esquema + catálogos)
+    insertar_empresas
+    insertar_organos
+    insertar_contratos
+    exportar_dataset
+
+La carga va contra una base SQLite temporal salvo que se indique
+`--database-url`. Los resultados se guardan en JSON (por defecto en
+`benchmarks/resultados/`, con el commit en el nombre) y `--comparar`
+muestra la variación frente a una ejecución anterior.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.config import BASE_DIR
+from src.metricas import MedidorRSS
+
+
+RESULTADOS_DIR = BASE_DIR / "benchmarks" / "resultados"
+
+
+# ======================================================
+# MEDICIÓN
+# ======================================================
+
+def medir_etapa(resultados: list, nombre: str, funcion, entries=None):
+    """
+    Ejecuta `funcion()`, registra su medición en `resultados` y
+    devuelve su resultado.
+
+    `entries` es el número de entries procesados; si es None se usa
+    `len()` del resultado.
+    """
+    with MedidorRSS() as rss:
+        inicio = time.perf_counter()
+        salida = funcion()
+        segundos = time.perf_counter() - inicio
+
+    if entries is None:
+        entries = len(salida) if salida is not None else 0
+
+    resultados.append({
+        "etapa": nombre,
+        "segundos": round(segundos, 4),
+        "entries": int(entries),
+        "entries_por_segundo": round(entries / segundos, 1)
+        if segundos > 0 else None,
+        "rss_pico_mb": (
+            round(rss.pico / 2**20, 1) if rss.pico is not None else None
+        ),
+    })
+
+    memoria = (
+        f"{rss.pico / 2**20:8.1f} MB" if rss.pico is not None
+        else "     n/d"
+    )
+    print(
+        f"  {nombre:<22} {segundos:8.2f}s {entries:>10,} entries "
+        f"{entries / segundos if segundos else 0:>12,.0f} entries/s "
+        f"{memoria}"
+    )
+
+    return salida
+
+
+# ======================================================
+# EJECUCIÓN
+# ======================================================
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def ejecutar_benchmark(args: argparse.Namespace, trabajo: Path) -> dict:
+    from benchmarks.feed_sintetico import generar_feeds
+
+    feeds_dir = trabajo / "raw"
+    resumen = generar_feeds(
+        feeds_dir,
+        entries_por_archivo=args.entries,
+        archivos=args.archivos,
+        republicacion=args.republicacion,
+        malformados=args.malformados,
+        semilla=args.semilla
+    )
+    print(
+        f"Feed sintético: {resumen.archivos} archivos, "
+        f"{resumen.entries:,} entries, {resumen.bytes / 1e6:.1f} MB"
+    )
+
+    # El backend se decide al importar src.db.engine: la URL debe
+    # estar en el entorno antes de importar los módulos de carga
+    os.environ["DATABASE_URL"] = (
+        args.database_url or f"sqlite:///{trabajo / 'bench.db'}"
+    )
+
+    from src import cache_parseo
+    from src.atom_parser import parse_atom_file
+    from src.db import claves
+    from src.db.export_dataset import exportar_dataset
+    from src.db.insert import (
+        insertar_contratos,
+        insertar_empresas,
+        insertar_organos,
+        insertar_tablas_maestras,
+    )
+    from src.db.schema import ejecutar_schema
+    from src.loader import load_all_atom_folders
+    from src.transform.cleaning import limpiar_contratos
+
+    # Las cachés de claves del benchmark no deben sustituir a las del
+    # proyecto (data/interim)
+    claves.INTERIM_DATA_DIR = trabajo / "interim"
+    cache_parseo.PARSE_CACHE_DIR = trabajo / "cache_parseo"
+
+    mayor = max(feeds_dir.rglob("*.atom"), key=lambda p: p.stat().st_size)
+
+    etapas = []
+    print("\nEtapa                      tiempo    entries"
+          "        throughput   RSS pico")
+
+    medir_etapa(etapas, "parse_atom_file", lambda: parse_atom_file(mayor))
+    df = medir_etapa(
+        etapas, "load_all_atom_folders",
+        lambda: load_all_atom_folders(
+            feeds_dir, workers=args.workers, cache=False
+        )
+    )
+    for nombre in ("llenar_cache_parseo", "leer_cache_parseo"):
+        medir_etapa(
+            etapas, nombre,
+            lambda: load_all_atom_folders(feeds_dir, workers=args.workers)
+        )
+    df = medir_etapa(etapas, "limpiar_contratos",
+                     lambda: limpiar_contratos(df), entries=len(df))
+
+    def _maestras():
+        ejecutar_schema()
+        insertar_tablas_maestras()
+
+    medir_etapa(etapas, "insertar_maestras", _maestras, entries=0)
+    df = medir_etapa(etapas, "insertar_empresas",
+                     lambda: insertar_empresas(df))
+    df = medir_etapa(etapas, "insertar_organos",
+                     lambda: insertar_organos(df))
+    medir_etapa(etapas, "insertar_contratos",
+                lambda: insertar_contratos(df), entries=len(df))
+    medir_etapa(
+        etapas, "exportar_dataset",
+        lambda: exportar_dataset(destino=trabajo / "export" / "dataset"),
+        entries=len(df)
+    )
+
+    return {
+        "commit": _commit(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "backend": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "parametros": {
+            "entries_por_archivo": args.entries,
+            "archivos": args.archivos,
+            "republicacion": args.republicacion,
+            "malformados": args.malformados,
+            "semilla": args.semilla,
+            "workers": args.workers,
+        },
+        "feed": resumen._asdict(),
+        "etapas": etapas,
+    }
+
+
+def comparar(actual: dict, anterior: dict) -> None:
+    """
+    Imprime, por etapa, la variación de tiempo y RSS frente a
+    `anterior`.
+    """
+    previas = {e["etapa"]: e for e in anterior["etapas"]}
+
+    print(f"\nComparación con {anterior['commit']} ({anterior['fecha']}):")
+    if anterior["parametros"] != actual["parametros"]:
+        print("  Aviso: parámetros distintos, la comparación es orientativa")
+
+    for etapa in actual["etapas"]:
+        previa = previas.get(etapa["etapa"])
+        if previa is None or not previa["segundos"]:
+            continue
+        tiempo = etapa["segundos"] / previa["segundos"] - 1
+        rss = (
+            f"{etapa['rss_pico_mb'] - previa['rss_pico_mb']:+8.1f} MB"
+            if None not in (etapa["rss_pico_mb"], previa["rss_pico_mb"])
+            else "n/d"
+        )
+        print(
+            f"  {etapa['etapa']:<22} tiempo {tiempo:+8.1%}   "
+            f"RSS {rss}"
+        )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark del pipeline sobre un feed sintético"
+    )
+    parser.add_argument("--entries", type=int, default=2000,
+                        help="entries por archivo")
+    parser.add_argument("--archivos", type=int, default=10)
+    parser.add_argument("--republicacion", type=float, default=0.1)
+    parser.add_argument("--malformados", type=float, default=0.0)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos de parseo en load_all_atom_folders")
+    parser.add_argument("--database-url",
+                        help="backend de carga (por defecto, SQLite "
+                             "temporal)")
+    parser.add_argument("--salida", type=Path,
+                        help="archivo JSON de resultados")
+    parser.add_argument("--comparar", type=Path,
+                        help="JSON de una ejecución anterior")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+        resultado = ejecutar_benchmark(args, Path(tmp))
+
+    salida = args.salida or RESULTADOS_DIR / (
+        f"{datetime.now():%Y%m%d_%H%M%S}_{resultado['commit']}.json"
+    )
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(
+        json.dumps(resultado, indent=2, ensure_ascii=False),
+        encoding="utf-8"
+    )
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        anterior = json.loads(args.comparar.read_text(encoding="utf-8"))
+        comparar(resultado, anterior)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+Generador determinista de feeds sintéticos con la forma de los de
+PLACSP (Atom + CODICE), para medir el pipeline a escala.
+
+Uso:
+    python -m benchmarks.feed_sintetico DESTINO [--entries N]
+        [--archivos N] [--republicacion 0.1] [--malformados 0.01]
+        [--bajas 0.0] [--semilla 0]
+
+Genera en DESTINO carpetas de años con páginas encadenadas igual que
+las reales: la más reciente es `contratosMenoresPerfilesContratantes.atom`
+y cada una enlaza con la anterior (rel="next") con el sufijo
+`_AAAAMMDD_HHMMSS`. Los entries usan los namespaces de
+`config.XML_NAMESPACES` y las rutas que lee `src.atom_parser`.
+
+- republicacion: fracción de entries que vuelven a publicar un id ya
+  emitido, con fecha posterior (lo que deduplica la limpieza)
+- malformados: fracción de entries con XML inválido (un "&" sin
+  escapar), que el parser descarta al recuperar el archivo
+- bajas: fracción de entries seguidos de un <at:deleted-entry> que
+  retira un id ya emitido
+
+Con la misma semilla y parámetros el resultado es idéntico byte a byte.
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+from src.config import (
+    MAPA_ACTIVIDAD_ORGANO,
+    MAPA_TIPO_CONTRATO,
+    MAPA_TIPO_ORGANO,
+    XML_NAMESPACES,
+)
+
+
+URL_SINDICACION = (
+    "https://contrataciondelestado.es/sindicacion/sindicacion_1143/"
+)
+NOMBRE_FEED = "contratosMenoresPerfilesContratantes"
+URL_ENTRY = (
+    "https://contrataciondelestado.es/sindicacion/datosAbiertosMenores/"
+)
+
+# Fecha de la primera página generada
+INICIO = datetime(2020, 1, 1, 8, 0, 0)
+
+# Primer número de entry
+ID_INICIAL = 10_000_000
+
+# (localidad, código postal) de los órganos, con las variantes que se
+# ven en los feeds reales
+LOCALIDADES = [
+    ("Madrid", "28001"),
+    ("Barcelona", "08001"),
+    ("Valencia", "46004"),
+    ("Sevilla", "41001"),
+    ("Zaragoza", "50001"),
+    ("Málaga", "29001"),
+    ("Murcia", "30001"),
+    ("Palma", "07001"),
+    ("Las Palmas de Gran Canaria", "35001"),
+    ("Bilbao", "48001"),
+    ("Alicante/Alacant", "03001"),
+    ("Córdoba", "14001"),
+    ("Valladolid", "47001"),
+    ("Vigo", "36201"),
+    ("Gijón", "33201"),
+    ("Toledo", "45071"),
+    ("Ejido (El)", "04700"),
+    ("Majadahonda (Madrid)", "28222"),
+    ("Santa Cruz de Tenerife", "38001"),
+    ("Soria", "42071"),
+]
+
+ESTADOS = ["RES", "ADJ", "RES", "RES", "ANUL"]
+NUTS = ["ES300", "ES511", "ES523", "ES618", "ES243", "ES617", "ES620"]
+
+# Tipos de contrato habituales en contratos menores, con su peso
+TIPOS_CONTRATO = {"1": 4, "2": 5, "3": 2, "7": 1}
+
+
+class ResumenFeed(NamedTuple):
+    archivos: int
+    entries: int
+    unicos: int
+    republicados: int
+    malformados: int
+    bytes: int
+    bajas: int = 0
+
+
+# ======================================================
+# ENTIDADES
+# ======================================================
+
+def _organos(rng: random.Random, n: int) -> list:
+    tipos = list(MAPA_TIPO_ORGANO)
+    actividades = list(MAPA_ACTIVIDAD_ORGANO)
+
+    organos = []
+    for i in range(n):
+        localidad, cp = LOCALIDADES[i % len(LOCALIDADES)]
+        organos.append({
+            "dir3": f"L{i:08d}",
+            "nif": f"P{rng.randrange(10**7):07d}{'ABCDEFGHJ'[i % 9]}",
+            "plataforma": f"{rng.randrange(10**13, 10**14)}",
+            "nombre": f"Órgano sintético {i} de {localidad}",
+            "localidad": localidad,
+            "cp": cp,
+            "tipo": rng.choice(tipos),
+            "actividad": rng.choice(actividades),
+            "email": f"contratacion{i}@organo.example",
+            "telefono": f"9{rng.randrange(10**8):08d}",
+        })
+    return organos
+
+
+def _empresas(rng: random.Random, n: int) -> list:
+    return [
+        {
+            "nif": f"B{rng.randrange(10**8):08d}",
+            "nombre": f"EMPRESA SINTÉTICA {i} S.L.",
+            "pyme": "true" if rng.random() < 0.8 else "false",
+        }
+        for i in range(n)
+    ]
+
+
+# ======================================================
+# XML
+# ======================================================
+
+def _cabecera(nombre: str, siguiente: str, actualizado: datetime) -> str:
+    espacios = " ".join(
+        f'xmlns:{prefijo.replace("_", "-")}="{uri}"'
+        for prefijo, uri in XML_NAMESPACES.items()
+        if prefijo != "atom"
+    )
+    enlace_siguiente = (
+        f'    <link rel="next" href="{URL_SINDICACION}{siguiente}"/>\n'
+        if siguiente else ""
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<feed xmlns="{XML_NAMESPACES["atom"]}" {espacios}>\n'
+        f"    <id>{URL_SINDICACION}{nombre}</id>\n"
+        f'    <link rel="self" href="{URL_SINDICACION}{nombre}"/>\n'
+        f"{enlace_siguiente}"
+        "    <title>Feed sintético de contratos menores</title>\n"
+        f"    <updated>{actualizado.isoformat()}+01:00</updated>\n"
+    )
+
+
+def _entry(
+    id_num: int,
+    actualizado: datetime,
+    organo: dict,
+    empresa: dict,
+    rng: random.Random,
+    malformado: bool
+) -> str:
+    tipo = rng.choices(
+        list(TIPOS_CONTRATO), weights=list(TIPOS_CONTRATO.values())
+    )[0]
+    base = round(min(max(rng.lognormvariate(8.5, 1.0), 100), 60_000), 2)
+    total = round(base * 1.21, 2)
+    estado = rng.choice(ESTADOS)
+    adjudicacion = (actualizado - timedelta(days=rng.randrange(60))).date()
+    expediente = f"CMENOR/{actualizado.year}/{id_num}"
+    titulo = escape(
+        f"Contrato sintético {id_num} ({MAPA_TIPO_CONTRATO[tipo]})"
+    )
+    if malformado:
+        titulo += " & sin escapar"
+
+    # Mismo orden de llamadas a rng que en el XML, para que la salida
+    # con una semilla dada no cambie
+    cpv = f"{rng.randrange(30, 99)}{rng.randrange(10**6):06d}"
+    nuts = rng.choice(NUTS)
+    duracion = rng.randrange(1, 13)
+    ofertas = rng.randrange(1, 6)
+    nombre_organo = escape(organo["nombre"])
+    euros = 'currencyID="EUR"'
+
+    return (
+        "    <entry>\n"
+        f"        <id>{URL_ENTRY}{id_num}</id>\n"
+        '        <summary type="text">'
+        f"Id licitación: {expediente}; "
+        f"Órgano de Contratación: {nombre_organo}; "
+        f"Importe: {base} EUR; Estado: {estado}</summary>\n"
+        f"        <title>{titulo}</title>\n"
+        f"        <updated>{actualizado.isoformat()}.000+01:00</updated>\n"
+        "        <cac-place-ext:ContractFolderStatus>\n"
+        "            <cbc:ContractFolderID>"
+        f"{expediente}</cbc:ContractFolderID>\n"
+        "            <cbc-place-ext:ContractFolderStatusCode>"
+        f"{estado}</cbc-place-ext:ContractFolderStatusCode>\n"
+        "            <cac-place-ext:LocatedContractingParty>\n"
+        "                <cbc:ContractingPartyTypeCode>"
+        f"{organo['tipo']}</cbc:ContractingPartyTypeCode>\n"
+        "                <cbc:ActivityCode>"
+        f"{organo['actividad']}</cbc:ActivityCode>\n"
+        "                <cac:Party>\n"
+        f"{_identificacion('DIR3', organo['dir3'])}"
+        f"{_identificacion('NIF', organo['nif'])}"
+        f"{_identificacion('ID_PLATAFORMA', organo['plataforma'])}"
+        "                    <cac:PartyName>"
+        f"<cbc:Name>{nombre_organo}</cbc:Name></cac:PartyName>\n"
+        "                    <cac:PostalAddress>\n"
+        "                        <cbc:CityName>"
+        f"{escape(organo['localidad'])}</cbc:CityName>\n"
+        "                        <cbc:PostalZone>"
+        f"{organo['cp']}</cbc:PostalZone>\n"
+        "                        <cac:Country>"
+        "<cbc:IdentificationCode>ES</cbc:IdentificationCode>"
+        "<cbc:Name>España</cbc:Name></cac:Country>\n"
+        "                    </cac:PostalAddress>\n"
+        "                    <cac:Contact>\n"
+        "                        <cbc:Telephone>"
+        f"{organo['telefono']}</cbc:Telephone>\n"
+        "                        <cbc:ElectronicMail>"
+        f"{organo['email']}</cbc:ElectronicMail>\n"
+        "                    </cac:Contact>\n"
+        "                </cac:Party>\n"
+        "            </cac-place-ext:LocatedContractingParty>\n"
+        "            <cac:ProcurementProject>\n"
+        f"                <cbc:Name>{titulo}</cbc:Name>\n"
+        f"                <cbc:TypeCode>{tipo}</cbc:TypeCode>\n"
+        "                <cac:BudgetAmount>\n"
+        f"                    <cbc:TotalAmount {euros}>"
+        f"{total}</cbc:TotalAmount>\n"
+        f"                    <cbc:TaxExclusiveAmount {euros}>"
+        f"{base}</cbc:TaxExclusiveAmount>\n"
+        "                </cac:BudgetAmount>\n"
+        "                <cac:RequiredCommodityClassification>\n"
+        "                    <cbc:ItemClassificationCode>"
+        f"{cpv}</cbc:ItemClassificationCode>\n"
+        "                </cac:RequiredCommodityClassification>\n"
+        "                <cac:RealizedLocation><cbc:CountrySubentityCode>"
+        f"{nuts}</cbc:CountrySubentityCode></cac:RealizedLocation>\n"
+        "                <cac:PlannedPeriod>"
+        '<cbc:ContractDurationMeasure unitCode="MON">'
+        f"{duracion}</cbc:ContractDurationMeasure></cac:PlannedPeriod>\n"
+        "            </cac:ProcurementProject>\n"
+        "            <cac:TenderResult>\n"
+        "                <cbc:AwardDate>"
+        f"{adjudicacion.isoformat()}</cbc:AwardDate>\n"
+        "                <cbc:ReceivedTenderQuantity>"
+        f"{ofertas}</cbc:ReceivedTenderQuantity>\n"
+        "                <cbc:SMEAwardedIndicator>"
+        f"{empresa['pyme']}</cbc:SMEAwardedIndicator>\n"
+        "                <cac:WinningParty>\n"
+        f"{_identificacion('NIF', empresa['nif'])}"
+        "                    <cac:PartyName>"
+        f"<cbc:Name>{escape(empresa['nombre'])}</cbc:Name>"
+        "</cac:PartyName>\n"
+        "                </cac:WinningParty>\n"
+        "                <cac:AwardedTenderedProject>\n"
+        "                    <cac:LegalMonetaryTotal>\n"
+        f"                        <cbc:TaxExclusiveAmount {euros}>"
+        f"{base}</cbc:TaxExclusiveAmount>\n"
+        f"                        <cbc:PayableAmount {euros}>"
+        f"{total}</cbc:PayableAmount>\n"
+        "                    </cac:LegalMonetaryTotal>\n"
+        "                </cac:AwardedTenderedProject>\n"
+        "            </cac:TenderResult>\n"
+        "        </cac-place-ext:ContractFolderStatus>\n"
+        "    </entry>\n"
+    )
+
+
+def _identificacion(esquema: str, valor: str) -> str:
+    return (
+        "                    <cac:PartyIdentification>"
+        f'<cbc:ID schemeName="{esquema}">{valor}</cbc:ID>'
+        "</cac:PartyIdentification>\n"
+    )
+
+
+def _baja(id_num: int, cuando: datetime) -> str:
+    return (
+        f'    <at:deleted-entry ref="{URL_ENTRY}{id_num}" '
+        f'when="{cuando.isoformat()}.000+01:00"/>\n'
+    )
+
+
+# ======================================================
+# GENERACIÓN
+# ======================================================
+
+def _nombre_pagina(actualizado: datetime, mas_reciente: bool) -> str:
+    if mas_reciente:
+        return f"{NOMBRE_FEED}.atom"
+    return f"{NOMBRE_FEED}_{actualizado:%Y%m%d_%H%M%S}.atom"
+
+
+def generar_feeds(
+    destino: Path,
+    entries_por_archivo: int = 500,
+    archivos: int = 10,
+    republicacion: float = 0.1,
+    malformados: float = 0.0,
+    bajas: float = 0.0,
+    semilla: int = 0
+) -> ResumenFeed:
+    """
+    Escribe `archivos` páginas de `entries_por_archivo` entries en
+    carpetas de años dentro de `destino`.
+
+    Parameters
+    ----------
+    destino : Path
+        Directorio base (equivalente a `RAW_DATA_DIR`)
+    entries_por_archivo, archivos : int
+        Escala del feed
+    republicacion : float
+        Fracción de entries que republican un id anterior
+    malformados : float
+        Fracción de entries con XML inválido
+    bajas : float
+        Fracción de entries seguidos de una baja de un id ya emitido
+    semilla : int
+        Semilla del generador pseudoaleatorio
+
+    Returns
+    -------
+    ResumenFeed
+    """
+    rng = random.Random(semilla)
+    total = entries_por_archivo * archivos
+
+    organos = _organos(rng, max(10, total // 50))
+    empresas = _empresas(rng, max(20, total // 5))
+
+    # Una página cada 6 horas; entries repartidos dentro de la página
+    paso_pagina = timedelta(hours=6)
+    paso_entry = paso_pagina / max(entries_por_archivo, 1)
+
+    emitidos = []
+    republicados = descartados = retirados = bytes_escritos = 0
+    siguiente = None
+
+    for pagina in range(archivos):
+        inicio = INICIO + pagina * paso_pagina
+        actualizado = inicio + paso_pagina - timedelta(seconds=1)
+        nombre = _nombre_pagina(actualizado, pagina == archivos - 1)
+
+        carpeta = destino / str(actualizado.year)
+        carpeta.mkdir(parents=True, exist_ok=True)
+
+        partes = [_cabecera(nombre, siguiente, actualizado)]
+
+        # Dentro de una página, del más reciente al más antiguo
+        for i in reversed(range(entries_por_archivo)):
+            fecha = (inicio + i * paso_entry).replace(microsecond=0)
+
+            if emitidos and rng.random() < republicacion:
+                id_num = rng.choice(emitidos)
+                republicados += 1
+            else:
+                id_num = ID_INICIAL + len(emitidos)
+                emitidos.append(id_num)
+
+            malformado = rng.random() < malformados
+            descartados += malformado
+
+            partes.append(
+                _entry(
+                    id_num, fecha,
+                    organos[id_num % len(organos)],
+                    empresas[rng.randrange(len(empresas))],
+                    rng, malformado
+                )
+            )
+
+            if bajas and rng.random() < bajas:
+                partes.append(_baja(rng.choice(emitidos), fecha))
+                retirados += 1
+
+        partes.append("</feed>\n")
+        contenido = "".join(partes).encode("utf-8")
+        (carpeta / nombre).write_bytes(contenido)
+
+        bytes_escritos += len(contenido)
+        siguiente = nombre
+
+    return ResumenFeed(
+        archivos=archivos,
+        entries=total,
+        unicos=len(emitidos),
+        republicados=republicados,
+        malformados=descartados,
+        bytes=bytes_escritos,
+        bajas=retirados,
+    )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Genera feeds sintéticos de contratos menores"
+    )
+    parser.add_argument("destino", type=Path)
+    parser.add_argument("--entries", type=int, default=500,
+                        help="entries por archivo")
+    parser.add_argument("--archivos", type=int, default=10)
+    parser.add_argument("--republicacion", type=float, default=0.1)
+    parser.add_argument("--malformados", type=float, default=0.0)
+    parser.add_argument("--bajas", type=float, default=0.0)
+    parser.add_argument("--semilla", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    resumen = generar_feeds(
+        args.destino,
+        entries_por_archivo=args.entries,
+        archivos=args.archivos,
+        republicacion=args.republicacion,
+        malformados=args.malformados,
+        bajas=args.bajas,
+        semilla=args.semilla
+    )
+    print(
+        f"{resumen.archivos} archivos, {resumen.entries} entries "
+        f"({resumen.unicos} ids distintos, {resumen.republicados} "
+        f"republicados, {resumen.malformados} malformados, "
+        f"{resumen.bajas} bajas), "
+        f"{resumen.bytes / 1e6:.1f} MB en {args.destino}"
+    )
@@ -0,0 +1,196 @@
+"""
+Servidor HTTP local que imita la sindicación de PLACSP, para probar y
+medir `src.descarga` sin salir a internet.
+
+Uso:
+    python -m benchmarks.servidor_feed DIRECTORIO [--puerto 8000]
+        [--latencia 0.05] [--kbps 0] [--fallos 0.0]
+
+Sirve las páginas de las carpetas de años de DIRECTORIO (por ejemplo,
+las generadas con `benchmarks.feed_sintetico`) en
+`/sindicacion/sindicacion_1143/<nombre>`:
+
+- los enlaces a `URL_SINDICACION` se reescriben para que apunten al
+  propio servidor
+- cada respuesta lleva ETag y Last-Modified, y las peticiones
+  condicionales que coinciden reciben 304
+- latencia: segundos de espera antes de cada respuesta
+- kbps: ancho de banda por conexión (0 = sin límite)
+- fallos: fracción de peticiones que responden 503 con Retry-After: 0
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from benchmarks.feed_sintetico import URL_SINDICACION
+
+
+RUTA = "/sindicacion/sindicacion_1143/"
+
+# Bytes por escritura al limitar el ancho de banda
+_BLOQUE = 16 * 1024
+
+
+class _Pagina:
+    def __init__(self, path: Path, base_url: str):
+        self.contenido = path.read_bytes().replace(
+            URL_SINDICACION.encode("utf-8"), base_url.encode("utf-8")
+        )
+        self.etag = f'"{hashlib.sha1(self.contenido).hexdigest()[:16]}"'
+        self.last_modified = formatdate(path.stat().st_mtime, usegmt=True)
+
+
+def _manejador(servidor_feed: "ServidorFeed"):
+    class Manejador(BaseHTTPRequestHandler):
+        def log_message(self, *_):
+            pass
+
+        def do_GET(self):
+            servidor_feed.peticiones[self.path] += 1
+            time.sleep(servidor_feed.latencia)
+
+            if servidor_feed.fallar():
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            pagina = servidor_feed.pagina(self.path)
+            if pagina is None:
+                self.send_error(404)
+                return
+
+            if (
+                self.headers.get("If-None-Match") == pagina.etag
+                or self.headers.get("If-Modified-Since")
+                == pagina.last_modified
+            ):
+                servidor_feed.no_modificadas += 1
+                self.send_response(304)
+                self.send_header("ETag", pagina.etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/atom+xml")
+            self.send_header("Content-Length", str(len(pagina.contenido)))
+            self.send_header("ETag", pagina.etag)
+            self.send_header("Last-Modified", pagina.last_modified)
+            self.end_headers()
+
+            for i in range(0, len(pagina.contenido), _BLOQUE):
+                bloque = pagina.contenido[i:i + _BLOQUE]
+                self.wfile.write(bloque)
+                if servidor_feed.kbps:
+                    time.sleep(len(bloque) / (servidor_feed.kbps * 1024))
+
+    return Manejador
+
+
+class ServidorFeed:
+    """
+    Estado del servidor: páginas por nombre y contadores de peticiones.
+    """
+
+    def __init__(
+        self,
+        directorio: Path,
+        latencia: float = 0.0,
+        kbps: float = 0.0,
+        fallos: float = 0.0,
+        semilla: int = 0
+    ):
+        self.directorio = directorio
+        self.latencia = latencia
+        self.kbps = kbps
+        self.fallos = fallos
+        self.peticiones = Counter()
+        self.no_modificadas = 0
+        self.base_url = None
+        self._rng = random.Random(semilla)
+        self._lock = threading.Lock()
+
+    def fallar(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.fallos
+
+    def pagina(self, ruta: str):
+        if not ruta.startswith(RUTA):
+            return None
+        nombre = ruta[len(RUTA):]
+        for path in self.directorio.glob(f"*/{nombre}"):
+            return _Pagina(path, self.base_url)
+        return None
+
+    @property
+    def url_feed(self) -> str:
+        return f"{self.base_url}contratosMenoresPerfilesContratantes.atom"
+
+
+@contextmanager
+def servir(
+    directorio: Path,
+    puerto: int = 0,
+    **opciones
+):
+    """
+    Arranca el servidor en un hilo y devuelve su `ServidorFeed`
+    (`puerto=0` elige uno libre).
+    """
+    servidor_feed = ServidorFeed(directorio, **opciones)
+    servidor = ThreadingHTTPServer(
+        ("127.0.0.1", puerto), _manejador(servidor_feed)
+    )
+    servidor_feed.base_url = (
+        f"http://127.0.0.1:{servidor.server_address[1]}{RUTA}"
+    )
+
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    try:
+        yield servidor_feed
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Servidor local con la sindicación de PLACSP"
+    )
+    parser.add_argument("directorio", type=Path)
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--latencia", type=float, default=0.05)
+    parser.add_argument("--kbps", type=float, default=0.0)
+    parser.add_argument("--fallos", type=float, default=0.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+
+    with servir(
+        args.directorio,
+        puerto=args.puerto,
+        latencia=args.latencia,
+        kbps=args.kbps,
+        fallos=args.fallos
+    ) as servidor_feed:
+        print(f"Feed en {servidor_feed.url_feed} (Ctrl+C para terminar)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -21,9 +21,12 @@ CREATE TABLE IF NOT EXISTS `contratos_menores_test`.`empresa` (
   `empresa_id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
   `nif_empresa` VARCHAR(150) NULL DEFAULT NULL,
   `empresa_nombre` VARCHAR(580) NULL DEFAULT NULL,
-  `empresa_es_pyme` VARCHAR(20) NULL DEFAULT NULL,
+  `empresa_es_pyme` TINYINT(1) NULL DEFAULT NULL,
   `empresa_pais` VARCHAR(100) NULL DEFAULT NULL,
-  PRIMARY KEY (`empresa_id`))
+  `empresa_clave` CHAR(64) NOT NULL COMMENT 'SHA-256 de NIF + nombre',
+  `fecha_carga` DATETIME NULL DEFAULT NULL COMMENT 'Última carga en que se insertó o cambió',
+  PRIMARY KEY (`empresa_id`),
+  UNIQUE INDEX `UQ_empresa_clave` (`empresa_clave` ASC) VISIBLE)
 ENGINE = InnoDB
 AUTO_INCREMENT = 1
 DEFAULT CHARACTER SET = utf8mb4
@@ -36,6 +39,7 @@ COLLATE = utf8mb4_0900_ai_ci;
 CREATE TABLE IF NOT EXISTS `contratos_menores_test`.`tipo_actividad_organo` (
   `codigo_actividad_organo` VARCHAR(10) NOT NULL,
   `nombre_actividad_organo` VARCHAR(255) NULL DEFAULT NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL COMMENT 'Última carga en que se insertó o cambió',
   PRIMARY KEY (`codigo_actividad_organo`))
 ENGINE = InnoDB
 DEFAULT CHARACTER SET = utf8mb4
@@ -48,6 +52,7 @@ COLLATE = utf8mb4_0900_ai_ci;
 CREATE TABLE IF NOT EXISTS `contratos_menores_test`.`tipo_organo` (
   `codigo_tipo_organo` VARCHAR(10) NOT NULL,
   `nombre_tipo_organo` VARCHAR(100) NULL DEFAULT NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL COMMENT 'Última carga en que se insertó o cambió',
   PRIMARY KEY (`codigo_tipo_organo`))
 ENGINE = InnoDB
 DEFAULT CHARACTER SET = utf8mb4
@@ -68,7 +73,10 @@ CREATE TABLE IF NOT EXISTS `contratos_menores_test`.`organo` (
   `organo_email` VARCHAR(255) NULL DEFAULT NULL,
   `organo_telefono` VARCHAR(30) NULL DEFAULT NULL,
   `organo_nif` VARCHAR(20) NULL DEFAULT NULL,
+  `organo_clave` CHAR(64) NOT NULL COMMENT 'SHA-256 de DIR3 + NIF + nombre',
+  `fecha_carga` DATETIME NULL DEFAULT NULL COMMENT 'Última carga en que se insertó o cambió',
   PRIMARY KEY (`organo_id`),
+  UNIQUE INDEX `UQ_organo_clave` (`organo_clave` ASC) VISIBLE,
   INDEX `FK_org_tipoorg_idx` (`tipo_organo_codigo` ASC) VISIBLE,
   INDEX `FK_org_actividad_organo_idx` (`actividad_organo_codigo` ASC) VISIBLE,
   CONSTRAINT `FK_org_actividad_organo`
@@ -90,6 +98,7 @@ ROW_FORMAT = COMPRESSED;
 CREATE TABLE IF NOT EXISTS `contratos_menores_test`.`tipo_contrato` (
   `codigo_tipo_contrato` VARCHAR(10) NOT NULL,
   `nombre_contrato` VARCHAR(100) NOT NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL COMMENT 'Última carga en que se insertó o cambió',
   PRIMARY KEY (`codigo_tipo_contrato`))
 ENGINE = InnoDB
 DEFAULT CHARACTER SET = utf8mb4
@@ -114,11 +123,14 @@ CREATE TABLE IF NOT EXISTS `contratos_menores_test`.`contrato` (
   `importe_sin_impuestos` DECIMAL(15,2) NULL DEFAULT NULL,
   `codigo_cpv_principal` VARCHAR(20) NULL DEFAULT NULL,
   `codigo_region_nuts` VARCHAR(10) NULL DEFAULT NULL,
-  `ofertas_recibidas` VARCHAR(10) NULL DEFAULT NULL,
+  `ofertas_recibidas` INT UNSIGNED NULL DEFAULT NULL,
   `id_plataforma` VARCHAR(50) NULL DEFAULT NULL,
   `contr_organo_id` INT UNSIGNED NULL,
   `contr_empresa_id` INT UNSIGNED NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL COMMENT 'Lote de carga en que se insertó o actualizó',
+  `fecha_baja` DATETIME NULL DEFAULT NULL COMMENT 'Retirado del feed (at:deleted-entry); NULL si sigue vigente',
   PRIMARY KEY (`id_entry_num`),
+  INDEX `IDX_contrato_particion` (`fecha_adjudicacion` ASC, `fecha_carga` ASC) VISIBLE,
   INDEX `FK_tipo_contrato_idx` (`codigo_tipo_contrato` ASC) VISIBLE,
   INDEX `FK_contr_empresa_idx` (`contr_empresa_id` ASC) VISIBLE,
   INDEX `FK_contr_organo_idx` (`contr_organo_id` ASC) VISIBLE,
@@ -0,0 +1,123 @@
+-- Esquema para el backend embebido SQLite (DATABASE_URL=sqlite:///...)
+-- Traducción de ddl.sql: mismas tablas, columnas, claves e índices.
+--   INT UNSIGNED AUTO_INCREMENT -> INTEGER PRIMARY KEY (alias de rowid)
+--   DATETIME -> TEXT ISO 8601, DECIMAL -> NUMERIC, TINYINT(1) -> INTEGER
+--   Índices como sentencias CREATE INDEX separadas
+
+-- -----------------------------------------------------
+-- Table `empresa`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `empresa` (
+  `empresa_id` INTEGER PRIMARY KEY,
+  `nif_empresa` VARCHAR(150) NULL DEFAULT NULL,
+  `empresa_nombre` VARCHAR(580) NULL DEFAULT NULL,
+  `empresa_es_pyme` INTEGER NULL DEFAULT NULL,
+  `empresa_pais` VARCHAR(100) NULL DEFAULT NULL,
+  `empresa_clave` CHAR(64) NOT NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL,
+  CONSTRAINT `UQ_empresa_clave` UNIQUE (`empresa_clave`));
+
+
+-- -----------------------------------------------------
+-- Table `tipo_actividad_organo`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tipo_actividad_organo` (
+  `codigo_actividad_organo` VARCHAR(10) NOT NULL,
+  `nombre_actividad_organo` VARCHAR(255) NULL DEFAULT NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL,
+  PRIMARY KEY (`codigo_actividad_organo`));
+
+
+-- -----------------------------------------------------
+-- Table `tipo_organo`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tipo_organo` (
+  `codigo_tipo_organo` VARCHAR(10) NOT NULL,
+  `nombre_tipo_organo` VARCHAR(100) NULL DEFAULT NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL,
+  PRIMARY KEY (`codigo_tipo_organo`));
+
+
+-- -----------------------------------------------------
+-- Table `organo`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `organo` (
+  `organo_id` INTEGER PRIMARY KEY,
+  `organo_dir3` VARCHAR(20) NULL DEFAULT NULL,
+  `organo_nombre` VARCHAR(300) NULL DEFAULT NULL,
+  `tipo_organo_codigo` VARCHAR(10) NULL DEFAULT NULL,
+  `actividad_organo_codigo` VARCHAR(10) NULL DEFAULT NULL,
+  `organo_postalcode` VARCHAR(20) NULL DEFAULT NULL,
+  `organo_localidad` VARCHAR(255) NULL DEFAULT NULL,
+  `organo_email` VARCHAR(255) NULL DEFAULT NULL,
+  `organo_telefono` VARCHAR(30) NULL DEFAULT NULL,
+  `organo_nif` VARCHAR(20) NULL DEFAULT NULL,
+  `organo_clave` CHAR(64) NOT NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL,
+  CONSTRAINT `UQ_organo_clave` UNIQUE (`organo_clave`),
+  CONSTRAINT `FK_org_actividad_organo`
+    FOREIGN KEY (`actividad_organo_codigo`)
+    REFERENCES `tipo_actividad_organo` (`codigo_actividad_organo`),
+  CONSTRAINT `FK_org_tipo_organo`
+    FOREIGN KEY (`tipo_organo_codigo`)
+    REFERENCES `tipo_organo` (`codigo_tipo_organo`));
+
+CREATE INDEX IF NOT EXISTS `FK_org_tipoorg_idx`
+  ON `organo` (`tipo_organo_codigo`);
+CREATE INDEX IF NOT EXISTS `FK_org_actividad_organo_idx`
+  ON `organo` (`actividad_organo_codigo`);
+
+
+-- -----------------------------------------------------
+-- Table `tipo_contrato`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tipo_contrato` (
+  `codigo_tipo_contrato` VARCHAR(10) NOT NULL,
+  `nombre_contrato` VARCHAR(100) NOT NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL,
+  PRIMARY KEY (`codigo_tipo_contrato`));
+
+
+-- -----------------------------------------------------
+-- Table `contrato`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `contrato` (
+  `id_entry_num` VARCHAR(45) NOT NULL,
+  `id_entry` VARCHAR(255) NULL DEFAULT NULL,
+  `titulo` VARCHAR(4500) NULL DEFAULT NULL,
+  `id_licitacion` VARCHAR(120) NULL DEFAULT NULL,
+  `fecha_actualizacion` DATETIME NULL DEFAULT NULL,
+  `fecha_adjudicacion` DATETIME NULL DEFAULT NULL,
+  `estado` VARCHAR(30) NULL DEFAULT NULL,
+  `codigo_tipo_contrato` VARCHAR(10) NULL DEFAULT NULL,
+  `codigo_subtipo_contrato` VARCHAR(10) NULL DEFAULT NULL,
+  `importe_estimado` NUMERIC(15,2) NULL DEFAULT NULL,
+  `importe_total` NUMERIC(15,2) NULL DEFAULT NULL,
+  `importe_sin_impuestos` NUMERIC(15,2) NULL DEFAULT NULL,
+  `codigo_cpv_principal` VARCHAR(20) NULL DEFAULT NULL,
+  `codigo_region_nuts` VARCHAR(10) NULL DEFAULT NULL,
+  `ofertas_recibidas` INTEGER NULL DEFAULT NULL,
+  `id_plataforma` VARCHAR(50) NULL DEFAULT NULL,
+  `contr_organo_id` INTEGER NULL,
+  `contr_empresa_id` INTEGER NULL,
+  `fecha_carga` DATETIME NULL DEFAULT NULL,
+  `fecha_baja` DATETIME NULL DEFAULT NULL,
+  PRIMARY KEY (`id_entry_num`),
+  CONSTRAINT `FK_contr_empresa`
+    FOREIGN KEY (`contr_empresa_id`)
+    REFERENCES `empresa` (`empresa_id`),
+  CONSTRAINT `FK_contr_organo`
+    FOREIGN KEY (`contr_organo_id`)
+    REFERENCES `organo` (`organo_id`),
+  CONSTRAINT `FK_contr_tipo_contrato`
+    FOREIGN KEY (`codigo_tipo_contrato`)
+    REFERENCES `tipo_contrato` (`codigo_tipo_contrato`));
+
+CREATE INDEX IF NOT EXISTS `IDX_contrato_particion`
+  ON `contrato` (`fecha_adjudicacion`, `fecha_carga`);
+CREATE INDEX IF NOT EXISTS `FK_tipo_contrato_idx`
+  ON `contrato` (`codigo_tipo_contrato`);
+CREATE INDEX IF NOT EXISTS `FK_contr_empresa_idx`
+  ON `contrato` (`contr_empresa_id`);
+CREATE INDEX IF NOT EXISTS `FK_contr_organo_idx`
+  ON `contrato` (`contr_organo_id`);
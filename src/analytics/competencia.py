@@ -0,0 +1,537 @@
+"""
+Métricas de competencia por provincia (antes en el notebook de
+storytelling), calculadas sobre un cubo de agregados.
+
+Responsabilidad:
+- Segmentar los contratos por importe: umbral de contrato menor
+  (40.000 € obras / 15.000 € resto), excepción de 50.000 € y atípicos
+- Construir en una sola pasada un cubo provincia × mes × tipo de
+  contrato × tipo de órgano × segmento con contratos, importe y el
+  CONJUNTO EXACTO de empresas adjudicatarias de cada celda
+- Agregar el cubo a cualquier subconjunto de dimensiones y periodo
+  sin volver a leer contratos: los conjuntos de empresas se unen, de
+  modo que el número de empresas distintas es exacto
+- Calcular ratio contratos/empresa, `nivel_competencia` (cinco
+  niveles) y `score_oportunidad` (50/30/20)
+
+Los conjuntos de empresas se guardan como arrays ordenados de códigos
+enteros (índice en `Cubo.empresas`): unir celdas es concatenar y
+quitar duplicados, y el tamaño total es como mucho el número de pares
+(celda, empresa) distintos.
+
+Este módulo NO:
+- lee la base de datos (trabaja sobre el dataset exportado)
+- dibuja gráficos ni mapas (eso queda en el notebook)
+"""
+
+import argparse
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.geografia import (
+    IndiceGeografico,
+    cargar_indice,
+    cargar_provincias,
+    geocodificar,
+)
+from src.config import DATASET_PATH, EXPORT_DIR
+
+
+CUBO_PATH = EXPORT_DIR / "cubo_competencia.parquet"
+
+# Dimensiones del cubo (todas las consultas del notebook caben aquí)
+DIMENSIONES = (
+    "provincia",
+    "anio",
+    "mes",
+    "tipo_contrato",
+    "tipo_organo",
+    "segmento",
+)
+
+# Columnas del dataset exportado que necesita el cubo
+COLUMNAS_DATASET = [
+    "fecha_adjudicacion",
+    "tipo_contrato",
+    "tipo_organo",
+    "importe_sin_impuestos",
+    "empresa_nombre",
+    "organo_localidad",
+    "organo_postalcode",
+]
+
+# Umbrales de contrato menor (sin IVA)
+UMBRAL_OBRAS = 40_000
+UMBRAL_OTROS = 15_000
+UMBRAL_EXCEPCION = 50_000
+
+# Nivel de competencia según contratos por empresa (límite superior
+# incluido)
+NIVELES_COMPETENCIA = [
+    (2, "Muy Alta"),
+    (5, "Alta"),
+    (10, "Media"),
+    (20, "Baja"),
+    (np.inf, "Muy Baja"),
+]
+
+# Pesos del score de oportunidad: baja competencia, volumen, valor medio
+PESOS_SCORE = (0.5, 0.3, 0.2)
+
+
+class Cubo(NamedTuple):
+    """
+    Cubo de agregados de contratos.
+
+    - celdas: una fila por combinación de `dimensiones` con
+      num_contratos, importe_total, num_importes (importes no nulos,
+      para la media) y empresas (array ordenado de códigos)
+    - empresas: nombre de cada código de empresa
+    - dimensiones: columnas que identifican una celda
+    """
+    celdas: pd.DataFrame
+    empresas: list
+    dimensiones: tuple = DIMENSIONES
+
+
+# ======================================================
+# SEGMENTACIÓN
+# ======================================================
+
+def segmentar(df: pd.DataFrame) -> pd.Series:
+    """
+    Segmento de cada contrato según tipo e importe sin impuestos:
+    "umbral", "excepcion_50k" o "atipico" (incluye importes nulos).
+    """
+    importe = df["importe_sin_impuestos"]
+    es_obras = (
+        df["tipo_contrato"].astype(object).str.lower().str.strip()
+        .eq("obras")
+    )
+
+    umbral = (
+        (es_obras & (importe <= UMBRAL_OBRAS))
+        | (~es_obras & (importe <= UMBRAL_OTROS))
+    )
+    excepcion = ~es_obras & importe.between(UMBRAL_OTROS, UMBRAL_EXCEPCION)
+
+    return pd.Series(
+        np.select(
+            [umbral, excepcion],
+            ["umbral", "excepcion_50k"],
+            default="atipico"
+        ),
+        index=df.index
+    )
+
+
+# ======================================================
+# CONSTRUCCIÓN DEL CUBO
+# ======================================================
+
+def _conjuntos(
+    grupos,
+    empresas: np.ndarray,
+    grupo: np.ndarray
+) -> pd.Series:
+    """
+    Conjunto ordenado de empresas (códigos >= 0) de cada grupo.
+
+    `grupo` es el número de grupo (`ngroup`) de cada código de
+    `empresas`; el resultado sigue el orden de los grupos.
+    """
+    validas = empresas >= 0
+    empresas, grupo = empresas[validas], grupo[validas]
+
+    orden = np.lexsort((empresas, grupo))
+    empresas, grupo = empresas[orden], grupo[orden]
+
+    # Pares (grupo, empresa) distintos
+    nuevo = np.ones(len(grupo), dtype=bool)
+    nuevo[1:] = (grupo[1:] != grupo[:-1]) | (empresas[1:] != empresas[:-1])
+    empresas, grupo = empresas[nuevo], grupo[nuevo]
+
+    cortes = np.searchsorted(grupo, np.arange(1, grupos.ngroups))
+    conjuntos = np.split(empresas.astype(np.int32), cortes)
+
+    # Serie de objetos: pandas no debe convertirla en una matriz
+    serie = pd.Series(index=range(grupos.ngroups), dtype=object)
+    serie[:] = conjuntos if grupos.ngroups else []
+    return serie
+
+
+def _fusionar(celdas: pd.DataFrame, por: list) -> pd.DataFrame:
+    """
+    Agrega celdas del cubo por las dimensiones `por`, sumando
+    contadores y uniendo los conjuntos de empresas.
+    """
+    grupos = celdas.groupby(list(por), dropna=False, observed=True, sort=True)
+
+    resultado = grupos.agg(
+        num_contratos=("num_contratos", "sum"),
+        importe_total=("importe_total", "sum"),
+        num_importes=("num_importes", "sum"),
+    ).reset_index()
+
+    conjuntos = celdas["empresas"].to_list()
+    longitudes = [len(conjunto) for conjunto in conjuntos]
+    resultado["empresas"] = _conjuntos(
+        grupos,
+        np.concatenate(conjuntos) if conjuntos else np.array([], np.int32),
+        np.repeat(grupos.ngroup().to_numpy(), longitudes)
+    )
+
+    return resultado
+
+
+def _celdas_lote(
+    df: pd.DataFrame,
+    dimensiones: tuple,
+    codigos: dict,
+    indice: IndiceGeografico
+) -> pd.DataFrame:
+    """
+    Celdas de un lote del dataset, con las empresas codificadas
+    mediante `codigos` (que se amplía con las empresas nuevas).
+    """
+    fecha = pd.to_datetime(df["fecha_adjudicacion"], errors="coerce")
+
+    columnas = {
+        "provincia": lambda: geocodificar(
+            df["organo_localidad"], df["organo_postalcode"], indice,
+            informar=False
+        )["provincia"],
+        "anio": lambda: fecha.dt.year.astype("Int16"),
+        "mes": lambda: fecha.dt.month.astype("Int8"),
+        "segmento": lambda: segmentar(df),
+    }
+    claves = pd.DataFrame({
+        dimension: (
+            columnas[dimension]() if dimension in columnas
+            else df[dimension].astype(object)
+        )
+        for dimension in dimensiones
+    })
+
+    nombres = df["empresa_nombre"].astype(object)
+    for nombre in nombres.dropna().unique():
+        codigos.setdefault(nombre, len(codigos))
+
+    claves["num_contratos"] = 1
+    claves["importe_total"] = df["importe_sin_impuestos"].fillna(0)
+    claves["num_importes"] = df["importe_sin_impuestos"].notna().astype(int)
+    claves["empresa"] = nombres.map(codigos).fillna(-1).astype(np.int32)
+
+    grupos = claves.groupby(
+        list(dimensiones), dropna=False, observed=True, sort=True
+    )
+    celdas = grupos.agg(
+        num_contratos=("num_contratos", "sum"),
+        importe_total=("importe_total", "sum"),
+        num_importes=("num_importes", "sum"),
+    ).reset_index()
+
+    celdas["empresas"] = _conjuntos(
+        grupos,
+        claves["empresa"].to_numpy(),
+        grupos.ngroup().to_numpy()
+    )
+
+    return celdas
+
+
+def construir_cubo(
+    lotes: Iterable[pd.DataFrame],
+    dimensiones: tuple = DIMENSIONES,
+    indice: Optional[IndiceGeografico] = None
+) -> Cubo:
+    """
+    Construye el cubo recorriendo una sola vez los contratos.
+
+    Parameters
+    ----------
+    lotes : iterable of pd.DataFrame
+        Contratos del dataset exportado (al menos `COLUMNAS_DATASET`),
+        en uno o varios lotes
+    dimensiones : tuple
+        Dimensiones de las celdas. Además de columnas del dataset
+        admite "provincia", "anio", "mes" y "segmento" (derivadas);
+        por ejemplo, añadir "organo_postalcode" da el desglose por
+        código postal
+    indice : IndiceGeografico, optional
+        Índice para geocodificar la provincia del órgano (por defecto,
+        el de `cargar_indice`)
+
+    Returns
+    -------
+    Cubo
+    """
+    if indice is None:
+        indice = cargar_indice()
+
+    codigos = {}
+    parciales = [
+        _celdas_lote(lote, dimensiones, codigos, indice)
+        for lote in lotes
+        if not lote.empty
+    ]
+
+    if not parciales:
+        celdas = pd.DataFrame(
+            columns=[*dimensiones, "num_contratos", "importe_total",
+                     "num_importes", "empresas"]
+        )
+    elif len(parciales) == 1:
+        celdas = parciales[0]
+    else:
+        celdas = _fusionar(pd.concat(parciales, ignore_index=True),
+                           dimensiones)
+
+    print(f"Cubo: {len(celdas)} celdas, {len(codigos)} empresas")
+    if "provincia" in dimensiones and len(celdas):
+        con_provincia = celdas.loc[
+            celdas["provincia"].notna(), "num_contratos"
+        ].sum()
+        tasa = con_provincia / celdas["num_contratos"].sum()
+        print(f"Geocodificación: {tasa:.1%} de contratos con provincia")
+
+    return Cubo(celdas, list(codigos), tuple(dimensiones))
+
+
+def _lotes_dataset(path: Path, columnas: list):
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    for batch in dataset.to_batches(columns=columnas):
+        yield batch.to_pandas()
+
+
+def cubo_desde_dataset(
+    path: Path = DATASET_PATH,
+    dimensiones: tuple = DIMENSIONES
+) -> Cubo:
+    """
+    Construye el cubo leyendo por lotes el dataset Parquet exportado.
+    """
+    return construir_cubo(
+        _lotes_dataset(path, COLUMNAS_DATASET),
+        dimensiones
+    )
+
+
+# ======================================================
+# PERSISTENCIA
+# ======================================================
+
+def _ruta_empresas(path: Path) -> Path:
+    return path.with_name(f"{path.stem}_empresas.parquet")
+
+
+def guardar_cubo(cubo: Cubo, path: Path = CUBO_PATH) -> None:
+    """
+    Guarda las celdas (conjuntos como listas de enteros) y, al lado,
+    el diccionario de empresas.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    cubo.celdas.to_parquet(path, index=False)
+    pd.DataFrame({"empresa_nombre": cubo.empresas}).to_parquet(
+        _ruta_empresas(path), index=False
+    )
+
+    print(f"Cubo guardado en {path}")
+
+
+def cargar_cubo(path: Path = CUBO_PATH) -> Cubo:
+    celdas = pd.read_parquet(path)
+    empresas = pd.read_parquet(_ruta_empresas(path))["empresa_nombre"]
+
+    dimensiones = tuple(
+        columna for columna in celdas.columns
+        if columna not in (
+            "num_contratos", "importe_total", "num_importes", "empresas"
+        )
+    )
+    return Cubo(celdas, empresas.to_list(), dimensiones)
+
+
+# ======================================================
+# CONSULTAS
+# ======================================================
+
+def clasificar_competencia(ratio: pd.Series) -> pd.Series:
+    """
+    Nivel de competencia según contratos por empresa: cuanto menor el
+    ratio, más empresas compiten por cada contrato.
+    """
+    limites = [-np.inf] + [limite for limite, _ in NIVELES_COMPETENCIA]
+    etiquetas = [nivel for _, nivel in NIVELES_COMPETENCIA]
+
+    return pd.cut(ratio, bins=limites, labels=etiquetas, right=True)
+
+
+def _mes(periodo: str) -> int:
+    anio, mes = periodo.split("-")
+    return int(anio) * 100 + int(mes)
+
+
+def agregar(
+    cubo: Cubo,
+    por: list,
+    segmento: Optional[str] = "umbral",
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    **filtros
+) -> pd.DataFrame:
+    """
+    Agrega el cubo por las dimensiones `por` y calcula las métricas de
+    competencia.
+
+    Parameters
+    ----------
+    cubo : Cubo
+    por : list
+        Dimensiones del resultado (p. ej. ["provincia", "tipo_organo"])
+    segmento : str, optional
+        Segmento de importe ("umbral", "excepcion_50k", "atipico");
+        None para todos
+    desde, hasta : str, optional
+        Primer y último mes incluidos, "AAAA-MM"
+    **filtros
+        Valor (o lista de valores) exigido en otras dimensiones, p. ej.
+        tipo_contrato="Obras"
+
+    Returns
+    -------
+    pd.DataFrame
+        num_contratos, num_empresas, importe_total, importe_medio,
+        ratio_contratos_empresa, indice_concentracion y
+        nivel_competencia por cada combinación de `por`
+    """
+    celdas = cubo.celdas
+    mascara = pd.Series(True, index=celdas.index)
+
+    if segmento is not None:
+        filtros["segmento"] = segmento
+    for dimension, valor in filtros.items():
+        valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+        mascara &= celdas[dimension].isin(valores)
+
+    if desde or hasta:
+        mes = celdas["anio"].astype(float) * 100 + celdas["mes"].astype(float)
+        if desde:
+            mascara &= mes >= _mes(desde)
+        if hasta:
+            mascara &= mes <= _mes(hasta)
+
+    resultado = _fusionar(celdas[mascara], por)
+
+    resultado["num_empresas"] = resultado["empresas"].map(len)
+    resultado["importe_medio"] = (
+        resultado["importe_total"]
+        / resultado["num_importes"].where(resultado["num_importes"] > 0)
+    )
+    resultado["ratio_contratos_empresa"] = (
+        resultado["num_contratos"]
+        / resultado["num_empresas"].where(resultado["num_empresas"] > 0)
+    )
+    resultado["indice_concentracion"] = (
+        resultado["ratio_contratos_empresa"] / resultado["num_contratos"]
+    )
+    resultado["nivel_competencia"] = clasificar_competencia(
+        resultado["ratio_contratos_empresa"]
+    )
+
+    return resultado.drop(columns=["empresas", "num_importes"])
+
+
+def score_oportunidad(df: pd.DataFrame) -> pd.Series:
+    """
+    Score compuesto: baja competencia (ratio), volumen relativo y
+    valor medio relativo, con pesos `PESOS_SCORE`.
+    """
+    peso_ratio, peso_volumen, peso_valor = PESOS_SCORE
+
+    return (
+        df["ratio_contratos_empresa"] * peso_ratio
+        + df["num_contratos"] / df["num_contratos"].max() * 100
+        * peso_volumen
+        + df["importe_medio"] / df["importe_medio"].max() * 100
+        * peso_valor
+    )
+
+
+def competencia_provincial(
+    cubo: Cubo,
+    provincias: Optional[pd.DataFrame] = None,
+    **kwargs
+) -> pd.DataFrame:
+    """
+    Métricas de competencia y score de oportunidad por provincia
+    (argumentos de filtro como en `agregar`), con comunidad y
+    centroide si se pasa la tabla de `cargar_provincias`.
+    """
+    df = agregar(cubo, ["provincia"], **kwargs)
+    df = df[df["provincia"].notna()].reset_index(drop=True)
+    df["score_oportunidad"] = score_oportunidad(df)
+
+    if provincias is not None:
+        df = df.merge(
+            provincias[["provincia", "comunidad", "latitud", "longitud"]],
+            on="provincia",
+            how="left"
+        )
+
+    return df
+
+
+# ======================================================
+# CLI
+# ======================================================
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Construye el cubo de competencia del dataset"
+    )
+    parser.add_argument(
+        "--desde",
+        help="primer mes del ranking (AAAA-MM)",
+    )
+    parser.add_argument(
+        "--hasta",
+        help="último mes del ranking (AAAA-MM)",
+    )
+    parser.add_argument(
+        "--min-contratos",
+        type=int,
+        default=100,
+        help="contratos mínimos de una provincia para el ranking",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    cubo = cubo_desde_dataset()
+    guardar_cubo(cubo)
+
+    ranking = competencia_provincial(
+        cubo,
+        provincias=cargar_provincias(),
+        desde=args.desde,
+        hasta=args.hasta
+    )
+    ranking = (
+        ranking[ranking["num_contratos"] >= args.min_contratos]
+        .sort_values("score_oportunidad", ascending=False)
+    )
+
+    print("\nProvincias por score de oportunidad:")
+    print(ranking[[
+        "provincia", "comunidad", "num_contratos", "num_empresas",
+        "ratio_contratos_empresa", "nivel_competencia", "score_oportunidad"
+    ]].head(20).to_string(index=False))
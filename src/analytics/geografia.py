@@ -0,0 +1,363 @@
+"""
+Geocodificación de los órganos de contratación: provincia, comunidad
+y coordenadas a partir de `organo_localidad` y `organo_postalcode`.
+
+Responsabilidad:
+- Construir un índice de `LOCALIDADES_PATH` con los nombres de
+  municipio tal cual (minúsculas) y normalizados (sin acentos ni
+  signos), incluidas sus variantes ("Ejido (El)" -> "El Ejido",
+  nombres bilingües "A/B")
+- Resolver cada valor distinto una sola vez, en este orden:
+    1. municipio (desambiguado por la provincia del código postal o
+       de un "(PROVINCIA)" final)
+    2. provincia escrita en el texto
+    3. provincia de los dos primeros dígitos del código postal
+  Con municipio se usan sus coordenadas; si no, el centroide de la
+  provincia
+- Informar de la tasa de acierto
+
+Este módulo NO:
+- calcula métricas de competencia (ver src.analytics.competencia)
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+from src.config import LOCALIDADES_PATH, MAPA_PROVINCIA_CP
+
+
+COLUMNAS_LOCALIDADES = [
+    "comunidad",
+    "provincia",
+    "localidad",
+    "latitud",
+    "longitud",
+]
+
+# Otros nombres de provincia que aparecen en los feeds
+ALIAS_PROVINCIAS = {
+    "Araba": "Álava",
+    "Baleares": "Illes Balears",
+    "Islas Baleares": "Illes Balears",
+    "Bizkaia": "Vizcaya",
+    "Gipuzkoa": "Guipúzcoa",
+    "Gerona": "Girona",
+    "Lérida": "Lleida",
+    "Orense": "Ourense",
+    "La Coruña": "A Coruña",
+    "Coruña": "A Coruña",
+    "Nafarroa": "Navarra",
+}
+
+# Artículos que el nomenclátor pospone entre paréntesis: "Ejido (El)"
+_ARTICULOS = {
+    "el", "la", "los", "las", "l'", "les", "els", "lo",
+    "o", "a", "os", "as", "es", "sa", "ses", "s'",
+}
+
+_PARENTESIS_FINAL = re.compile(r"^(.*?)\s*\(([^)]*)\)\s*$")
+
+# Columnas del resultado de `geocodificar`
+COLUMNAS_GEO = ["provincia", "comunidad", "latitud", "longitud", "metodo"]
+
+
+class Lugar(NamedTuple):
+    provincia: str
+    latitud: float
+    longitud: float
+
+
+class IndiceGeografico(NamedTuple):
+    """
+    Índice de `LOCALIDADES_PATH`.
+
+    - exacto: variante en minúsculas -> municipios
+    - normalizado: variante normalizada -> municipios
+    - provincias: nombre normalizado (y alias) -> provincia
+    - centroides: provincia -> (comunidad, latitud, longitud)
+    """
+    exacto: dict
+    normalizado: dict
+    provincias: dict
+    centroides: dict
+
+
+# ======================================================
+# NORMALIZACIÓN
+# ======================================================
+
+@lru_cache(maxsize=None)
+def _normalizar(texto: str) -> str:
+    texto = texto.lower().strip()
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r"[^a-z0-9\s]", "", texto)
+    return re.sub(r"\s+", " ", texto)
+
+
+def normalizar_texto(texto) -> Optional[str]:
+    """
+    Normaliza texto para comparar: minúsculas, sin acentos y sin
+    caracteres especiales. Memoriza cada texto distinto.
+    """
+    if pd.isna(texto):
+        return None
+    return _normalizar(str(texto))
+
+
+def _con_articulo(articulo: str, nombre: str) -> str:
+    separador = "" if articulo.endswith("'") else " "
+    return f"{articulo}{separador}{nombre}"
+
+
+def _variantes(texto: str) -> tuple:
+    """
+    Formas de un nombre de municipio, más la pista de provincia que
+    lleve entre paréntesis (None si no hay).
+
+    "Ejido (El)" -> ("El Ejido", "Ejido"), "Majadahonda (Madrid)" ->
+    ("Majadahonda",) con pista "Madrid", "A/B" -> ("A/B", "A", "B").
+    """
+    texto = texto.strip()
+    variantes = [texto]
+    pista = None
+
+    match = _PARENTESIS_FINAL.match(texto)
+    if match:
+        nombre, parentesis = match.group(1), match.group(2).strip()
+        if parentesis.lower() in _ARTICULOS:
+            variantes = [_con_articulo(parentesis, nombre), nombre]
+        else:
+            variantes = [nombre]
+            pista = parentesis
+
+    for variante in list(variantes):
+        if "/" in variante:
+            variantes.extend(
+                parte.strip() for parte in variante.split("/")
+                if parte.strip()
+            )
+
+    return tuple(variantes), pista
+
+
+# ======================================================
+# ÍNDICE
+# ======================================================
+
+def cargar_localidades(path: Path = LOCALIDADES_PATH) -> pd.DataFrame:
+    return pd.read_csv(
+        path,
+        sep=";",
+        encoding="utf-8",
+        header=None,
+        usecols=range(len(COLUMNAS_LOCALIDADES)),
+        names=COLUMNAS_LOCALIDADES
+    )
+
+
+def cargar_provincias(path: Path = LOCALIDADES_PATH) -> pd.DataFrame:
+    """
+    Una fila por provincia: comunidad, centroide de sus municipios y
+    nombre normalizado (`provincia_norm`).
+    """
+    provincias = (
+        cargar_localidades(path)
+        .groupby("provincia")
+        .agg(
+            latitud=("latitud", "mean"),
+            longitud=("longitud", "mean"),
+            comunidad=("comunidad", "first")
+        )
+        .reset_index()
+    )
+
+    provincias["provincia_norm"] = (
+        provincias["provincia"].map(normalizar_texto)
+    )
+
+    return provincias
+
+
+@lru_cache(maxsize=None)
+def cargar_indice(path: Path = LOCALIDADES_PATH) -> IndiceGeografico:
+    """
+    Construye (una vez por ruta) el índice geográfico.
+    """
+    localidades = cargar_localidades(path)
+
+    exacto, normalizado = {}, {}
+    for fila in localidades.itertuples(index=False):
+        lugar = Lugar(fila.provincia, fila.latitud, fila.longitud)
+        variantes, _ = _variantes(fila.localidad)
+        for variante in variantes:
+            for indice, clave in (
+                (exacto, variante.lower()),
+                (normalizado, _normalizar(variante)),
+            ):
+                lugares = indice.setdefault(clave, [])
+                if lugar not in lugares:
+                    lugares.append(lugar)
+
+    provincias = cargar_provincias(path)
+    centroides = {
+        fila.provincia: (fila.comunidad, fila.latitud, fila.longitud)
+        for fila in provincias.itertuples(index=False)
+    }
+
+    nombres = {}
+    for provincia in centroides:
+        variantes, _ = _variantes(provincia)
+        for variante in variantes:
+            nombres[_normalizar(variante)] = provincia
+    for alias, provincia in ALIAS_PROVINCIAS.items():
+        nombres[_normalizar(alias)] = provincia
+
+    return IndiceGeografico(exacto, normalizado, nombres, centroides)
+
+
+# ======================================================
+# RESOLUCIÓN
+# ======================================================
+
+def _provincia_de_cp(codigo_postal: str) -> Optional[str]:
+    codigo_postal = codigo_postal.strip()
+    if len(codigo_postal) == 4 and codigo_postal.isdigit():
+        # Códigos leídos como número: "06071" -> 6071
+        codigo_postal = "0" + codigo_postal
+    if len(codigo_postal) != 5 or not codigo_postal.isdigit():
+        return None
+    return MAPA_PROVINCIA_CP.get(codigo_postal[:2])
+
+
+def _lugares(indice: IndiceGeografico, variante: str) -> list:
+    return (
+        indice.exacto.get(variante.lower())
+        or indice.normalizado.get(_normalizar(variante), [])
+    )
+
+
+def _en_provincia(indice: IndiceGeografico, provincia: str, metodo: str):
+    comunidad, latitud, longitud = indice.centroides[provincia]
+    return provincia, comunidad, latitud, longitud, metodo
+
+
+def _resolver(
+    indice: IndiceGeografico,
+    localidad: str,
+    codigo_postal: str
+) -> tuple:
+    """
+    Geocodifica un par (localidad, código postal) distinto.
+    """
+    provincia_cp = _provincia_de_cp(codigo_postal)
+    variantes, pista = _variantes(localidad)
+    provincia_pista = (
+        indice.provincias.get(_normalizar(pista)) if pista else None
+    )
+    preferida = provincia_pista or provincia_cp
+
+    for variante in variantes:
+        lugares = _lugares(indice, variante)
+        if preferida:
+            # Un municipio de otra provincia es un homónimo
+            lugares = [
+                lugar for lugar in lugares if lugar.provincia == preferida
+            ]
+        if len(lugares) == 1:
+            lugar = lugares[0]
+            comunidad = indice.centroides[lugar.provincia][0]
+            return (
+                lugar.provincia, comunidad, lugar.latitud, lugar.longitud,
+                "localidad"
+            )
+
+    if provincia_pista:
+        return _en_provincia(indice, provincia_pista, "provincia")
+
+    provincia_texto = indice.provincias.get(_normalizar(localidad))
+    if provincia_texto:
+        return _en_provincia(indice, provincia_texto, "provincia")
+
+    if provincia_cp:
+        return _en_provincia(indice, provincia_cp, "codigo_postal")
+
+    return None, None, None, None, None
+
+
+def geocodificar(
+    localidades: pd.Series,
+    codigos_postales: Optional[pd.Series] = None,
+    indice: Optional[IndiceGeografico] = None,
+    informar: bool = True
+) -> pd.DataFrame:
+    """
+    Geocodifica localidades de órganos de contratación.
+
+    Parameters
+    ----------
+    localidades : pd.Series
+        `organo_localidad`
+    codigos_postales : pd.Series, optional
+        `organo_postalcode`, alineada con `localidades`
+    indice : IndiceGeografico, optional
+        Índice de `cargar_indice` (por defecto, el de
+        `LOCALIDADES_PATH`)
+    informar : bool
+        Imprimir la tasa de acierto
+
+    Returns
+    -------
+    pd.DataFrame
+        `COLUMNAS_GEO` con el índice de `localidades`. `metodo` indica
+        cómo se resolvió: "localidad", "provincia", "codigo_postal"
+        o nulo si no se reconoce
+    """
+    if indice is None:
+        indice = cargar_indice()
+    if codigos_postales is None:
+        codigos_postales = pd.Series("", index=localidades.index)
+
+    pares = pd.MultiIndex.from_arrays([
+        localidades.astype(object).fillna("").astype(str),
+        codigos_postales.astype(object).fillna("").astype(str),
+    ])
+    codigos, unicos = pares.factorize()
+
+    resueltos = pd.DataFrame(
+        [_resolver(indice, localidad, cp) for localidad, cp in unicos],
+        columns=COLUMNAS_GEO
+    )
+
+    geo = resueltos.take(codigos)
+    geo.index = localidades.index
+
+    if informar:
+        print(
+            f"Geocodificación: {len(unicos)} valores distintos, "
+            f"{tasa_acierto(geo):.1%} de filas con provincia "
+            f"({_resumen_metodos(geo)})"
+        )
+
+    return geo
+
+
+def tasa_acierto(geo: pd.DataFrame) -> float:
+    """
+    Fracción de filas de `geocodificar` con provincia.
+    """
+    if geo.empty:
+        return 0.0
+    return float(geo["provincia"].notna().mean())
+
+
+def _resumen_metodos(geo: pd.DataFrame) -> str:
+    conteo = geo["metodo"].value_counts()
+    return ", ".join(
+        f"{metodo} {n / len(geo):.1%}" for metodo, n in conteo.items()
+    )
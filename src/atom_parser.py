@@ -2,9 +2,13 @@
 Parser de archivos .atom de la Plataforma de Contratación del Sector Público.
 
 Responsabilidad:
-- Leer archivos .atom (XML)
-- Extraer la información relevante de cada <entry>
-- Devolver los datos en forma de pandas.DataFrame
+- Leer archivos .atom (XML) de forma incremental (iterparse), también
+  comprimidos (.atom.gz) o dentro de paquetes .zip / tar
+- Extraer la información relevante de cada <entry> en columnas
+- Extraer las bajas (<at:deleted-entry>) como filas con `fecha_baja`
+  (id_entry = ref, fecha_actualizacion = fecha_baja = when)
+- Convertir tipos por columna (vectorizado) una vez por lote
+- Devolver los datos en forma de pandas.DataFrame (completo o por lotes)
 
 Este módulo NO:
 - limpia datos
@@ -13,18 +17,36 @@ Este módulo NO:
 """
 
 import xml.etree.ElementTree as ET
-from collections import defaultdict
+from datetime import datetime
 from pathlib import Path
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Union,
+)
 import re
 
 import pandas as pd
 
 from src.config import (
     XML_NAMESPACES,
+    PARSE_BATCH_SIZE,
+    ZONA_HORARIA,
     MAPA_TIPO_CONTRATO,
     MAPA_TIPO_ORGANO,
     MAPA_ACTIVIDAD_ORGANO,
 )
+from src.fuentes import (
+    FuenteAtom,
+    como_fuente,
+    es_paquete,
+    fuentes_de_paquete,
+)
+from src.metricas import registrar_parseo
+from src.transform.tipos import a_booleanos, a_enteros
 
 
 # ======================================================
@@ -82,298 +104,582 @@ def get_text(element, path, default=None):
 
 
 # ======================================================
-# PARSEO DE UN ENTRY
+# ESPECIFICACIÓN DE CAMPOS
 # ======================================================
 
-def parse_entry(entry):
+class Campo(NamedTuple):
     """
-    Parsea un elemento <entry> de un feed Atom y devuelve un diccionario
-    con los campos extraídos.
+    Definición declarativa de una columna extraída de un <entry>.
+
+    - ruta: path relativo al <entry> con prefijos de `XML_NAMESPACES`
+    - conversor: función vectorizada aplicada a la columna completa
+      de cada lote (None = texto tal cual)
+    - mapa: diccionario código -> descripción; la columna se deriva
+      del código leído en la misma ruta, sin volver a leer el XML
+    - atributo: nombre del atributo a leer en lugar del texto
+    - esquema: valor de schemeName/schemeID que debe tener el nodo
+    """
+    columna: str
+    ruta: str
+    conversor: Optional[Callable] = None
+    mapa: Optional[dict] = None
+    atributo: Optional[str] = None
+    esquema: Optional[str] = None
+
+
+def _a_fechas(serie: pd.Series) -> pd.Series:
     """
-    data = defaultdict(lambda: None)
+    Convierte una columna de fechas ISO 8601 en datetime64.
 
+    Las fechas con zona horaria se expresan en hora local
+    (`ZONA_HORARIA`) sin zona, que es lo que almacena un DATETIME.
+    """
     try:
-        # ----------------------------------------------
-        # Identificadores básicos del entry
-        # ----------------------------------------------
-        data["id_entry"] = get_text(entry, "atom:id")
-        data["titulo"] = get_text(entry, "atom:title")
-        data["fecha_actualizacion"] = pd.to_datetime(
-            get_text(entry, "atom:updated"),
-            errors="coerce"
+        fechas = pd.to_datetime(serie, errors="coerce", format="ISO8601")
+    except ValueError:
+        # Offsets distintos en el mismo lote (horario de verano/invierno)
+        fechas = pd.to_datetime(
+            serie, errors="coerce", format="ISO8601", utc=True
         )
 
-        # ----------------------------------------------
-        # Información embebida en <atom:summary>
-        # ----------------------------------------------
-        summary_text = get_text(entry, "atom:summary") or ""
+    if fechas.dt.tz is not None:
+        fechas = fechas.dt.tz_convert(ZONA_HORARIA).dt.tz_localize(None)
 
-        id_match = re.search(
-            r"(?i)Id\s*licitaci[oó]n:\s*([^;]+)",
-            summary_text
-        )
-        organo_match = re.search(
-            r"(?i)[ÓO]rgano\s*de\s*Contrataci[oó]n:\s*([^;]+)",
-            summary_text
-        )
-        importe_match = re.search(
-            r"(?i)Importe:\s*([-\d\.,\s€]+)",
-            summary_text
-        )
-        estado_match = re.search(
-            r"(?i)Estado:\s*([^;]+)",
-            summary_text
-        )
+    return fechas
 
-        data["id_licitacion"] = (
-            id_match.group(1).strip() if id_match else None
-        )
-        data["organo_contratacion_resumen"] = (
-            organo_match.group(1).strip() if organo_match else None
-        )
-        data["importe_resumen"] = (
-            safe_float(importe_match.group(1)) if importe_match else None
-        )
-        data["estado_resumen"] = (
-            estado_match.group(1).strip() if estado_match else None
-        )
 
-        # ----------------------------------------------
-        # ContractFolderStatus
-        # ----------------------------------------------
-        cfs = entry.find(
-            "cac_place_ext:ContractFolderStatus",
-            XML_NAMESPACES
-        )
+def _a_importes(serie: pd.Series) -> pd.Series:
+    """
+    Equivalente vectorizado de `safe_float` para una columna completa.
+    """
+    limpio = serie.str.strip().str.replace(r"[^\d.\-]", "", regex=True)
+    invalido = (
+        limpio.isin(["", "-", "."])
+        | (limpio.str.count(r"\.") > 1)
+    )
+
+    return pd.to_numeric(limpio.mask(invalido), errors="coerce")
+
+
+_CFS = "cac_place_ext:ContractFolderStatus"
+_LCP = f"{_CFS}/cac_place_ext:LocatedContractingParty"
+_PARTY = f"{_LCP}/cac:Party"
+_PP = f"{_CFS}/cac:ProcurementProject"
+_TRS = f"{_CFS}/cac:TenderResult"
+_ATP = f"{_TRS}/cac:AwardedTenderedProject/cac:LegalMonetaryTotal"
+
+# Campo interno con el texto de <atom:summary> (no se emite como columna)
+_RESUMEN = "_resumen"
+
+CAMPOS_ENTRY = [
+    # Identificadores básicos del entry
+    Campo("id_entry", "atom:id"),
+    Campo("titulo", "atom:title"),
+    Campo("fecha_actualizacion", "atom:updated", _a_fechas),
+    Campo(_RESUMEN, "atom:summary"),
+
+    # ContractFolderStatus
+    Campo("id_expediente", f"{_CFS}/cbc:ContractFolderID"),
+    Campo("estado", f"{_CFS}/cbc_place_ext:ContractFolderStatusCode"),
+
+    # Órgano de contratación
+    Campo("tipo_organo_codigo", f"{_LCP}/cbc:ContractingPartyTypeCode"),
+    Campo(
+        "tipo_organo_nombre", f"{_LCP}/cbc:ContractingPartyTypeCode",
+        mapa=MAPA_TIPO_ORGANO
+    ),
+    Campo("actividad_organo_codigo", f"{_LCP}/cbc:ActivityCode"),
+    Campo(
+        "actividad_organo_nombre", f"{_LCP}/cbc:ActivityCode",
+        mapa=MAPA_ACTIVIDAD_ORGANO
+    ),
+    Campo("id_dir3", f"{_PARTY}/cac:PartyIdentification/cbc:ID",
+          esquema="DIR3"),
+    Campo("nif_organo", f"{_PARTY}/cac:PartyIdentification/cbc:ID",
+          esquema="NIF"),
+    Campo("id_plataforma", f"{_PARTY}/cac:PartyIdentification/cbc:ID",
+          esquema="ID_PLATAFORMA"),
+    Campo("nombre_organo", f"{_PARTY}/cac:PartyName/cbc:Name"),
+    Campo("codigo_postal_organo",
+          f"{_PARTY}/cac:PostalAddress/cbc:PostalZone"),
+    Campo("localidad_organo", f"{_PARTY}/cac:PostalAddress/cbc:CityName"),
+    Campo("pais_organo",
+          f"{_PARTY}/cac:PostalAddress/cac:Country/cbc:Name"),
+    Campo("email_organo", f"{_PARTY}/cac:Contact/cbc:ElectronicMail"),
+    Campo("telefono_organo", f"{_PARTY}/cac:Contact/cbc:Telephone"),
+
+    # Proyecto de contratación
+    Campo("objeto_contrato", f"{_PP}/cbc:Name"),
+    Campo("codigo_tipo_contrato", f"{_PP}/cbc:TypeCode"),
+    Campo("nombre_tipo_contrato", f"{_PP}/cbc:TypeCode",
+          mapa=MAPA_TIPO_CONTRATO),
+    Campo("codigo_subtipo_contrato", f"{_PP}/cbc:SubTypeCode"),
+    Campo("importe_estimado",
+          f"{_PP}/cac:BudgetAmount/cbc:EstimatedOverallContractAmount",
+          _a_importes),
+    Campo("importe_total", f"{_PP}/cac:BudgetAmount/cbc:TotalAmount",
+          _a_importes),
+    Campo("importe_sin_impuestos",
+          f"{_PP}/cac:BudgetAmount/cbc:TaxExclusiveAmount", _a_importes),
+    Campo("codigo_cpv_principal",
+          f"{_PP}/cac:RequiredCommodityClassification/"
+          "cbc:ItemClassificationCode"),
+    Campo("codigo_region_nuts",
+          f"{_PP}/cac:RealizedLocation/cbc:CountrySubentityCode"),
+    Campo("duracion_contrato_valor",
+          f"{_PP}/cac:PlannedPeriod/cbc:ContractDurationMeasure"),
+    Campo("duracion_contrato_unidad",
+          f"{_PP}/cac:PlannedPeriod/cbc:ContractDurationMeasure",
+          atributo="unitCode"),
+
+    # Resultado de la licitación
+    Campo("fecha_adjudicacion", f"{_TRS}/cbc:AwardDate", _a_fechas),
+    Campo("ofertas_recibidas", f"{_TRS}/cbc:ReceivedTenderQuantity",
+          a_enteros),
+    Campo("es_pyme_empresa", f"{_TRS}/cbc:SMEAwardedIndicator",
+          a_booleanos),
+    Campo("nif_empresa",
+          f"{_TRS}/cac:WinningParty/cac:PartyIdentification/cbc:ID"),
+    Campo("empresa_ganadora",
+          f"{_TRS}/cac:WinningParty/cac:PartyName/cbc:Name"),
+    Campo("pais_empresa",
+          f"{_TRS}/cac:WinningParty/cac:PhysicalLocation/cac:Address/"
+          "cac:Country/cbc:IdentificationCode"),
+    Campo("importe_adjudicado_con_IVA", f"{_ATP}/cbc:PayableAmount",
+          _a_importes),
+    Campo("importe_adjudicado_sin_IVA", f"{_ATP}/cbc:TaxExclusiveAmount",
+          _a_importes),
+]
+
+# Información embebida en <atom:summary>: (columna, patrón, conversor)
+CAMPOS_RESUMEN = [
+    ("id_licitacion",
+     re.compile(r"(?i)Id\s*licitaci[oó]n:\s*([^;]+)"), None),
+    ("organo_contratacion_resumen",
+     re.compile(r"(?i)[ÓO]rgano\s*de\s*Contrataci[oó]n:\s*([^;]+)"), None),
+    ("importe_resumen",
+     re.compile(r"(?i)Importe:\s*([-\d\.,\s€]+)"), _a_importes),
+    ("estado_resumen",
+     re.compile(r"(?i)Estado:\s*([^;]+)"), None),
+]
+
+# Orden de columnas del DataFrame resultante
+COLUMNAS_ENTRY = (
+    ["id_entry", "titulo", "fecha_actualizacion"]
+    + [columna for columna, _, _ in CAMPOS_RESUMEN]
+    + [
+        campo.columna for campo in CAMPOS_ENTRY[3:]
+        if campo.columna != _RESUMEN
+    ]
+    + ["fecha_baja", "parse_error"]
+)
 
-        if cfs is not None:
-            data["id_expediente"] = get_text(
-                cfs, "cbc:ContractFolderID"
-            )
-            data["estado"] = get_text(
-                cfs, "cbc_place_ext:ContractFolderStatusCode"
-            )
+# Versión de la extracción: incrementar cuando cambie el resultado del
+# parseo sin que cambie la especificación de campos (invalida la caché
+# de src.cache_parseo)
+FORMATO_PARSER = 2
 
-            # ------------------------------------------
-            # Órgano de contratación
-            # ------------------------------------------
-            lcp = cfs.find(
-                "cac_place_ext:LocatedContractingParty",
-                XML_NAMESPACES
-            )
 
-            if lcp is not None:
-                tipo_codigo = get_text(
-                    lcp, "cbc:ContractingPartyTypeCode"
-                )
-                data["tipo_organo_codigo"] = tipo_codigo
-                data["tipo_organo_nombre"] = (
-                    MAPA_TIPO_ORGANO.get(tipo_codigo)
-                )
-
-                actividad_codigo = get_text(
-                    lcp, "cbc:ActivityCode"
-                )
-                data["actividad_organo_codigo"] = actividad_codigo
-                data["actividad_organo_nombre"] = (
-                    MAPA_ACTIVIDAD_ORGANO.get(actividad_codigo)
-                )
-
-                party = lcp.find("cac:Party", XML_NAMESPACES)
-
-                if party is not None:
-                    for pid in party.findall(
-                        "cac:PartyIdentification",
-                        XML_NAMESPACES
-                    ):
-                        id_elem = pid.find("cbc:ID", XML_NAMESPACES)
-                        if id_elem is not None:
-                            scheme = (
-                                id_elem.get("schemeName")
-                                or id_elem.get("schemeID")
-                            )
-                            value = (
-                                id_elem.text.strip()
-                                if id_elem.text else None
-                            )
-
-                            if scheme == "DIR3":
-                                data["id_dir3"] = value
-                            elif scheme == "NIF":
-                                data["nif_organo"] = value
-                            elif scheme == "ID_PLATAFORMA":
-                                data["id_plataforma"] = value
-
-                    data["nombre_organo"] = get_text(
-                        party, "cac:PartyName/cbc:Name"
-                    )
-                    data["codigo_postal_organo"] = get_text(
-                        party, "cac:PostalAddress/cbc:PostalZone"
-                    )
-                    data["localidad_organo"] = get_text(
-                        party, "cac:PostalAddress/cbc:CityName"
-                    )
-                    data["pais_organo"] = get_text(
-                        party, "cac:PostalAddress/cac:Country/cbc:Name"
-                    )
-                    data["email_organo"] = get_text(
-                        party, "cac:Contact/cbc:ElectronicMail"
-                    )
-                    data["telefono_organo"] = get_text(
-                        party, "cac:Contact/cbc:Telephone"
-                    )
-
-            # ------------------------------------------
-            # Proyecto de contratación
-            # ------------------------------------------
-            pp = cfs.find(
-                "cac:ProcurementProject",
-                XML_NAMESPACES
-            )
+def _a_clark(ruta: str) -> list:
+    """
+    Convierte un path con prefijos ("cac:Party/cbc:Name") en la lista
+    de tags en notación Clark ("{uri}Party", "{uri}Name").
+    """
+    tags = []
+    for paso in ruta.split("/"):
+        prefijo, nombre = paso.split(":")
+        tags.append(f"{{{XML_NAMESPACES[prefijo]}}}{nombre}")
+    return tags
+
+
+def _compilar_plan(campos: list) -> tuple:
+    """
+    Compila la especificación de campos en un árbol de tags.
 
-            if pp is not None:
-                data["objeto_contrato"] = get_text(pp, "cbc:Name")
-
-                tipo_code = get_text(pp, "cbc:TypeCode")
-                data["codigo_tipo_contrato"] = tipo_code
-                data["nombre_tipo_contrato"] = (
-                    MAPA_TIPO_CONTRATO.get(tipo_code)
-                )
-
-                data["codigo_subtipo_contrato"] = get_text(
-                    pp, "cbc:SubTypeCode"
-                )
-
-                ba = pp.find(
-                    "cac:BudgetAmount",
-                    XML_NAMESPACES
-                )
-                if ba is not None:
-                    data["importe_estimado"] = safe_float(
-                        get_text(
-                            ba,
-                            "cbc:EstimatedOverallContractAmount"
-                        )
-                    )
-                    data["importe_total"] = safe_float(
-                        get_text(ba, "cbc:TotalAmount")
-                    )
-                    data["importe_sin_impuestos"] = safe_float(
-                        get_text(
-                            ba,
-                            "cbc:TaxExclusiveAmount"
-                        )
-                    )
-
-                data["codigo_cpv_principal"] = get_text(
-                    pp,
-                    "cac:RequiredCommodityClassification/"
-                    "cbc:ItemClassificationCode"
-                )
-                data["codigo_region_nuts"] = get_text(
-                    pp,
-                    "cac:RealizedLocation/"
-                    "cbc:CountrySubentityCode"
-                )
-
-                duracion = pp.find(
-                    "cac:PlannedPeriod/"
-                    "cbc:ContractDurationMeasure",
-                    XML_NAMESPACES
-                )
-                if duracion is not None:
-                    data["duracion_contrato_valor"] = duracion.text
-                    data["duracion_contrato_unidad"] = (
-                        duracion.get("unitCode")
-                    )
-
-            # ------------------------------------------
-            # Resultado de la licitación
-            # ------------------------------------------
-            trs = cfs.find(
-                "cac:TenderResult",
-                XML_NAMESPACES
+    Cada nodo es {tag: (campos_en_este_nodo, hijos)}, de forma que un
+    único recorrido del <entry> resuelve todas las columnas sin llamadas
+    a `find` ni resolución de prefijos.
+
+    Los campos con `mapa` no se leen del XML: se devuelven aparte como
+    (columna, columna_origen, mapa) para derivarlos por lote.
+    """
+    plan = {}
+    derivadas = []
+    origen_por_ruta = {}
+
+    for campo in campos:
+        if campo.mapa is not None:
+            derivadas.append(
+                (campo.columna, origen_por_ruta[campo.ruta], campo.mapa)
             )
+            continue
 
-            if trs is not None:
-                data["fecha_adjudicacion"] = pd.to_datetime(
-                    get_text(trs, "cbc:AwardDate"),
-                    errors="coerce"
-                )
-                data["ofertas_recibidas"] = get_text(
-                    trs, "cbc:ReceivedTenderQuantity"
-                )
-                data["es_pyme_empresa"] = get_text(
-                    trs, "cbc:SMEAwardedIndicator"
-                )
-
-                wp = trs.find(
-                    "cac:WinningParty",
-                    XML_NAMESPACES
-                )
-                if wp is not None:
-                    data["nif_empresa"] = get_text(
-                        wp, "cac:PartyIdentification/cbc:ID"
-                    )
-                    data["empresa_ganadora"] = get_text(
-                        wp, "cac:PartyName/cbc:Name"
-                    )
-                    data["pais_empresa"] = get_text(
-                        wp,
-                        "cac:PhysicalLocation/"
-                        "cac:Address/cac:Country/"
-                        "cbc:IdentificationCode"
-                    )
-
-                data["importe_adjudicado_con_IVA"] = safe_float(
-                    get_text(
-                        trs,
-                        "cac:AwardedTenderedProject/"
-                        "cac:LegalMonetaryTotal/"
-                        "cbc:PayableAmount"
-                    )
-                )
-                data["importe_adjudicado_sin_IVA"] = safe_float(
-                    get_text(
-                        trs,
-                        "cac:AwardedTenderedProject/"
-                        "cac:LegalMonetaryTotal/"
-                        "cbc:TaxExclusiveAmount"
-                    )
-                )
+        origen_por_ruta.setdefault(campo.ruta, campo.columna)
 
-    except Exception as e:
-        data["parse_error"] = str(e)
+        nodo = plan
+        tags = _a_clark(campo.ruta)
+        for i, tag in enumerate(tags):
+            acciones, hijos = nodo.setdefault(tag, ([], {}))
+            if i == len(tags) - 1:
+                acciones.append(campo)
+            nodo = hijos
+
+    return plan, derivadas
+
+
+_PLAN_ENTRY, _DERIVADAS_ENTRY = _compilar_plan(CAMPOS_ENTRY)
+
+
+def _extraer(
+    elem,
+    plan: dict,
+    columnas: dict,
+    fila: int,
+    vistos: set
+) -> None:
+    """
+    Recorre una sola vez el subárbol de `elem` siguiendo el plan
+    compilado y escribe el texto crudo en `columnas[...][fila]`.
+
+    Si un path aparece varias veces se conserva el primer nodo,
+    igual que `Element.find`; `vistos` guarda las columnas ya resueltas.
+    """
+    for hijo in elem:
+        nodo = plan.get(hijo.tag)
+        if nodo is None:
+            continue
+
+        acciones, hijos = nodo
+        for campo in acciones:
+            if campo.columna in vistos:
+                continue
+
+            if campo.esquema is not None:
+                esquema = hijo.get("schemeName") or hijo.get("schemeID")
+                if esquema != campo.esquema:
+                    continue
+
+            vistos.add(campo.columna)
+
+            if campo.atributo is not None:
+                columnas[campo.columna][fila] = hijo.get(campo.atributo)
+            elif hijo.text is not None:
+                columnas[campo.columna][fila] = hijo.text.strip()
+
+        if hijos:
+            _extraer(hijo, hijos, columnas, fila, vistos)
+
+
+# ======================================================
+# CONSTRUCCIÓN COLUMNAR DE LOTES
+# ======================================================
+
+# Columnas leídas directamente del XML (texto crudo)
+_COLUMNAS_CRUDAS = [
+    campo.columna for campo in CAMPOS_ENTRY if campo.mapa is None
+] + ["fecha_baja", "parse_error"]
 
-    return data
+# Tags de <entry> aceptados: con namespace Atom y sin namespace
+_TAGS_ENTRY = {
+    f"{{{XML_NAMESPACES['atom']}}}entry",
+    "entry",
+}
+
+# Tags de las bajas (tombstones): el ref de una baja es el <id> del
+# entry retirado
+_TAGS_BAJA = {
+    f"{{{XML_NAMESPACES['at']}}}deleted-entry",
+    "deleted-entry",
+}
+
+
+class _LoteColumnar:
+    """
+    Acumula entries (y bajas) como texto crudo en una lista por
+    columna.
+
+    La conversión de tipos (fechas, importes, mapas de códigos y campos
+    del resumen) se hace una sola vez por columna al generar el
+    DataFrame, en lugar de una vez por entry.
+    """
+
+    def __init__(self, capacidad: int):
+        self.capacidad = capacidad
+        self.filas = 0
+        self.bajas_invalidas = 0
+        self.columnas = {
+            columna: [None] * capacidad
+            for columna in _COLUMNAS_CRUDAS
+        }
+
+    def __len__(self) -> int:
+        return self.filas
+
+    def lleno(self) -> bool:
+        return self.filas >= self.capacidad
+
+    def agregar(self, entry) -> None:
+        if entry.tag in _TAGS_BAJA:
+            self._agregar_baja(entry)
+            return
+
+        fila = self.filas
+        try:
+            _extraer(entry, _PLAN_ENTRY, self.columnas, fila, set())
+        except Exception as e:
+            self.columnas["parse_error"][fila] = str(e)
+        self.filas += 1
+
+    def _agregar_baja(self, baja) -> None:
+        """
+        Una baja sin `ref` o sin `when` válido (ambos obligatorios) no
+        identifica qué retirar ni su versión: se cuenta y se descarta.
+        """
+        ref = baja.get("ref")
+        cuando = baja.get("when")
+        try:
+            datetime.fromisoformat(cuando)
+        except (TypeError, ValueError):
+            cuando = None
+
+        if not ref or cuando is None:
+            self.bajas_invalidas += 1
+            return
+
+        fila = self.filas
+        self.columnas["id_entry"][fila] = ref
+        self.columnas["fecha_actualizacion"][fila] = cuando
+        self.columnas["fecha_baja"][fila] = cuando
+        self.filas += 1
+
+    def a_dataframe(self) -> pd.DataFrame:
+        n = self.filas
+        crudas = {
+            columna: pd.Series(valores[:n])
+            for columna, valores in self.columnas.items()
+        }
+
+        for campo in CAMPOS_ENTRY:
+            if campo.conversor is not None:
+                crudas[campo.columna] = campo.conversor(crudas[campo.columna])
+
+        crudas["fecha_baja"] = _a_fechas(crudas["fecha_baja"])
+
+        for columna, origen, mapa in _DERIVADAS_ENTRY:
+            crudas[columna] = crudas[origen].map(mapa)
+
+        resumen = crudas.pop(_RESUMEN)
+        for columna, patron, conversor in CAMPOS_RESUMEN:
+            valores = resumen.str.extract(patron, expand=False).str.strip()
+            crudas[columna] = conversor(valores) if conversor else valores
+
+        return pd.DataFrame(
+            {columna: crudas[columna] for columna in COLUMNAS_ENTRY}
+        )
+
+
+def parse_entries(entries: Iterable) -> pd.DataFrame:
+    """
+    Parsea una colección de elementos <entry> (o <at:deleted-entry>)
+    y devuelve un DataFrame con una fila por elemento y las columnas
+    de `COLUMNAS_ENTRY`.
+    """
+    entries = list(entries)
+    lote = _LoteColumnar(len(entries))
+    for entry in entries:
+        lote.agregar(entry)
+
+    return lote.a_dataframe()
+
+
+def parse_entry(entry) -> dict:
+    """
+    Parsea un elemento <entry> de un feed Atom y devuelve un diccionario
+    con los campos extraídos.
+
+    Pensado para inspección puntual: para volúmenes grandes usar
+    `parse_entries` o `iter_atom_batches`.
+    """
+    return parse_entries([entry]).iloc[0].to_dict()
 
 
 # ======================================================
 # PARSEO DE ARCHIVOS .ATOM
 # ======================================================
 
-def parse_atom_file(path: Path) -> pd.DataFrame:
+# Delimitadores usados para recuperar entries (y bajas) tras un XML
+# mal formado
+_RE_INICIO_FEED = re.compile(rb"<feed\b[^>]*>", re.DOTALL)
+_RE_ENTRY_CRUDO = re.compile(
+    rb"<entry\b.*?</entry>"
+    rb"|<(?:\w+:)?deleted-entry\b[^>]*/>"
+    rb"|<(?:\w+:)?deleted-entry\b.*?</(?:\w+:)?deleted-entry>",
+    re.DOTALL
+)
+
+
+def _recuperar_entries(
+    fuente: FuenteAtom,
+    omitir: int
+) -> Iterator[ET.Element]:
     """
-    Parsea un archivo .atom y devuelve un DataFrame con todos los entries.
+    Reparsea un archivo mal formado entry a entry.
+
+    expat no puede continuar tras un error de sintaxis, así que se
+    recorta cada bloque <entry>...</entry> del texto original y se
+    parsea por separado, envuelto en la etiqueta <feed> original para
+    conservar las declaraciones de namespaces.
+
+    Los primeros `omitir` bloques ya se procesaron en modo streaming.
+    Los bloques que siguen sin poder parsearse se descartan de forma
+    individual.
     """
-    try:
-        tree = ET.parse(path)
-        root = tree.getroot()
+    with fuente.abrir() as f:
+        contenido = f.read()
+
+    inicio = _RE_INICIO_FEED.search(contenido)
+    cabecera = inicio.group(0) if inicio else b"<feed>"
+
+    descartados = 0
+    for i, match in enumerate(_RE_ENTRY_CRUDO.finditer(contenido)):
+        if i < omitir:
+            continue
+
+        try:
+            feed = ET.fromstring(cabecera + match.group(0) + b"</feed>")
+        except ET.ParseError:
+            descartados += 1
+            continue
+
+        for entry in feed:
+            if entry.tag in _TAGS_ENTRY or entry.tag in _TAGS_BAJA:
+                yield entry
+
+    if descartados:
+        registrar_parseo(fuente.id, descartados=descartados)
+        print(
+            f"{descartados} entries descartados por XML mal formado "
+            f"en {fuente.nombre}"
+        )
 
-        entries = root.findall(
-            ".//atom:entry",
-            XML_NAMESPACES
+
+def _emitir(fuente: FuenteAtom, lote: _LoteColumnar) -> pd.DataFrame:
+    """
+    Convierte el lote y registra sus entries, bajas y errores de
+    extracción.
+    """
+    df = lote.a_dataframe()
+    bajas = df["fecha_baja"].notna().sum()
+    registrar_parseo(
+        fuente.id,
+        entries=len(df) - bajas,
+        bajas=bajas,
+        errores_entry=(
+            df["parse_error"].notna().sum() + lote.bajas_invalidas
         )
-        if not entries:
-            entries = root.findall(".//entry")
+    )
+    return df
+
+
+def iter_atom_batches(
+    path: Union[FuenteAtom, Path],
+    batch_size: int = PARSE_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Parsea un archivo .atom en streaming y devuelve lotes de entries.
+
+    Cada <entry> se procesa al cerrarse y se libera inmediatamente,
+    de modo que la memoria máxima depende de `batch_size` y no del
+    tamaño del feed.
+
+    Parameters
+    ----------
+    path : FuenteAtom or Path
+        Ruta a un archivo .atom / .atom.gz, o miembro de un paquete
+    batch_size : int
+        Número máximo de entries por lote
+
+    Yields
+    ------
+    pd.DataFrame
+        Lote de como máximo `batch_size` entries parseados
+
+    Notes
+    -----
+    Si el XML está mal formado se conservan los entries ya leídos y
+    el resto del archivo se recupera entry a entry
+    (ver `_recuperar_entries`).
+
+    Las bajas (<at:deleted-entry>) van en los mismos lotes, en el
+    orden del feed, como filas con `fecha_baja` (ver
+    `src.transform.cleaning.separar_bajas`).
+    """
+    fuente = como_fuente(path)
+    lote = _LoteColumnar(batch_size)
+    procesados = 0
+    root = None
+
+    try:
+        with fuente.abrir() as f:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    continue
+
+                if elem.tag not in _TAGS_ENTRY and elem.tag not in _TAGS_BAJA:
+                    continue
+
+                lote.agregar(elem)
+                procesados += 1
 
-        records = [parse_entry(entry) for entry in entries]
-        return pd.DataFrame(records)
+                # Liberar el entry ya procesado (y los nodos previos)
+                elem.clear()
+                root.clear()
+
+                if lote.lleno():
+                    yield _emitir(fuente, lote)
+                    lote = _LoteColumnar(batch_size)
 
     except ET.ParseError as e:
-        print(f"Error de parseo XML en {path.name}: {e}")
-        return pd.DataFrame()
+        registrar_parseo(fuente.id, errores_xml=1)
+        print(f"Error de parseo XML en {fuente.nombre}: {e}")
+
+        for entry in _recuperar_entries(fuente, omitir=procesados):
+            lote.agregar(entry)
+            if lote.lleno():
+                yield _emitir(fuente, lote)
+                lote = _LoteColumnar(batch_size)
+
+    if len(lote):
+        yield _emitir(fuente, lote)
+
+
+def parse_atom_file(path: Union[FuenteAtom, Path]) -> pd.DataFrame:
+    """
+    Parsea un archivo .atom y devuelve un DataFrame con todos los entries.
+
+    Acepta archivos .atom y .atom.gz, miembros concretos de un paquete
+    (`FuenteAtom`) y paquetes .zip / tar completos; en este último caso
+    se parsean todos sus miembros .atom por orden de nombre.
+    """
+    if not isinstance(path, FuenteAtom) and es_paquete(Path(path)):
+        dfs = [
+            parse_atom_file(fuente)
+            for fuente in fuentes_de_paquete(Path(path))
+        ]
+        dfs = [df for df in dfs if not df.empty]
+        return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+
+    fuente = como_fuente(path)
+    try:
+        batches = list(iter_atom_batches(fuente))
+        if not batches:
+            return pd.DataFrame()
+
+        return pd.concat(batches, ignore_index=True)
 
     except Exception as e:
-        print(f"Error procesando {path.name}: {e}")
+        registrar_parseo(fuente.id, fallidos=1)
+        print(f"Error procesando {fuente.nombre}: {e}")
         return pd.DataFrame()
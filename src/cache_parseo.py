@@ -0,0 +1,325 @@
+"""
+Caché del resultado del parseo por archivo de feed.
+
+Responsabilidad:
+- Guardar el DataFrame parseado de cada feed como archivo Arrow IPC
+  (sin comprimir, para poder leerlo con memory-map), con el SHA-256
+  del contenido del feed como clave
+- Versionar la caché con la huella de la especificación del parser
+  (`CAMPOS_ENTRY`, `CAMPOS_RESUMEN`, conversores, `FORMATO_PARSER`):
+  al cambiar el parser se usa otro directorio y el anterior se borra
+- Conservar con cada archivo sus contadores de parseo (src.metricas),
+  que se vuelven a registrar en cada acierto
+- Desalojar los archivos usados hace más tiempo cuando la caché supera
+  `PARSE_CACHE_MAX_BYTES`
+- Recordar el hash de cada feed junto a su tamaño y mtime, para no
+  volver a leer los feeds que no han cambiado (`hashes_feeds`)
+
+Estructura:
+    PARSE_CACHE_DIR/<huella del parser>/<sha256 del feed>.arrow
+    PARSE_CACHE_DIR/hashes.json
+
+Este módulo NO:
+- decide qué archivos se parsean (ver src.loader)
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from src.atom_parser import (
+    CAMPOS_ENTRY,
+    CAMPOS_RESUMEN,
+    COLUMNAS_ENTRY,
+    FORMATO_PARSER,
+    parse_atom_file,
+)
+from src.config import (
+    PARSE_CACHE_DIR,
+    PARSE_CACHE_MAX_BYTES,
+    ZONA_HORARIA,
+)
+from src.fuentes import FuenteAtom
+from src.manifest import hash_archivo
+from src.metricas import contadores_parseo, registrar_parseo
+
+
+# Clave de los contadores de parseo en los metadatos del esquema Arrow
+_CLAVE_CONTADORES = b"contadores_parseo"
+
+# Índice {id de la fuente: [tamaño, mtime, sha256]} de los feeds vistos
+_INDICE_HASHES = "hashes.json"
+
+
+# ======================================================
+# HUELLA DEL PARSER
+# ======================================================
+
+def _codigo(funcion) -> Optional[str]:
+    if funcion is None:
+        return None
+    try:
+        return inspect.getsource(funcion)
+    except (OSError, TypeError):
+        return funcion.__qualname__
+
+
+@lru_cache(maxsize=None)
+def huella_parser() -> str:
+    """
+    Hash de la especificación del parser. Cambia con cualquier campo,
+    ruta, mapa de códigos, patrón del resumen o conversor.
+    """
+    especificacion = {
+        "formato": FORMATO_PARSER,
+        "zona_horaria": ZONA_HORARIA,
+        "columnas": COLUMNAS_ENTRY,
+        "campos": [
+            [
+                campo.columna,
+                campo.ruta,
+                _codigo(campo.conversor),
+                sorted(campo.mapa.items()) if campo.mapa else None,
+                campo.atributo,
+                campo.esquema,
+            ]
+            for campo in CAMPOS_ENTRY
+        ],
+        "resumen": [
+            [columna, patron.pattern, patron.flags, _codigo(conversor)]
+            for columna, patron, conversor in CAMPOS_RESUMEN
+        ],
+    }
+
+    texto = json.dumps(especificacion, sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+
+def _directorio(base: Optional[Path]) -> Path:
+    return (base or PARSE_CACHE_DIR) / huella_parser()
+
+
+def ruta_cache(sha256: str, base: Optional[Path] = None) -> Path:
+    return _directorio(base) / f"{sha256}.arrow"
+
+
+# ======================================================
+# HASHES DE LOS FEEDS
+# ======================================================
+
+def hashes_feeds(
+    fuentes: list,
+    conocidos: Optional[dict] = None,
+    base: Optional[Path] = None
+) -> dict:
+    """
+    Devuelve {fuente: sha256} de `fuentes`, la clave de cada feed en
+    la caché.
+
+    Como en `src.manifest.archivos_pendientes`, si tamaño y mtime
+    coinciden con los del índice de hashes se reutiliza el hash
+    registrado sin leer el archivo: solo se calcula el de los feeds
+    nuevos o modificados. Los hashes de `conocidos` (p. ej., los de
+    `archivos_pendientes`) tampoco se recalculan.
+    """
+    path = (base or PARSE_CACHE_DIR) / _INDICE_HASHES
+    try:
+        indice = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        indice = {}
+
+    conocidos = conocidos or {}
+    hashes = {}
+    calculados = 0
+    for fuente in fuentes:
+        tamano, mtime = fuente.stat()
+        registro = indice.get(fuente.id)
+
+        if fuente in conocidos:
+            sha256 = conocidos[fuente]
+        elif registro is not None and registro[:2] == [tamano, mtime]:
+            sha256 = registro[2]
+        else:
+            sha256 = hash_archivo(fuente)
+            calculados += 1
+
+        hashes[fuente] = sha256
+        indice[fuente.id] = [tamano, mtime, sha256]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(indice), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+    if calculados:
+        print(f"Caché del parseo: hash calculado de {calculados} archivos")
+
+    return hashes
+
+
+# ======================================================
+# LECTURA Y ESCRITURA
+# ======================================================
+
+def leer_tabla(sha256: str, base: Optional[Path] = None):
+    """
+    Abre con memory-map la tabla Arrow cacheada del feed con hash
+    `sha256` (None si no está). Los buffers de la tabla apuntan al
+    archivo mapeado: no se leen a memoria hasta que se usan.
+    """
+    path = ruta_cache(sha256, base)
+    try:
+        with pa.memory_map(str(path)) as fuente:
+            tabla = pa.ipc.open_file(fuente).read_all()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+
+    # El mtime marca el último uso para el desalojo
+    os.utime(path)
+    return tabla
+
+
+def leer_cache(
+    fuente: FuenteAtom,
+    sha256: str,
+    base: Optional[Path] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Devuelve el DataFrame cacheado de `fuente` (None si no está) y
+    registra sus contadores de parseo.
+
+    La conversión a pandas no es zero-copy: las columnas numéricas y
+    de fechas se copian a bloques de NumPy (las de texto siguen
+    respaldadas por Arrow). Se convierte columna a columna liberando
+    cada una de la tabla Arrow (`self_destruct`) y sin consolidar
+    bloques (`split_blocks`), de modo que no coexisten dos copias
+    completas. No se usa `pd.ArrowDtype` para que los tipos sean los
+    mismos que al parsear el XML.
+    """
+    tabla = leer_tabla(sha256, base)
+    if tabla is None:
+        return None
+
+    metadatos = tabla.schema.metadata or {}
+    contadores = json.loads(metadatos.get(_CLAVE_CONTADORES, b"{}"))
+    contadores["desde_cache"] = tabla.num_rows
+    registrar_parseo(fuente.id, **contadores)
+
+    return tabla.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def guardar_cache(
+    sha256: str,
+    df: pd.DataFrame,
+    contadores: dict,
+    base: Optional[Path] = None
+) -> None:
+    """
+    Escribe `df` en la caché de forma atómica.
+    """
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({
+        **(tabla.schema.metadata or {}),
+        _CLAVE_CONTADORES: json.dumps(contadores).encode("utf-8"),
+    })
+
+    path = ruta_cache(sha256, base)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Nombre temporal único: varios workers pueden escribir a la vez
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, tabla.schema) as writer:
+            writer.write_table(tabla)
+    os.replace(tmp_path, path)
+
+
+def parse_atom_file_cache(
+    fuente: FuenteAtom,
+    sha256: Optional[str] = None,
+    base: Optional[Path] = None
+) -> pd.DataFrame:
+    """
+    `parse_atom_file` a través de la caché.
+
+    Si el feed no está cacheado se parsea y, si el parseo no ha
+    fallado, se guarda. Los archivos sin entries no se cachean.
+    """
+    sha256 = sha256 or hash_archivo(fuente)
+
+    df = leer_cache(fuente, sha256, base)
+    if df is not None:
+        return df
+
+    previos = contadores_parseo(fuente.id)
+    df = parse_atom_file(fuente)
+    contadores = {
+        contador: valor - previos.get(contador, 0)
+        for contador, valor in contadores_parseo(fuente.id).items()
+        if contador != "desde_cache"
+    }
+
+    if not df.empty and not contadores.get("fallidos"):
+        guardar_cache(sha256, df, contadores, base)
+
+    return df
+
+
+# ======================================================
+# DESALOJO
+# ======================================================
+
+def desalojar(
+    max_bytes: int = PARSE_CACHE_MAX_BYTES,
+    base: Optional[Path] = None
+) -> int:
+    """
+    Borra las cachés de otras versiones del parser y, si la actual
+    supera `max_bytes`, sus archivos usados hace más tiempo.
+
+    Returns
+    -------
+    int
+        Bytes liberados
+    """
+    base = base or PARSE_CACHE_DIR
+    actual = _directorio(base)
+    if not base.exists():
+        return 0
+
+    liberados = 0
+    for directorio in base.iterdir():
+        if directorio == actual or not directorio.is_dir():
+            continue
+        for path in directorio.iterdir():
+            liberados += path.stat().st_size
+            path.unlink()
+        directorio.rmdir()
+
+    if not actual.exists():
+        return liberados
+
+    archivos = sorted(
+        ((path, path.stat()) for path in actual.glob("*.arrow")),
+        key=lambda archivo: archivo[1].st_mtime
+    )
+    total = sum(estado.st_size for _, estado in archivos)
+
+    for path, estado in archivos:
+        if total <= max_bytes:
+            break
+        path.unlink()
+        total -= estado.st_size
+        liberados += estado.st_size
+
+    if liberados:
+        print(f"Caché del parseo: {liberados / 2**20:.1f} MB liberados")
+
+    return liberados
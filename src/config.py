@@ -9,6 +9,7 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
+INTERIM_DATA_DIR = DATA_DIR / "interim"
 
 SQL_DIR = BASE_DIR / "sql"
 
@@ -18,6 +19,111 @@ SQL_DIR = BASE_DIR / "sql"
 
 DDL_PATH = SQL_DIR / "ddl.sql"
 
+# Esquema traducido para el backend embebido (DATABASE_URL=sqlite:///...)
+DDL_SQLITE_PATH = SQL_DIR / "ddl_sqlite.sql"
+
+# Municipios de España (comunidad;provincia;localidad;latitud;longitud;...)
+LOCALIDADES_PATH = PROCESSED_DATA_DIR / "localidades.csv"
+
+# Registro de archivos ya ingeridos (modo incremental)
+MANIFEST_PATH = INTERIM_DATA_DIR / "manifest_ingesta.json"
+
+# Validadores HTTP (ETag / Last-Modified) y enlace pendiente de la
+# última descarga del feed (ver src.descarga)
+DESCARGA_ESTADO_PATH = INTERIM_DATA_DIR / "descarga_feed.json"
+
+# Checkpoints Parquet de cada etapa del pipeline y estado de la última
+# ejecución (ver src.pipeline)
+CHECKPOINT_DIR = INTERIM_DATA_DIR / "checkpoints"
+ESTADO_PIPELINE_PATH = CHECKPOINT_DIR / "estado_pipeline.json"
+
+# Métricas de cada ejecución: informe JSON, archivo de texto para el
+# textfile collector de Prometheus y perfiles de --profile
+METRICAS_DIR = INTERIM_DATA_DIR / "metricas"
+INFORME_METRICAS_PATH = METRICAS_DIR / "informe_ejecucion.json"
+PROMETHEUS_PATH = METRICAS_DIR / "contratos_etl.prom"
+PERFILES_DIR = METRICAS_DIR / "perfiles"
+
+# Datasets analíticos exportados desde la base de datos: Parquet
+# particionado (directorio) y CSV opcional (ver src.db.export_dataset)
+EXPORT_DIR = DATA_DIR / "export"
+DATASET_PATH = EXPORT_DIR / "contratos_menores_test.parquet"
+CSV_PATH = EXPORT_DIR / "contratos_menores_test.csv"
+
+# =============================
+# DESCARGA DE FEEDS
+# =============================
+
+# Página más reciente del feed de contratos menores; las anteriores se
+# enlazan desde cada página con rel="next"
+URL_FEED_MENORES = (
+    "https://contrataciondelestado.es/sindicacion/sindicacion_1143/"
+    "contratosMenoresPerfilesContratantes.atom"
+)
+
+# Descargas simultáneas, intentos por página (espera exponencial desde
+# DESCARGA_ESPERA_BASE segundos entre intentos) y timeout por petición
+DESCARGA_CONCURRENCIA = 4
+DESCARGA_REINTENTOS = 5
+DESCARGA_ESPERA_BASE = 1.0
+DESCARGA_TIMEOUT = 60
+
+# =============================
+# PARSING
+# =============================
+
+# Número de entries por lote en el parseo en streaming de archivos .atom
+PARSE_BATCH_SIZE = 5000
+
+# Procesos usados para parsear archivos en paralelo (1 = secuencial)
+PARSE_WORKERS = 1
+
+# Zona horaria en la que se expresan las fechas con offset de los feeds
+ZONA_HORARIA = "Europe/Madrid"
+
+# Caché del resultado del parseo por archivo (Arrow IPC, ver
+# src.cache_parseo) y tamaño máximo antes de desalojar los archivos
+# usados hace más tiempo
+PARSE_CACHE_DIR = INTERIM_DATA_DIR / "cache_parseo"
+PARSE_CACHE_MAX_BYTES = 4 * 1024**3
+
+# =============================
+# LIMPIEZA
+# =============================
+
+# Filas por lote al limpiar y deduplicar el checkpoint del parseo
+# (también tamaño de row group de los checkpoints)
+CLEAN_CHUNK_SIZE = 200_000
+
+# Modo en flujo (src.flujo): filas por lote limpio, lotes limpios en
+# espera de carga antes de detener el parseo, y archivos parseándose
+# o parseados pendientes de limpiar por proceso de parseo
+FLUJO_LOTE = 50_000
+FLUJO_COLA = 2
+FLUJO_EN_VUELO_POR_WORKER = 2
+
+# =============================
+# CARGA EN BASE DE DATOS
+# =============================
+
+# Filas por chunk (y por transacción) en la carga masiva
+BULK_CHUNK_SIZE = 50_000
+
+# Pool de conexiones (MySQL)
+DB_POOL_SIZE = 5
+DB_MAX_OVERFLOW = 10
+
+# Segundos tras los que una conexión del pool se renueva (por debajo
+# del wait_timeout del servidor)
+DB_POOL_RECYCLE = 3600
+
+# =============================
+# EXPORTACIÓN
+# =============================
+
+# Filas por chunk leído del cursor del servidor al exportar el dataset
+EXPORT_CHUNK_SIZE = 100_000
+
 # =============================
 # XML NAMESPACES
 # =============================
@@ -28,6 +134,8 @@ XML_NAMESPACES = {
     "cac": "urn:dgpe:names:draft:codice:schema:xsd:CommonAggregateComponents-2",
     "cac_place_ext": "urn:dgpe:names:draft:codice-place-ext:schema:xsd:CommonAggregateComponents-2",
     "cbc_place_ext": "urn:dgpe:names:draft:codice-place-ext:schema:xsd:CommonBasicComponents-2",
+    # Entries retirados del feed (<at:deleted-entry>, RFC 6721)
+    "at": "http://purl.org/atompub/tombstones/1.0",
 }
 
 # =============================
@@ -65,6 +173,29 @@ MAPA_TIPO_ORGANO = {
     "12": "Entidad con derechos especiales o exclusivos"
 }
 
+# Provincia de los dos primeros dígitos del código postal (códigos INE),
+# con los nombres de LOCALIDADES_PATH.
+MAPA_PROVINCIA_CP = {
+    "01": "Álava", "02": "Albacete", "03": "Alicante/Alacant",
+    "04": "Almería", "05": "Ávila", "06": "Badajoz",
+    "07": "Illes Balears", "08": "Barcelona", "09": "Burgos",
+    "10": "Cáceres", "11": "Cádiz", "12": "Castellón/Castelló",
+    "13": "Ciudad Real", "14": "Córdoba", "15": "A Coruña",
+    "16": "Cuenca", "17": "Girona", "18": "Granada",
+    "19": "Guadalajara", "20": "Guipúzcoa", "21": "Huelva",
+    "22": "Huesca", "23": "Jaén", "24": "León",
+    "25": "Lleida", "26": "La Rioja", "27": "Lugo",
+    "28": "Madrid", "29": "Málaga", "30": "Murcia",
+    "31": "Navarra", "32": "Ourense", "33": "Asturias",
+    "34": "Palencia", "35": "Las Palmas", "36": "Pontevedra",
+    "37": "Salamanca", "38": "Santa Cruz de Tenerife", "39": "Cantabria",
+    "40": "Segovia", "41": "Sevilla", "42": "Soria",
+    "43": "Tarragona", "44": "Teruel", "45": "Toledo",
+    "46": "Valencia/València", "47": "Valladolid", "48": "Vizcaya",
+    "49": "Zamora", "50": "Zaragoza", "51": "Ceuta",
+    "52": "Melilla",
+}
+
 # Mapa de códigos oficiales de actividad del órgano a descripciones legibles.
 MAPA_ACTIVIDAD_ORGANO = {
     '1': 'Justicia',
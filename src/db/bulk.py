@@ -0,0 +1,541 @@
+"""
+Carga masiva de DataFrames en la base de datos.
+
+Responsabilidad:
+- Dividir el DataFrame en chunks de tamaño configurable
+- Cargar cada chunk con LOAD DATA LOCAL INFILE desde un archivo
+  temporal o, si el servidor no lo permite, con INSERT multi-fila
+  (executemany de PyMySQL agrupa las filas en sentencias
+  INSERT ... VALUES (...), (...))
+- Ejecutar cada chunk en su propia transacción, con las comprobaciones
+  de claves foráneas y unicidad desactivadas en la sesión (igual que
+  hace ddl.sql al crear el esquema)
+- Informar de las filas/segundo por tabla (y registrarlas en
+  src.metricas)
+- Upserts (INSERT ... ON DUPLICATE KEY UPDATE) multi-fila por chunks,
+  con una columna opcional que marca la carga en que cada fila se
+  insertó o cambió de verdad
+- Fusión por versión: carga masiva en una tabla temporal de staging y
+  un único INSERT ... SELECT ... ON DUPLICATE KEY UPDATE que solo
+  actualiza las filas cuya versión entrante es más reciente
+
+En SQLite (ver src.db.engine) no hay LOAD DATA ni comprobaciones de
+sesión: se usa INSERT multi-fila (executemany) y los upserts se
+expresan con INSERT ... ON CONFLICT DO UPDATE.
+"""
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas as pd
+
+from src.config import BULK_CHUNK_SIZE
+from src.db.engine import BACKEND, get_engine
+from src.metricas import registrar_carga
+
+
+# Errores de MySQL cuando LOAD DATA LOCAL está deshabilitado
+# (1148: ER_NOT_ALLOWED_COMMAND, 3948: ER_CLIENT_LOCAL_FILES_DISABLED,
+#  2068: CR_LOAD_DATA_LOCAL_INFILE_REJECTED)
+_ERRORES_LOCAL_INFILE = {1148, 2068, 3948}
+
+# Se desactiva LOAD DATA para el resto del proceso tras el primer rechazo
+_load_data_disponible = BACKEND == "mysql"
+
+# Marcador de parámetros del driver (PyMySQL: format, sqlite3: qmark)
+_MARCADOR = "?" if BACKEND == "sqlite" else "%s"
+
+
+# ======================================================
+# SERIALIZACIÓN
+# ======================================================
+
+def _columna_a_texto(serie: pd.Series) -> pd.Series:
+    """
+    Serializa una columna al formato por defecto de LOAD DATA:
+    NULL como \\N y \\, tabulador y saltos de línea escapados.
+    """
+    nulos = serie.isna()
+
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        texto = serie.dt.strftime("%Y-%m-%d %H:%M:%S")
+    elif pd.api.types.is_bool_dtype(serie):
+        texto = serie.astype("Int8").astype(str)
+    else:
+        texto = (
+            serie.astype(str)
+            .str.replace("\\", "\\\\", regex=False)
+            .str.replace("\t", "\\t", regex=False)
+            .str.replace("\n", "\\n", regex=False)
+            .str.replace("\r", "\\r", regex=False)
+        )
+
+    return texto.astype(object).mask(nulos, "\\N")
+
+
+def _escribir_tsv(df: pd.DataFrame, path: str) -> None:
+    columnas = [_columna_a_texto(df[columna]) for columna in df.columns]
+    lineas = columnas[0].str.cat(columnas[1:], sep="\t")
+
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for linea in lineas:
+            f.write(linea)
+            f.write("\n")
+
+
+def _filas_python(df: pd.DataFrame) -> list:
+    """
+    Convierte un DataFrame en tuplas de tipos Python (NaN/NaT -> None).
+
+    Las fechas se envían como texto 'YYYY-MM-DD HH:MM:SS', igual que en
+    LOAD DATA (sqlite3 no admite pd.Timestamp como parámetro).
+    """
+    valores = df.astype(object)
+    for columna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[columna]):
+            valores[columna] = df[columna].dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    valores = valores.where(df.notna(), None)
+    return list(valores.itertuples(index=False, name=None))
+
+
+# ======================================================
+# CARGA POR CHUNK
+# ======================================================
+
+@contextmanager
+def _sin_comprobaciones(conn):
+    """
+    Desactiva en la sesión las comprobaciones de FK y unicidad de MySQL
+    y las restaura al salir. SQLite no las necesita: sus FK están
+    desactivadas por defecto.
+    """
+    if BACKEND != "mysql":
+        yield
+        return
+
+    conn.exec_driver_sql(
+        "SET @OLD_UNIQUE_CHECKS=@@UNIQUE_CHECKS, UNIQUE_CHECKS=0"
+    )
+    conn.exec_driver_sql(
+        "SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, "
+        "FOREIGN_KEY_CHECKS=0"
+    )
+    conn.commit()
+
+    try:
+        yield
+    finally:
+        conn.exec_driver_sql(
+            "SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS"
+        )
+        conn.exec_driver_sql("SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS")
+        conn.commit()
+
+
+def _load_data(conn, df: pd.DataFrame, tabla: str) -> None:
+    fd, path = tempfile.mkstemp(prefix=f"{tabla}_", suffix=".tsv")
+    os.close(fd)
+
+    try:
+        _escribir_tsv(df, path)
+        ruta_sql = path.replace("\\", "/")
+        columnas = ", ".join(f"`{columna}`" for columna in df.columns)
+        conn.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{ruta_sql}' "
+            f"INTO TABLE `{tabla}` "
+            "CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            "LINES TERMINATED BY '\\n' "
+            f"({columnas})"
+        )
+    finally:
+        os.remove(path)
+
+
+def _insert_multifila(conn, df: pd.DataFrame, tabla: str) -> None:
+    columnas = ", ".join(f"`{columna}`" for columna in df.columns)
+    marcadores = ", ".join([_MARCADOR] * len(df.columns))
+
+    conn.exec_driver_sql(
+        f"INSERT INTO `{tabla}` ({columnas}) VALUES ({marcadores})",
+        _filas_python(df)
+    )
+
+
+def _asignacion_cambio(columnas_actualizar: list, columna_cambio: str) -> str:
+    """
+    Asignación de `columna_cambio` en un upsert: toma el valor entrante
+    solo si alguna de `columnas_actualizar` cambia (comparación segura
+    con NULL).
+
+    En SQLite las asignaciones de DO UPDATE ven la fila original. MySQL
+    las evalúa de izquierda a derecha con los valores ya actualizados,
+    así que esta asignación debe ir la primera.
+    """
+    if BACKEND == "sqlite":
+        iguales = " AND ".join(
+            f"`{columna}` IS excluded.`{columna}`"
+            for columna in columnas_actualizar
+        )
+        return (
+            f"`{columna_cambio}` = CASE WHEN {iguales} "
+            f"THEN `{columna_cambio}` ELSE excluded.`{columna_cambio}` END"
+        )
+
+    iguales = " AND ".join(
+        f"`{columna}` <=> VALUES(`{columna}`)"
+        for columna in columnas_actualizar
+    )
+    return (
+        f"`{columna_cambio}` = IF({iguales}, "
+        f"`{columna_cambio}`, VALUES(`{columna_cambio}`))"
+    )
+
+
+def _upsert_multifila(
+    conn,
+    df: pd.DataFrame,
+    tabla: str,
+    columna_clave: str,
+    columnas_actualizar: list,
+    columna_cambio: Optional[str] = None
+) -> None:
+    columnas = ", ".join(f"`{columna}`" for columna in df.columns)
+    marcadores = ", ".join([_MARCADOR] * len(df.columns))
+
+    asignaciones = (
+        [_asignacion_cambio(columnas_actualizar, columna_cambio)]
+        if columna_cambio else []
+    )
+
+    if BACKEND == "sqlite":
+        asignaciones += [
+            f"`{columna}` = excluded.`{columna}`"
+            for columna in columnas_actualizar
+        ]
+        conflicto = (
+            f"ON CONFLICT (`{columna_clave}`) DO UPDATE SET "
+            f"{', '.join(asignaciones)}"
+        )
+    else:
+        asignaciones += [
+            f"`{columna}` = VALUES(`{columna}`)"
+            for columna in columnas_actualizar
+        ]
+        conflicto = f"ON DUPLICATE KEY UPDATE {', '.join(asignaciones)}"
+
+    conn.exec_driver_sql(
+        f"INSERT INTO `{tabla}` ({columnas}) VALUES ({marcadores}) "
+        f"{conflicto}",
+        _filas_python(df)
+    )
+
+
+def _es_local_infile_rechazado(error: Exception) -> bool:
+    orig = getattr(error, "orig", None)
+    codigo = orig.args[0] if orig is not None and orig.args else None
+    return codigo in _ERRORES_LOCAL_INFILE
+
+
+def _cargar_chunk(conn, chunk: pd.DataFrame, tabla: str) -> str:
+    """
+    Carga un chunk en su propia transacción con LOAD DATA o, si el
+    servidor lo rechaza, con INSERT multi-fila.
+
+    Devuelve el método usado.
+    """
+    global _load_data_disponible
+
+    if _load_data_disponible:
+        try:
+            with conn.begin():
+                _load_data(conn, chunk, tabla)
+            return "LOAD DATA"
+        except Exception as e:
+            if not _es_local_infile_rechazado(e):
+                raise
+            _load_data_disponible = False
+            print("LOAD DATA LOCAL no disponible: "
+                  "se usa INSERT multi-fila")
+
+    with conn.begin():
+        _insert_multifila(conn, chunk, tabla)
+    return "INSERT multi-fila"
+
+
+def _sentencia_fusion(
+    tabla: str,
+    staging: str,
+    columnas: list,
+    columna_clave: str,
+    columna_version: str,
+    incluir_iguales: bool = False
+) -> str:
+    """
+    INSERT ... SELECT desde staging que, ante una clave duplicada, solo
+    sobrescribe la fila si la versión entrante es más reciente (o
+    igual, con `incluir_iguales`).
+
+    MySQL evalúa las asignaciones de ON DUPLICATE KEY UPDATE de
+    izquierda a derecha con los valores ya actualizados, así que la
+    columna de versión se asigna la última. En SQLite la condición va
+    en el WHERE de ON CONFLICT DO UPDATE.
+    """
+    lista = ", ".join(f"`{columna}`" for columna in columnas)
+    mayor = ">=" if incluir_iguales else ">"
+
+    if BACKEND == "sqlite":
+        asignaciones = ", ".join(
+            f"`{columna}` = excluded.`{columna}`"
+            for columna in columnas
+            if columna != columna_clave
+        )
+        version = f"`{tabla}`.`{columna_version}`"
+        # "WHERE true" evita la ambigüedad del parser entre el SELECT y
+        # la cláusula ON CONFLICT
+        return (
+            f"INSERT INTO `{tabla}` ({lista}) "
+            f"SELECT {lista} FROM `{staging}` WHERE true "
+            f"ON CONFLICT (`{columna_clave}`) DO UPDATE SET {asignaciones} "
+            f"WHERE excluded.`{columna_version}` {mayor} {version} "
+            f"OR {version} IS NULL"
+        )
+
+    # Columnas de la tabla destino cualificadas: staging tiene los
+    # mismos nombres
+    def actual(columna):
+        return f"`{tabla}`.`{columna}`"
+
+    es_nueva = (
+        f"(VALUES(`{columna_version}`) {mayor} {actual(columna_version)} "
+        f"OR {actual(columna_version)} IS NULL)"
+    )
+    asignaciones = [
+        f"{actual(columna)} = "
+        f"IF({es_nueva}, VALUES(`{columna}`), {actual(columna)})"
+        for columna in columnas
+        if columna not in (columna_clave, columna_version)
+    ]
+    asignaciones.append(
+        f"{actual(columna_version)} = "
+        f"IF({es_nueva}, VALUES(`{columna_version}`), "
+        f"{actual(columna_version)})"
+    )
+
+    return (
+        f"INSERT INTO `{tabla}` ({lista}) "
+        f"SELECT {lista} FROM `{staging}` "
+        f"ON DUPLICATE KEY UPDATE {', '.join(asignaciones)}"
+    )
+
+
+# ======================================================
+# API
+# ======================================================
+
+def cargar_dataframe(
+    df: pd.DataFrame,
+    tabla: str,
+    chunk_size: int = BULK_CHUNK_SIZE
+) -> float:
+    """
+    Inserta un DataFrame en `tabla` por chunks.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Filas a insertar; las columnas deben existir en la tabla
+    tabla : str
+        Nombre de la tabla destino
+    chunk_size : int
+        Filas por chunk (y por transacción)
+
+    Returns
+    -------
+    float
+        Filas por segundo obtenidas
+
+    Notes
+    -----
+    Las comprobaciones de FK y unicidad se desactivan solo en la
+    sesión usada para la carga y se restauran al terminar.
+    """
+    if df.empty:
+        print(f"{tabla}: 0 filas")
+        return 0.0
+
+    inicio = time.perf_counter()
+    metodo = "LOAD DATA" if _load_data_disponible else "INSERT multi-fila"
+
+    with get_engine().connect() as conn, _sin_comprobaciones(conn):
+        for i in range(0, len(df), chunk_size):
+            metodo = _cargar_chunk(conn, df.iloc[i:i + chunk_size], tabla)
+
+    segundos = time.perf_counter() - inicio
+    filas_segundo = len(df) / segundos if segundos > 0 else float("inf")
+    registrar_carga(tabla, len(df), segundos, metodo)
+
+    print(
+        f"{tabla}: {len(df)} filas en {segundos:.2f}s "
+        f"({filas_segundo:,.0f} filas/s, {metodo})"
+    )
+
+    return filas_segundo
+
+
+def upsert_dataframe(
+    df: pd.DataFrame,
+    tabla: str,
+    columna_clave: str,
+    columnas_actualizar: list,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    columna_cambio: Optional[str] = None
+) -> float:
+    """
+    Inserta o actualiza filas de `tabla` según su clave única.
+
+    Las filas cuya `columna_clave` (columna UNIQUE) ya existe
+    actualizan `columnas_actualizar`; el id autoincremental de las
+    existentes no cambia. Cada chunk se
+    envía como INSERT multi-fila en su propia transacción.
+
+    Si se indica `columna_cambio` (una fecha), se escribe con la hora
+    de la carga en las filas nuevas y en las existentes en las que
+    cambia alguna de `columnas_actualizar`; en el resto se conserva.
+
+    Returns
+    -------
+    float
+        Filas por segundo obtenidas
+    """
+    if df.empty:
+        print(f"{tabla}: 0 filas")
+        return 0.0
+
+    inicio = time.perf_counter()
+
+    if columna_cambio:
+        df = df.assign(**{columna_cambio: pd.Timestamp.now().floor("s")})
+
+    with get_engine().connect() as conn:
+        for i in range(0, len(df), chunk_size):
+            with conn.begin():
+                _upsert_multifila(
+                    conn,
+                    df.iloc[i:i + chunk_size],
+                    tabla,
+                    columna_clave,
+                    columnas_actualizar,
+                    columna_cambio
+                )
+
+    segundos = time.perf_counter() - inicio
+    filas_segundo = len(df) / segundos if segundos > 0 else float("inf")
+    registrar_carga(tabla, len(df), segundos, "upsert")
+
+    print(
+        f"{tabla}: {len(df)} filas en {segundos:.2f}s "
+        f"({filas_segundo:,.0f} filas/s, upsert)"
+    )
+
+    return filas_segundo
+
+
+def fusionar_dataframe(
+    df: pd.DataFrame,
+    tabla: str,
+    columna_clave: str,
+    columna_version: str,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    incluir_iguales: bool = False
+) -> float:
+    """
+    Inserta filas nuevas y actualiza las existentes solo si su versión
+    (`columna_version`) es más reciente que la almacenada.
+
+    Cada chunk se carga en bloque en una tabla temporal con la misma
+    estructura que `tabla` y se fusiona con una única sentencia
+    INSERT ... SELECT ... ON DUPLICATE KEY UPDATE, sin viajes por
+    fila. El resultado no depende del orden en que se carguen los
+    lotes.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Filas a fusionar; las columnas deben existir en la tabla
+    tabla : str
+        Nombre de la tabla destino
+    columna_clave : str
+        Clave primaria de la tabla
+    columna_version : str
+        Columna fecha que decide qué versión de la fila se conserva
+    chunk_size : int
+        Filas por chunk (y por transacción)
+    incluir_iguales : bool
+        Si True, también se sobrescriben las filas con la misma versión
+
+    Returns
+    -------
+    float
+        Filas por segundo obtenidas
+    """
+    if df.empty:
+        print(f"{tabla}: 0 filas")
+        return 0.0
+
+    inicio = time.perf_counter()
+    staging = f"_staging_{tabla}"
+
+    # Dentro del lote solo cuenta la versión más reciente de cada clave
+    df = (
+        df.sort_values(columna_version, kind="stable", na_position="first")
+        .drop_duplicates(subset=[columna_clave], keep="last")
+    )
+    fusion = _sentencia_fusion(
+        tabla, staging, list(df.columns), columna_clave, columna_version,
+        incluir_iguales
+    )
+
+    with get_engine().connect() as conn:
+        if BACKEND == "sqlite":
+            conn.exec_driver_sql(
+                f"CREATE TEMP TABLE `{staging}` AS "
+                f"SELECT * FROM `{tabla}` WHERE 0"
+            )
+        else:
+            # CREATE TABLE ... LIKE copia columnas e índices, no las FK
+            conn.exec_driver_sql(
+                f"CREATE TEMPORARY TABLE `{staging}` LIKE `{tabla}`"
+            )
+        conn.commit()
+
+        try:
+            for i in range(0, len(df), chunk_size):
+                metodo = _cargar_chunk(
+                    conn, df.iloc[i:i + chunk_size], staging
+                )
+                with conn.begin():
+                    conn.exec_driver_sql(fusion)
+                    conn.exec_driver_sql(f"DELETE FROM `{staging}`")
+
+        finally:
+            temporal = "" if BACKEND == "sqlite" else "TEMPORARY "
+            conn.exec_driver_sql(
+                f"DROP {temporal}TABLE IF EXISTS `{staging}`"
+            )
+            conn.commit()
+
+    segundos = time.perf_counter() - inicio
+    filas_segundo = len(df) / segundos if segundos > 0 else float("inf")
+    registrar_carga(tabla, len(df), segundos, f"{metodo} + fusión")
+
+    print(
+        f"{tabla}: {len(df)} filas en {segundos:.2f}s "
+        f"({filas_segundo:,.0f} filas/s, {metodo} + fusión)"
+    )
+
+    return filas_segundo
@@ -0,0 +1,219 @@
+"""
+Claves naturales y caché de identificadores surrogate.
+
+Responsabilidad:
+- Calcular la clave natural de empresas (NIF + nombre) y órganos
+  (DIR3 + NIF + nombre) como SHA-256 de los campos concatenados,
+  de modo que los valores nulos también formen parte de la clave
+- Mantener una caché persistente clave -> id por tabla, para consultar
+  en la base de datos solo los ids de claves nuevas en cada lote, y
+  una sola caché cargada por tabla durante la ejecución
+  (`cache_claves`, `guardar_claves`). Cada base de datos de destino
+  tiene su propio archivo de caché (`huella_bd`)
+"""
+
+import hashlib
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import URL
+
+from src.config import INTERIM_DATA_DIR
+
+
+# Columnas de la clave natural de cada entidad, en el orden del hash
+COLUMNAS_CLAVE = {
+    "empresa": ["nif_empresa", "empresa_nombre"],
+    "organo": ["organo_dir3", "organo_nif", "organo_nombre"],
+}
+
+# Separador entre campos de la clave (no aparece en los datos)
+_SEPARADOR = "\x1f"
+
+# Claves por consulta al resolver ids
+_CLAVES_POR_CONSULTA = 1000
+
+
+def huella_bd(url: URL) -> str:
+    """
+    Identificador corto de la base de datos de destino: SHA-256 de
+    backend, host, puerto y nombre de la base de datos (sin
+    credenciales).
+    """
+    partes = [url.get_backend_name(), url.host, url.port, url.database]
+    texto = _SEPARADOR.join("" if p is None else str(p) for p in partes)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:12]
+
+
+def clave_natural(df: pd.DataFrame, columnas: list) -> pd.Series:
+    """
+    Devuelve la clave natural (SHA-256 hexadecimal) de cada fila.
+
+    Los nulos se tratan como cadena vacía. El hash se calcula una sola
+    vez por combinación distinta de valores.
+    """
+    texto = df[columnas[0]].fillna("").astype(str)
+    for columna in columnas[1:]:
+        texto = texto + _SEPARADOR + df[columna].fillna("").astype(str)
+
+    hashes = {
+        valor: hashlib.sha256(valor.encode("utf-8")).hexdigest()
+        for valor in texto.unique()
+    }
+    return texto.map(hashes)
+
+
+class CacheClaves:
+    """
+    Caché persistente clave natural -> id de una tabla.
+
+    Se guarda en Parquet en `INTERIM_DATA_DIR`, en un archivo por tabla
+    y base de datos de destino (`huella`, ver `huella_bd`), para que
+    una caché no se valide contra otra base de datos. Al cargarla se comprueba
+    contra la base de datos que tiene tantas claves como filas la tabla
+    (COUNT(*)), el mismo id máximo y la misma clave en ese id; si no
+    (carga interrumpida, base de datos recreada), se reconstruye con
+    una sola lectura de la tabla.
+
+    Se carga una vez por ejecución y solo se reescribe si se han
+    resuelto claves nuevas (ver `guardar`).
+    """
+
+    def __init__(
+        self,
+        tabla: str,
+        columna_clave: str,
+        columna_id: str,
+        huella: str
+    ):
+        self.tabla = tabla
+        self.columna_clave = columna_clave
+        self.columna_id = columna_id
+        self.path = (
+            INTERIM_DATA_DIR / f"cache_claves_{huella}_{tabla}.parquet"
+        )
+        self.ids = {}
+        self.cambios = False
+
+    def _vigente(self, conn, df: pd.DataFrame) -> bool:
+        filas, id_maximo = conn.execute(
+            text(
+                f"SELECT COUNT(*), MAX({self.columna_id}) "
+                f"FROM {self.tabla}"
+            )
+        ).one()
+        if filas != len(df):
+            return False
+        if filas == 0:
+            return True
+
+        ultima = df.loc[df["id"].idxmax()]
+        if int(ultima["id"]) != id_maximo:
+            return False
+
+        clave_sql = conn.execute(
+            text(
+                f"SELECT {self.columna_clave} FROM {self.tabla} "
+                f"WHERE {self.columna_id} = :id"
+            ),
+            {"id": id_maximo}
+        ).scalar()
+        return clave_sql == ultima["clave"]
+
+    def cargar(self, conn) -> None:
+        if self.path.exists():
+            df = pd.read_parquet(self.path)
+            if self._vigente(conn, df):
+                self.ids = dict(zip(df["clave"], df["id"].astype(int)))
+                return
+            print(
+                f"Caché de claves de {self.tabla} obsoleta: "
+                "se reconstruye"
+            )
+
+        filas = conn.execute(
+            text(
+                f"SELECT {self.columna_clave}, {self.columna_id} "
+                f"FROM {self.tabla}"
+            )
+        )
+        self.ids = {clave: int(id_) for clave, id_ in filas}
+        self.cambios = True
+
+    def guardar(self) -> None:
+        """
+        Escribe la caché si ha cambiado desde que se cargó o guardó.
+        """
+        if not self.cambios:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = self.path.with_suffix(".tmp")
+        pd.DataFrame(
+            {"clave": list(self.ids), "id": list(self.ids.values())}
+        ).to_parquet(tmp_path, index=False)
+        tmp_path.replace(self.path)
+        self.cambios = False
+
+    def resolver(self, conn, claves) -> dict:
+        """
+        Devuelve {clave: id} para `claves`, consultando en la base de
+        datos solo las que no están en la caché.
+        """
+        nuevas = [
+            clave for clave in pd.unique(pd.Series(list(claves)))
+            if clave not in self.ids
+        ]
+
+        for i in range(0, len(nuevas), _CLAVES_POR_CONSULTA):
+            bloque = nuevas[i:i + _CLAVES_POR_CONSULTA]
+            marcadores = ", ".join(f":c{j}" for j in range(len(bloque)))
+            filas = conn.execute(
+                text(
+                    f"SELECT {self.columna_clave}, {self.columna_id} "
+                    f"FROM {self.tabla} "
+                    f"WHERE {self.columna_clave} IN ({marcadores})"
+                ),
+                {f"c{j}": clave for j, clave in enumerate(bloque)}
+            )
+            self.ids.update({clave: int(id_) for clave, id_ in filas})
+
+        if nuevas:
+            self.cambios = True
+            print(f"{self.tabla}: {len(nuevas)} ids nuevos resueltos")
+
+        return self.ids
+
+
+# ======================================================
+# CACHÉS DE LA EJECUCIÓN
+# ======================================================
+
+# Una caché por base de datos y tabla: se carga al primer uso y se
+# guarda una vez al final, en lugar de leerla y reescribirla en cada lote
+_caches = {}
+
+
+def cache_claves(conn, tabla: str, columna_clave: str) -> CacheClaves:
+    """
+    Devuelve la caché de claves de `tabla`, cargándola solo la primera
+    vez.
+    """
+    huella = huella_bd(conn.engine.url)
+    cache = _caches.get((huella, tabla))
+    if cache is None:
+        cache = CacheClaves(tabla, columna_clave, f"{tabla}_id", huella)
+        cache.cargar(conn)
+        _caches[(huella, tabla)] = cache
+    return cache
+
+
+def guardar_claves() -> None:
+    """
+    Guarda las cachés con claves nuevas y las descarta de memoria: la
+    siguiente carga vuelve a leerlas (y validarlas) desde disco.
+    """
+    for cache in _caches.values():
+        cache.guardar()
+    _caches.clear()
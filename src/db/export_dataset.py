@@ -4,85 +4,565 @@ Exportación de dataset analítico para storytelling.
 Responsabilidad:
 - leer datos desde la base de datos (fuente de verdad)
 - realizar joins entre tablas normalizadas
-- generar un dataset denormalizado (1 fila = 1 contrato)
-- exportar a formato Parquet y CSV
+- generar un dataset denormalizado (1 fila = 1 contrato vigente: los
+  dados de baja, con `fecha_baja`, no se exportan)
+- exportar a Parquet particionado por año/mes de adjudicación
+  (y opcionalmente a CSV)
+
+La consulta se lee con un cursor del lado del servidor en chunks y cada
+chunk se escribe en cuanto llega, de modo que la memoria usada depende
+del tamaño de chunk y no del tamaño del dataset.
+
+Estructura de salida (particionado Hive, legible con
+`pd.read_parquet(..., filters=[("anio", "=", 2024)])`):
+
+    data/export/contratos_menores_test.parquet/
+        anio=2024/mes=1/part-0.parquet
+        ...
+        anio=0/mes=0/part-0.parquet      (sin fecha de adjudicación)
+
+El directorio es un enlace simbólico a la versión de la última
+exportación (`contratos_menores_test.parquet.v<fecha>`), que se cambia
+de forma atómica (ver `_reemplazar_directorio`). La exportación
+incremental también crea una versión nueva: escribe las particiones
+cambiadas y enlaza (enlaces duros) las demás desde la versión vigente.
 """
 
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
 from pathlib import Path
+
 import pandas as pd
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+from src.config import CSV_PATH, DATASET_PATH, EXPORT_CHUNK_SIZE
+from src.db.engine import BACKEND, conexion_streaming, get_engine
+from src.transform.tipos import a_tabla_arrow, aplicar_esquema
+
+
+# Partición (anio=0, mes=0) de los contratos sin fecha de adjudicación.
+# No se usa la partición nula de Hive: pyarrow lee las particiones como
+# diccionario y no admite nulos al convertir a pandas
+PARTICION_SIN_FECHA = 0
+
+
+# Contratos con las tablas que se denormalizan en el dataset
+_FROM_DATASET = """FROM contrato c
+LEFT JOIN empresa e
+    ON c.contr_empresa_id = e.empresa_id
+LEFT JOIN organo o
+    ON c.contr_organo_id = o.organo_id
+LEFT JOIN tipo_contrato tc
+    ON c.codigo_tipo_contrato = tc.codigo_tipo_contrato
+LEFT JOIN tipo_organo to2
+    ON o.tipo_organo_codigo = to2.codigo_tipo_organo
+LEFT JOIN tipo_actividad_organo tao
+    ON o.actividad_organo_codigo = tao.codigo_actividad_organo
+"""
+
+QUERY_DATASET = f"""
+SELECT
+    c.id_entry_num,
+    c.id_entry,
+    c.titulo,
+    c.id_licitacion,
+    c.fecha_actualizacion,
+    c.fecha_adjudicacion,
+    c.estado,
+
+    tc.nombre_contrato AS tipo_contrato,
+    c.codigo_subtipo_contrato,
+
+    c.importe_estimado,
+    c.importe_total,
+    c.importe_sin_impuestos,
+
+    c.codigo_cpv_principal,
+    c.codigo_region_nuts,
+    c.ofertas_recibidas,
+    c.id_plataforma,
+
+    e.empresa_nombre,
+    e.nif_empresa,
+    e.empresa_es_pyme,
+    e.empresa_pais,
+
+    o.organo_nombre,
+    o.organo_dir3,
+    o.organo_postalcode,
+    o.organo_localidad,
+    o.organo_email,
+    o.organo_telefono,
+    o.organo_nif,
+
+    to2.nombre_tipo_organo AS tipo_organo,
+    tao.nombre_actividad_organo AS actividad_organo
+
+{_FROM_DATASET}WHERE c.fecha_baja IS NULL
+"""
+
+
+# ======================================================
+# PARTICIONES
+# ======================================================
+
+def _particiones(df: pd.DataFrame):
+    """
+    Divide un chunk por (año, mes) de fecha_adjudicacion.
+
+    Yields
+    ------
+    tuple
+        (anio, mes, DataFrame)
+    """
+    fecha = df["fecha_adjudicacion"]
+    anio = fecha.dt.year.fillna(PARTICION_SIN_FECHA).astype(int)
+    mes = fecha.dt.month.fillna(PARTICION_SIN_FECHA).astype(int)
+
+    for (a, m), grupo in df.groupby([anio, mes], sort=False):
+        yield int(a), int(m), grupo
 
-from src.db.engine import engine
 
+def _ruta_particion(base: Path, anio: int, mes: int) -> Path:
+    return base / f"anio={anio}" / f"mes={mes}" / "part-0.parquet"
 
-# Directorio de salida de datasets analíticos
-EXPORT_DIR = Path("data/export")
-EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
+# ======================================================
+# ESTADO POR PARTICIÓN
+# ======================================================
 
-def exportar_dataset() -> None:
+# Filas vigentes y última carga de cada partición. Si cambia
+# cualquiera de los dos valores la partición se reescribe: la fecha de
+# carga detecta altas, actualizaciones y bajas de contratos, y también
+# cambios en las empresas, órganos y catálogos que se denormalizan
+# (cada tabla lleva su fecha_carga, que el upsert solo actualiza si
+# cambian los datos); el recuento detecta contratos que han salido de
+# la partición
+if BACKEND == "sqlite":
+    _ANIO = "CAST(strftime('%Y', c.fecha_adjudicacion) AS INTEGER)"
+    _MES = "CAST(strftime('%m', c.fecha_adjudicacion) AS INTEGER)"
+else:
+    _ANIO = "YEAR(c.fecha_adjudicacion)"
+    _MES = "MONTH(c.fecha_adjudicacion)"
+
+QUERY_ESTADO = f"""
+SELECT
+    COALESCE({_ANIO}, 0) AS anio,
+    COALESCE({_MES}, 0) AS mes,
+    SUM(CASE WHEN c.fecha_baja IS NULL THEN 1 ELSE 0 END) AS filas,
+    MAX(c.fecha_carga),
+    MAX(e.fecha_carga),
+    MAX(o.fecha_carga),
+    MAX(tc.fecha_carga),
+    MAX(to2.fecha_carga),
+    MAX(tao.fecha_carga)
+{_FROM_DATASET}GROUP BY anio, mes
+"""
+
+
+def _ruta_estado(destino: Path) -> Path:
+    return destino.with_name(f"{destino.stem}_estado.json")
+
+
+def _clave_particion(anio: int, mes: int) -> str:
+    return f"anio={anio}/mes={mes}"
+
+
+def _estado_actual() -> dict:
     """
-    Genera el dataset analítico a partir de la base de datos
-    y lo exporta a Parquet y CSV.
+    Devuelve {"anio=Y/mes=M": {"filas": n, "max_fecha_carga": iso}}
+    según la base de datos.
     """
+    with get_engine().connect() as conn:
+        filas = conn.execute(text(QUERY_ESTADO)).fetchall()
+
+    def ultima(fechas):
+        fechas = [pd.Timestamp(f) for f in fechas if f is not None]
+        return max(fechas).isoformat() if fechas else None
 
-    query = """
-    SELECT
-        c.id_entry_num,
-        c.id_entry,
-        c.titulo,
-        c.id_licitacion,
-        c.fecha_actualizacion,
-        c.fecha_adjudicacion,
-        c.estado,
+    return {
+        _clave_particion(int(anio), int(mes)): {
+            "filas": int(n),
+            "max_fecha_carga": ultima(fechas),
+        }
+        for anio, mes, n, *fechas in filas
+    }
 
-        tc.nombre_contrato AS tipo_contrato,
-        c.codigo_subtipo_contrato,
 
-        c.importe_estimado,
-        c.importe_total,
-        c.importe_sin_impuestos,
+def _cargar_estado(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
 
-        c.codigo_cpv_principal,
-        c.codigo_region_nuts,
-        c.ofertas_recibidas,
-        c.id_plataforma,
 
-        e.empresa_nombre,
-        e.nif_empresa,
-        e.empresa_es_pyme,
-        e.empresa_pais,
+def _guardar_estado(estado: dict, path: Path) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(
+        json.dumps(estado, indent=2, sort_keys=True),
+        encoding="utf-8"
+    )
+    os.replace(tmp_path, path)
 
-        o.organo_nombre,
-        o.organo_dir3,
-        o.organo_postalcode,
-        o.organo_localidad,
-        o.organo_email,
-        o.organo_telefono,
-        o.organo_nif,
 
-        to2.nombre_tipo_organo AS tipo_organo,
-        tao.nombre_actividad_organo AS actividad_organo
+def _filtro_particiones(particiones: list) -> tuple:
+    """
+    Construye la condición WHERE que selecciona las particiones
+    (anio, mes) por rango de fecha_adjudicacion.
 
-    FROM contrato c
-    LEFT JOIN empresa e ON c.contr_empresa_id = e.empresa_id
-    LEFT JOIN organo o ON c.contr_organo_id = o.organo_id
-    LEFT JOIN tipo_contrato tc ON c.codigo_tipo_contrato = tc.codigo_tipo_contrato
-    LEFT JOIN tipo_organo to2 ON o.tipo_organo_codigo = to2.codigo_tipo_organo
-    LEFT JOIN tipo_actividad_organo tao ON o.actividad_organo_codigo = tao.codigo_actividad_organo
+    Returns
+    -------
+    tuple
+        (condición SQL, parámetros)
     """
+    condiciones = []
+    params = {}
+
+    for i, (anio, mes) in enumerate(particiones):
+        if anio == PARTICION_SIN_FECHA:
+            condiciones.append("c.fecha_adjudicacion IS NULL")
+            continue
+
+        desde = pd.Timestamp(year=anio, month=mes, day=1)
+        hasta = desde + pd.DateOffset(months=1)
+        params[f"desde{i}"] = desde.to_pydatetime()
+        params[f"hasta{i}"] = hasta.to_pydatetime()
+        condiciones.append(
+            f"(c.fecha_adjudicacion >= :desde{i} "
+            f"AND c.fecha_adjudicacion < :hasta{i})"
+        )
+
+    return " OR ".join(condiciones), params
+
+
+# ======================================================
+# ESCRITURA
+# ======================================================
+
+def _leer_chunks(query: str, params: dict, chunk_size: int):
+    """
+    Lee `query` con un cursor del lado del servidor y devuelve los
+    chunks ya normalizados al esquema del dataset.
+    """
+    with conexion_streaming(chunk_size) as conn:
+        chunks = pd.read_sql(
+            text(query), conn, params=params, chunksize=chunk_size
+        )
+        for chunk in chunks:
+            yield aplicar_esquema(chunk)
+
+
+def _escribir_particiones(
+    chunks,
+    base: Path,
+    estadisticas: bool,
+    csv_path: Path = None
+) -> tuple:
+    """
+    Escribe los chunks en un archivo por partición bajo `base`.
+
+    Returns
+    -------
+    tuple
+        (filas escritas, set de particiones (anio, mes) escritas)
+    """
+    writers = {}
+    filas = 0
+
+    try:
+        for chunk in chunks:
+            for anio, mes, grupo in _particiones(chunk):
+                tabla = a_tabla_arrow(grupo)
+
+                writer = writers.get((anio, mes))
+                if writer is None:
+                    path = _ruta_particion(base, anio, mes)
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    # El esquema de la primera tabla lleva los metadatos
+                    # de pandas: al leer se recuperan Int32 y boolean
+                    writer = pq.ParquetWriter(
+                        path,
+                        tabla.schema,
+                        write_statistics=estadisticas
+                    )
+                    writers[(anio, mes)] = writer
+
+                writer.write_table(tabla)
+
+            if csv_path is not None:
+                chunk.to_csv(
+                    csv_path,
+                    mode="w" if filas == 0 else "a",
+                    header=filas == 0,
+                    index=False
+                )
 
-    df = pd.read_sql(query, engine)
+            filas += len(chunk)
+            print(f"  {filas} filas exportadas")
 
-    parquet_path = EXPORT_DIR / "contratos_menores_test.parquet"
-    csv_path = EXPORT_DIR / "contratos_menores_test.csv"
+    finally:
+        for writer in writers.values():
+            writer.close()
 
-    df.to_parquet(parquet_path, index=False)
-    df.to_csv(csv_path, index=False)
+    return filas, set(writers)
 
+
+def _nueva_version(destino: Path) -> Path:
+    """
+    Directorio, junto a `destino`, para una nueva versión del dataset.
+    """
+    return destino.with_name(
+        f"{destino.name}.v{datetime.now():%Y%m%d%H%M%S%f}"
+    )
+
+
+def _borrar(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def _renombrar_directorio(version: Path, destino: Path) -> None:
+    """
+    Sustituye `destino` por `version` con dos renombrados: entre ambos
+    `destino` no existe durante un instante.
+    """
+    anterior = destino.with_name(destino.name + ".old")
+    _borrar(anterior)
+
+    if destino.exists() or destino.is_symlink():
+        destino.rename(anterior)
+    version.rename(destino)
+
+    _borrar(anterior)
+
+
+def _reemplazar_directorio(version: Path, destino: Path) -> None:
+    """
+    Publica `version` como `destino`.
+
+    `destino` es un enlace simbólico a la versión vigente y se sustituye
+    con os.replace (atómico): los lectores ven el dataset anterior o el
+    nuevo, nunca uno a medias, y `destino` existe siempre. La versión
+    anterior se conserva hasta la siguiente exportación para quien aún
+    la esté leyendo.
+
+    Si no se pueden crear enlaces (Windows sin permisos) se recurre a
+    `_renombrar_directorio`, con un instante sin `destino`; lo mismo
+    ocurre una sola vez al pasar de un directorio normal (exportaciones
+    anteriores) a un enlace.
+    """
+    anterior = destino.resolve() if destino.is_symlink() else None
+
+    enlace = destino.with_name(destino.name + ".enlace")
+    _borrar(enlace)
+    try:
+        enlace.symlink_to(version.name, target_is_directory=True)
+    except OSError:
+        _renombrar_directorio(version, destino)
+    else:
+        if destino.exists() and not destino.is_symlink():
+            _renombrar_directorio(enlace, destino)
+        else:
+            os.replace(enlace, destino)
+
+    # Versiones de exportaciones anteriores o fallidas
+    vigentes = {version.resolve(), anterior}
+    for vieja in destino.parent.glob(f"{destino.name}.v*"):
+        if vieja.resolve() not in vigentes:
+            _borrar(vieja)
+
+
+def _exportar_completo(
+    chunk_size: int,
+    estadisticas: bool,
+    csv: bool,
+    destino: Path
+) -> int:
+    tmp_csv = CSV_PATH.with_suffix(".csv.tmp")
+    version = _nueva_version(destino)
+
+    filas, particiones = _escribir_particiones(
+        _leer_chunks(QUERY_DATASET, {}, chunk_size),
+        version,
+        estadisticas,
+        csv_path=tmp_csv if csv else None
+    )
+
+    version.mkdir(parents=True, exist_ok=True)
+    _reemplazar_directorio(version, destino)
+    if csv and tmp_csv.exists():
+        tmp_csv.replace(CSV_PATH)
+
+    print(f"Parquet: {destino} ({len(particiones)} particiones, "
+          f"{filas} filas)")
+    if csv:
+        print(f"CSV:     {CSV_PATH}")
+
+    return filas
+
+
+def _enlazar_o_copiar(origen: Path, destino: Path) -> None:
+    """
+    Enlace duro de `origen` en `destino` (copia si el sistema de
+    archivos no lo admite). Los archivos de una versión no se modifican
+    después de publicarla, así que dos versiones pueden compartirlos.
+    """
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copy2(origen, destino)
+
+
+def _exportar_particiones(
+    particiones: list,
+    chunk_size: int,
+    estadisticas: bool,
+    destino: Path
+) -> int:
+    """
+    Genera una nueva versión del dataset con `particiones` reescritas y
+    el resto enlazadas desde la versión vigente, y la publica como la
+    exportación completa (`_reemplazar_directorio`): los lectores ven
+    la versión anterior o la nueva entera, nunca una mezcla.
+    """
+    condicion, params = _filtro_particiones(particiones)
+    query = f"{QUERY_DATASET}AND ({condicion})"
+    version = _nueva_version(destino)
+
+    filas, escritas = _escribir_particiones(
+        _leer_chunks(query, params, chunk_size),
+        version,
+        estadisticas
+    )
+
+    # Las particiones cambiadas que no se han escrito se han quedado
+    # sin contratos: no pasan a la nueva versión
+    cambiadas = {_clave_particion(anio, mes) for anio, mes in particiones}
+    for particion in destino.glob("anio=*/mes=*"):
+        clave = particion.relative_to(destino).as_posix()
+        if clave in cambiadas:
+            continue
+        for path in particion.iterdir():
+            _enlazar_o_copiar(path, version / clave / path.name)
+
+    version.mkdir(parents=True, exist_ok=True)
+    _reemplazar_directorio(version, destino)
+
+    print(f"Parquet: {destino} ({len(escritas)} de {len(particiones)} "
+          f"particiones cambiadas reescritas, {filas} filas)")
+
+    return filas
+
+
+def exportar_dataset(
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    estadisticas: bool = True,
+    csv: bool = False,
+    destino: Path = DATASET_PATH,
+    incremental: bool = False
+) -> int:
+    """
+    Genera el dataset analítico a partir de la base de datos y lo
+    exporta en streaming a Parquet particionado (y opcionalmente CSV).
+
+    Parameters
+    ----------
+    chunk_size : int
+        Filas leídas del cursor del servidor por chunk
+    estadisticas : bool
+        Escribir estadísticas min/max por row group (permiten al lector
+        saltar row groups al filtrar)
+    csv : bool
+        Exportar además un CSV único, escrito también por chunks. Solo
+        en la exportación completa
+    destino : Path
+        Directorio del dataset particionado
+    incremental : bool
+        Reescribir solo las particiones cuyo número de filas o última
+        fecha de carga han cambiado desde la exportación anterior
+
+    Returns
+    -------
+    int
+        Filas exportadas
+    """
+    destino.parent.mkdir(parents=True, exist_ok=True)
+
+    ruta_estado = _ruta_estado(destino)
+
+    # El estado se lee antes que los datos: lo cargado durante la
+    # exportación queda pendiente para la siguiente
+    estado = _estado_actual()
+    anterior = _cargar_estado(ruta_estado)
+
+    if incremental and destino.is_dir() and anterior:
+        if csv:
+            print("El CSV solo se genera en la exportación completa")
+
+        cambiadas = sorted(
+            tuple(
+                int(valor.split("=")[1]) for valor in clave.split("/")
+            )
+            for clave in set(estado) | set(anterior)
+            if estado.get(clave) != anterior.get(clave)
+        )
+        if not cambiadas:
+            print("Dataset analítico al día: ninguna partición cambiada")
+            return 0
+
+        filas = _exportar_particiones(
+            cambiadas, chunk_size, estadisticas, destino
+        )
+    else:
+        filas = _exportar_completo(
+            chunk_size, estadisticas, csv, destino
+        )
+
+    _guardar_estado(estado, ruta_estado)
     print("Dataset analítico generado correctamente")
-    print(f"Parquet: {parquet_path}")
-    print(f"CSV:     {csv_path}")
+
+    return filas
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Exporta el dataset analítico de contratos"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=EXPORT_CHUNK_SIZE,
+        help="filas por chunk leído de la base de datos",
+    )
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help="exportar también un CSV",
+    )
+    parser.add_argument(
+        "--sin-estadisticas",
+        action="store_true",
+        help="no escribir estadísticas por row group",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="reescribir solo las particiones cambiadas",
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    exportar_dataset()
\ No newline at end of file
+    args = parse_args()
+    exportar_dataset(
+        chunk_size=args.chunk_size,
+        estadisticas=not args.sin_estadisticas,
+        csv=args.csv,
+        incremental=args.incremental
+    )
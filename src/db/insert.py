@@ -1,6 +1,13 @@
 import pandas as pd
 
-from src.db.engine import engine
+from src.db.bulk import (
+    cargar_dataframe,
+    fusionar_dataframe,
+    upsert_dataframe,
+)
+from src.db.claves import COLUMNAS_CLAVE, cache_claves, clave_natural
+from src.db.engine import get_engine
+from src.transform.cleaning import COLUMNAS_BAJA
 from src.config import (
     MAPA_TIPO_CONTRATO,
     MAPA_TIPO_ORGANO,
@@ -15,38 +22,72 @@ from src.config import (
 def insertar_tablas_maestras() -> None:
     """
     Inserta las tablas de referencia (catálogos).
-    Se ejecuta una sola vez.
+
+    Es idempotente: los códigos ya existentes solo actualizan su nombre
+    (y, si cambia, su fecha_carga, que la exportación incremental usa
+    para reescribir las particiones afectadas).
     """
     pd.DataFrame(
         MAPA_TIPO_CONTRATO.items(),
         columns=["codigo_tipo_contrato", "nombre_contrato"]
-    ).to_sql(
-        "tipo_contrato",
-        engine,
-        if_exists="append",
-        index=False
+    ).pipe(
+        upsert_dataframe, "tipo_contrato",
+        "codigo_tipo_contrato", ["nombre_contrato"],
+        columna_cambio="fecha_carga"
     )
 
     pd.DataFrame(
         MAPA_TIPO_ORGANO.items(),
         columns=["codigo_tipo_organo", "nombre_tipo_organo"]
-    ).to_sql(
-        "tipo_organo",
-        engine,
-        if_exists="append",
-        index=False
+    ).pipe(
+        upsert_dataframe, "tipo_organo",
+        "codigo_tipo_organo", ["nombre_tipo_organo"],
+        columna_cambio="fecha_carga"
     )
 
     pd.DataFrame(
         MAPA_ACTIVIDAD_ORGANO.items(),
         columns=["codigo_actividad_organo", "nombre_actividad_organo"]
-    ).to_sql(
-        "tipo_actividad_organo",
-        engine,
-        if_exists="append",
-        index=False
+    ).pipe(
+        upsert_dataframe, "tipo_actividad_organo",
+        "codigo_actividad_organo", ["nombre_actividad_organo"],
+        columna_cambio="fecha_carga"
+    )
+
+
+# ======================================================
+# ENTIDADES CON CLAVE NATURAL
+# ======================================================
+
+def _upsert_entidades(
+    df_entidad: pd.DataFrame,
+    tabla: str,
+    columnas_clave: list,
+    columnas_actualizar: list
+) -> dict:
+    """
+    Inserta o actualiza las entidades por su clave natural y devuelve
+    {clave: id} para todas ellas.
+
+    Los ids se resuelven con la caché de claves de la tabla, cargada
+    una vez por ejecución, de modo que solo se consultan en SQL los de
+    claves nuevas. Se guarda con `src.db.claves.guardar_claves` al
+    terminar la carga.
+    """
+    columna_clave = f"{tabla}_clave"
+    df_entidad[columna_clave] = clave_natural(df_entidad, columnas_clave)
+
+    # fecha_carga solo cambia si cambian los datos: la exportación
+    # incremental reescribe las particiones de sus contratos
+    upsert_dataframe(
+        df_entidad, tabla, columna_clave, columnas_actualizar,
+        columna_cambio="fecha_carga"
     )
 
+    with get_engine().connect() as conn:
+        cache = cache_claves(conn, tabla, columna_clave)
+        return cache.resolver(conn, df_entidad[columna_clave])
+
 
 # ======================================================
 # EMPRESA
@@ -54,8 +95,11 @@ def insertar_tablas_maestras() -> None:
 
 def insertar_empresas(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Inserta empresas y devuelve el DataFrame original
-    con empresa_id obtenido desde SQL.
+    Inserta o actualiza empresas (clave natural: NIF + nombre) y
+    devuelve el DataFrame original con empresa_id.
+
+    Reejecutar la carga no duplica empresas: las existentes solo
+    actualizan país e indicador PYME.
     """
     df_empresa = (
         df[
@@ -81,28 +125,18 @@ def insertar_empresas(df: pd.DataFrame) -> pd.DataFrame:
         )
     )
 
-    df_empresa.to_sql(
+    ids = _upsert_entidades(
+        df_empresa,
         "empresa",
-        engine,
-        if_exists="append",
-        index=False
+        columnas_clave=COLUMNAS_CLAVE["empresa"],
+        columnas_actualizar=["empresa_es_pyme", "empresa_pais"]
     )
 
-    # Leer IDs desde SQL
-    df_empresa_sql = pd.read_sql(
-        "SELECT * FROM empresa",
-        engine
-    )
-
-    # Merge para obtener empresa_id
-    df = df.merge(
-        df_empresa_sql[
-            ["empresa_id", "empresa_nombre", "nif_empresa"]
-        ],
-        how="left",
-        left_on=["empresa_ganadora", "nif_empresa"],
-        right_on=["empresa_nombre", "nif_empresa"]
-    ).drop(columns=["empresa_nombre"])
+    # Asignar empresa_id a cada contrato por su clave natural
+    df = df.copy()
+    df["empresa_id"] = clave_natural(
+        df, ["nif_empresa", "empresa_ganadora"]
+    ).map(ids)
 
     return df
 
@@ -113,8 +147,8 @@ def insertar_empresas(df: pd.DataFrame) -> pd.DataFrame:
 
 def insertar_organos(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Inserta órganos de contratación y devuelve el DataFrame
-    con organo_id obtenido desde SQL.
+    Inserta o actualiza órganos de contratación (clave natural:
+    DIR3 + NIF + nombre) y devuelve el DataFrame con organo_id.
     """
     df_organo = (
         df[
@@ -149,30 +183,25 @@ def insertar_organos(df: pd.DataFrame) -> pd.DataFrame:
         )
     )
 
-    df_organo.to_sql(
+    ids = _upsert_entidades(
+        df_organo,
         "organo",
-        engine,
-        if_exists="append",
-        index=False
-    )
-
-    # Leer IDs desde SQL
-    df_organo_sql = pd.read_sql(
-        "SELECT * FROM organo",
-        engine
+        columnas_clave=COLUMNAS_CLAVE["organo"],
+        columnas_actualizar=[
+            "tipo_organo_codigo",
+            "actividad_organo_codigo",
+            "organo_postalcode",
+            "organo_localidad",
+            "organo_email",
+            "organo_telefono",
+        ]
     )
 
-    # Merge para obtener organo_id
-    df = df.merge(
-        df_organo_sql[
-            ["organo_id", "organo_nombre", "organo_nif", "organo_dir3"]
-        ],
-        how="left",
-        left_on=["nombre_organo", "nif_organo", "id_dir3"],
-        right_on=["organo_nombre", "organo_nif", "organo_dir3"]
-    ).drop(
-        columns=["organo_nombre", "organo_nif", "organo_dir3"]
-    )
+    # Asignar organo_id a cada contrato por su clave natural
+    df = df.copy()
+    df["organo_id"] = clave_natural(
+        df, ["id_dir3", "nif_organo", "nombre_organo"]
+    ).map(ids)
 
     return df
 
@@ -181,9 +210,20 @@ def insertar_organos(df: pd.DataFrame) -> pd.DataFrame:
 # CONTRATO
 # ======================================================
 
-def insertar_contratos(df: pd.DataFrame) -> None:
+def insertar_contratos(df: pd.DataFrame, upsert: bool = True) -> None:
     """
-    Inserta contratos en la base de datos.
+    Inserta contratos en la base de datos mediante carga masiva
+    (ver src.db.bulk).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Contratos limpios con organo_id y empresa_id
+    upsert : bool
+        Si True, un contrato ya existente solo se actualiza cuando su
+        fecha_actualizacion entrante es más reciente (los feeds pueden
+        cargarse en cualquier orden). Si False, inserción directa: más
+        rápida, pero falla ante claves ya cargadas.
     """
     df_contrato = df[
         [
@@ -213,9 +253,62 @@ def insertar_contratos(df: pd.DataFrame) -> None:
         }
     )
 
-    df_contrato.to_sql(
+    # Identifica el lote de carga; la exportación incremental lo usa
+    # para detectar qué particiones han cambiado
+    df_contrato["fecha_carga"] = pd.Timestamp.now().floor("s")
+
+    # Una versión publicada después de una baja vuelve a darlo de alta
+    df_contrato["fecha_baja"] = pd.NaT
+
+    if upsert:
+        fusionar_dataframe(
+            df_contrato,
+            "contrato",
+            columna_clave="id_entry_num",
+            columna_version="fecha_actualizacion"
+        )
+    else:
+        cargar_dataframe(df_contrato, "contrato")
+
+
+# ======================================================
+# BAJAS
+# ======================================================
+
+def insertar_bajas(df: pd.DataFrame) -> None:
+    """
+    Da de baja los contratos retirados del feed (<at:deleted-entry>)
+    sin borrarlos: se marca `fecha_baja` y la exportación los excluye.
+
+    Se cargan después de los contratos y con la misma fusión por
+    versión (ver src.db.bulk): la baja es una versión más, con
+    `fecha_actualizacion` igual a su fecha, que solo escribe las
+    columnas de `COLUMNAS_BAJA` y fecha_carga y conserva el resto de
+    la fila. Se aplica si su versión es igual o posterior a la
+    almacenada, así que el contrato dado de baja guarda los datos de
+    su última publicación; una publicación posterior lo vuelve a dar
+    de alta. Si el contrato aún no está cargado queda una fila con
+    solo la baja, y una versión anterior cargada después no la
+    completa.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Bajas limpias (ver `src.transform.cleaning.separar_bajas`)
+    """
+    df_baja = df.loc[df["id_entry_num"].notna(), COLUMNAS_BAJA].copy()
+    if df_baja.empty:
+        return
+
+    print(f"Bajas: {len(df_baja)} contratos retirados del feed")
+
+    # fecha_carga marca las particiones de la exportación afectadas
+    df_baja["fecha_carga"] = pd.Timestamp.now().floor("s")
+
+    fusionar_dataframe(
+        df_baja,
         "contrato",
-        engine,
-        if_exists="append",
-        index=False
+        columna_clave="id_entry_num",
+        columna_version="fecha_actualizacion",
+        incluir_iguales=True
     )
@@ -1,18 +1,57 @@
 from pathlib import Path
-from sqlalchemy import text
+from typing import Optional
 
-from src.db.engine import engine
+import pandas as pd
+from sqlalchemy import inspect, text
 
+from src.config import DDL_PATH, DDL_SQLITE_PATH
+from src.db.claves import COLUMNAS_CLAVE, clave_natural
+from src.db.engine import BACKEND, get_engine
 
-def ejecutar_schema(ddl_path: Path) -> None:
+
+# Columnas añadidas después de crear las tablas: CREATE TABLE IF NOT
+# EXISTS no las añade a una base de datos ya existente
+# (tabla, columna, definición)
+COLUMNAS_NUEVAS = [
+    ("contrato", "fecha_carga", "DATETIME NULL DEFAULT NULL"),
+    ("contrato", "fecha_baja", "DATETIME NULL DEFAULT NULL"),
+    ("empresa", "fecha_carga", "DATETIME NULL DEFAULT NULL"),
+    ("organo", "fecha_carga", "DATETIME NULL DEFAULT NULL"),
+    ("tipo_contrato", "fecha_carga", "DATETIME NULL DEFAULT NULL"),
+    ("tipo_organo", "fecha_carga", "DATETIME NULL DEFAULT NULL"),
+    ("tipo_actividad_organo", "fecha_carga", "DATETIME NULL DEFAULT NULL"),
+]
+
+# Claves naturales de empresa y organo (ver src.db.claves), añadidas
+# después de crear las tablas
+# (tabla, columna id, columna clave, FK en contrato, comentario)
+CLAVES_NATURALES = [
+    ("empresa", "empresa_id", "empresa_clave", "contr_empresa_id",
+     "SHA-256 de NIF + nombre"),
+    ("organo", "organo_id", "organo_clave", "contr_organo_id",
+     "SHA-256 de DIR3 + NIF + nombre"),
+]
+
+
+def ruta_ddl() -> Path:
+    """
+    Devuelve el archivo DDL del backend configurado.
+    """
+    return DDL_SQLITE_PATH if BACKEND == "sqlite" else DDL_PATH
+
+
+def ejecutar_schema(ddl_path: Optional[Path] = None) -> None:
     """
     Ejecuta un archivo DDL (.sql) en la base de datos.
 
     Parameters
     ----------
-    ddl_path : Path
-        Ruta al archivo SQL con el esquema
+    ddl_path : Path, optional
+        Ruta al archivo SQL con el esquema (por defecto, el del
+        backend configurado)
     """
+    ddl_path = ddl_path or ruta_ddl()
+
     if not ddl_path.exists():
         raise FileNotFoundError(
             f"No se encontró el archivo DDL: {ddl_path}"
@@ -27,9 +66,173 @@ def ejecutar_schema(ddl_path: Path) -> None:
         if stmt.strip()
     ]
 
-    with engine.connect() as conn:
+    # Los índices sueltos (DDL de SQLite) pueden usar columnas que una
+    # base de datos anterior aún no tiene: se crean tras las migraciones
+    indices = [s for s in statements if s.startswith("CREATE INDEX")]
+
+    with get_engine().connect() as conn:
         for stmt in statements:
+            if stmt not in indices:
+                conn.execute(text(stmt))
+        conn.commit()
+
+        _migrar_claves_naturales(conn, statements)
+        _crear_columnas_nuevas(conn)
+
+        for stmt in indices:
             conn.execute(text(stmt))
         conn.commit()
 
     print("✅ Esquema SQL ejecutado correctamente")
+
+
+def _crear_columnas_nuevas(conn) -> None:
+    """
+    Añade las columnas de `COLUMNAS_NUEVAS` que falten.
+    """
+    inspector = inspect(conn)
+
+    for tabla, columna, definicion in COLUMNAS_NUEVAS:
+        existentes = {c["name"] for c in inspector.get_columns(tabla)}
+        if columna in existentes:
+            continue
+
+        conn.execute(text(
+            f"ALTER TABLE `{tabla}` ADD COLUMN `{columna}` {definicion}"
+        ))
+        conn.commit()
+        print(f"Columna añadida: {tabla}.{columna}")
+
+
+# ======================================================
+# CLAVES NATURALES
+# ======================================================
+
+def _tiene_clave_unica(conn, tabla: str, columna: str) -> bool:
+    inspector = inspect(conn)
+    restricciones = (
+        inspector.get_unique_constraints(tabla)
+        + [i for i in inspector.get_indexes(tabla) if i["unique"]]
+    )
+    return any(r["column_names"] == [columna] for r in restricciones)
+
+
+def _migrar_claves_naturales(conn, sentencias: list) -> None:
+    """
+    Añade la clave natural (NOT NULL y UNIQUE) a las tablas de
+    `CLAVES_NATURALES` creadas antes de que existiera.
+
+    La columna se añade admitiendo NULL y se rellena con
+    `clave_natural`; de cada grupo de filas duplicadas se conserva la
+    de menor id, los contratos pasan a apuntar a ella y el resto se
+    borra. Después la columna pasa a NOT NULL con su índice UNIQUE
+    (en SQLite, reconstruyendo la tabla con la definición del DDL).
+    Cada paso puede repetirse si la migración se interrumpe.
+    """
+    for tabla, columna_id, columna_clave, columna_fk, comentario in (
+        CLAVES_NATURALES
+    ):
+        if _tiene_clave_unica(conn, tabla, columna_clave):
+            continue
+
+        print(f"Migrando {tabla}: clave natural {columna_clave}")
+        existentes = {c["name"] for c in inspect(conn).get_columns(tabla)}
+        if columna_clave not in existentes:
+            conn.execute(text(
+                f"ALTER TABLE `{tabla}` "
+                f"ADD COLUMN `{columna_clave}` CHAR(64) NULL"
+            ))
+
+        _rellenar_clave(conn, tabla, columna_id, columna_clave, columna_fk)
+
+        if BACKEND == "sqlite":
+            _reconstruir_tabla_sqlite(conn, tabla, sentencias)
+        else:
+            conn.execute(text(
+                f"ALTER TABLE `{tabla}` "
+                f"MODIFY COLUMN `{columna_clave}` CHAR(64) NOT NULL "
+                f"COMMENT '{comentario}', "
+                f"ADD UNIQUE INDEX `UQ_{tabla}_clave` "
+                f"(`{columna_clave}` ASC)"
+            ))
+        conn.commit()
+
+
+def _rellenar_clave(
+    conn,
+    tabla: str,
+    columna_id: str,
+    columna_clave: str,
+    columna_fk: str
+) -> None:
+    columnas = COLUMNAS_CLAVE[tabla]
+    df = pd.read_sql(
+        text(f"SELECT `{columna_id}`, {', '.join(columnas)} FROM `{tabla}`"),
+        conn
+    )
+    if df.empty:
+        return
+
+    df["clave"] = clave_natural(df, columnas)
+    conn.execute(
+        text(
+            f"UPDATE `{tabla}` SET `{columna_clave}` = :clave "
+            f"WHERE `{columna_id}` = :id"
+        ),
+        [
+            {"clave": clave, "id": int(id_)}
+            for id_, clave in zip(df[columna_id], df["clave"])
+        ]
+    )
+
+    canonico = df.groupby("clave")[columna_id].transform("min")
+    duplicados = df[columna_id] != canonico
+    if not duplicados.any():
+        return
+
+    pares = [
+        {"id": int(id_), "canonico": int(destino)}
+        for id_, destino in zip(
+            df.loc[duplicados, columna_id], canonico[duplicados]
+        )
+    ]
+    conn.execute(
+        text(
+            f"UPDATE contrato SET `{columna_fk}` = :canonico "
+            f"WHERE `{columna_fk}` = :id"
+        ),
+        pares
+    )
+    conn.execute(
+        text(f"DELETE FROM `{tabla}` WHERE `{columna_id}` = :id"),
+        pares
+    )
+    print(f"{tabla}: {len(pares)} filas duplicadas fusionadas")
+
+
+def _reconstruir_tabla_sqlite(conn, tabla: str, sentencias: list) -> None:
+    """
+    SQLite no puede cambiar restricciones con ALTER TABLE: se crea la
+    tabla con su definición del DDL, se copian las filas y se sustituye
+    la anterior. Sus índices se vuelven a crear con el resto del DDL.
+    """
+    crear = f"CREATE TABLE IF NOT EXISTS `{tabla}` ("
+    definicion = next(s for s in sentencias if crear in s)
+    nueva = f"_{tabla}_migrada"
+
+    conn.execute(text(
+        definicion.replace(crear, f"CREATE TABLE `{nueva}` (")
+    ))
+
+    inspector = inspect(conn)
+    destino = {c["name"] for c in inspector.get_columns(nueva)}
+    columnas = ", ".join(
+        f"`{c['name']}`" for c in inspector.get_columns(tabla)
+        if c["name"] in destino
+    )
+    conn.execute(text(
+        f"INSERT INTO `{nueva}` ({columnas}) "
+        f"SELECT {columnas} FROM `{tabla}`"
+    ))
+    conn.execute(text(f"DROP TABLE `{tabla}`"))
+    conn.execute(text(f"ALTER TABLE `{nueva}` RENAME TO `{tabla}`"))
@@ -0,0 +1,543 @@
+"""
+Descarga asíncrona del feed de contratos menores de PLACSP.
+
+Uso:
+    python -m src.descarga [--url URL] [--destino DIR]
+                           [--concurrencia N] [--max-paginas N]
+
+Responsabilidad:
+- Recorrer la cadena de páginas desde la más reciente siguiendo
+  rel="next" y parar en la primera que ya está en disco
+- Lanzar la descarga de cada página en cuanto llega la cabecera de la
+  anterior: la cadena solo se conoce página a página, pero los cuerpos
+  se descargan a la vez (como mucho `DESCARGA_CONCURRENCIA`)
+- Hacer peticiones condicionales (If-None-Match / If-Modified-Since)
+  con los validadores de la descarga anterior: si la página principal
+  no ha cambiado no hay nada nuevo
+- Reintentar los errores transitorios (red, 408, 429, 5xx) con espera
+  exponencial, respetando Retry-After
+- Escribir cada página de forma atómica en la carpeta de su año dentro
+  de `RAW_DATA_DIR`, como espera src.loader
+- Recordar las páginas que fallaron (o en las que se cortó el
+  recorrido) para continuar desde ellas en la siguiente ejecución
+
+Las peticiones usan urllib en hilos (`asyncio.to_thread`), sin
+dependencias adicionales.
+
+Este módulo NO:
+- parsea entries ni carga datos (ver src.pipeline)
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+from xml.sax.saxutils import unescape
+
+from src.config import (
+    DESCARGA_CONCURRENCIA,
+    DESCARGA_ESPERA_BASE,
+    DESCARGA_ESTADO_PATH,
+    DESCARGA_REINTENTOS,
+    DESCARGA_TIMEOUT,
+    RAW_DATA_DIR,
+    URL_FEED_MENORES,
+)
+from src.fuentes import listar_fuentes
+
+
+_USER_AGENT = "contratos-menores-espana/1.0 (+descarga del feed PLACSP)"
+
+# Tamaño de lectura de la respuesta
+_BLOQUE = 64 * 1024
+
+# Si la cabecera del feed no termina en estos bytes se deja de buscar
+# rel="next" y se usa lo leído
+_MAX_CABECERA = 256 * 1024
+
+# Carpeta (dentro del destino) para los archivos a medio descargar
+_DIR_TEMPORAL = ".descarga"
+
+# Códigos HTTP que merece la pena reintentar
+_REINTENTAR_HTTP = {408, 425, 429, 500, 502, 503, 504}
+
+# Espera máxima aceptada en un Retry-After (segundos)
+_MAX_RETRY_AFTER = 300
+
+_RE_FIN_CABECERA = re.compile(rb"<(?:\w+:)?(?:entry|deleted-entry)\b")
+_RE_LINK = re.compile(rb"<(?:\w+:)?link\b[^>]*>")
+_RE_ATRIBUTO = re.compile(rb"""([\w:]+)\s*=\s*(["'])(.*?)\2""", re.DOTALL)
+_RE_UPDATED = re.compile(rb"<(?:\w+:)?updated>\s*([^<]+?)\s*</")
+_RE_ANIO_NOMBRE = re.compile(r"_(\d{4})\d{4}_\d{6}\.atom$")
+
+
+class Cabecera(NamedTuple):
+    """
+    Cabecera de una página: URL rel="next" y <updated> del feed.
+    """
+    siguiente: Optional[str]
+    actualizado: Optional[str]
+
+
+class Pagina(NamedTuple):
+    """
+    Resultado de una descarga.
+
+    - estado: "descargada" o "sin_cambios" (304)
+    - path: archivo escrito (None si no hubo cambios)
+    """
+    nombre: str
+    url: str
+    estado: str
+    bytes: int
+    path: Optional[Path]
+
+
+# ======================================================
+# CABECERA Y DESTINO
+# ======================================================
+
+def _nombre(url: str) -> str:
+    return url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+
+
+def leer_cabecera(datos: bytes, completa: bool = True) -> Optional[Cabecera]:
+    """
+    Extrae rel="next" y <updated> del principio de un feed.
+
+    Devuelve None si `completa` es False y la cabecera (todo lo
+    anterior al primer entry) aún no se ha recibido entera.
+    """
+    fin = _RE_FIN_CABECERA.search(datos)
+    if fin is None and not completa and len(datos) < _MAX_CABECERA:
+        return None
+
+    cabecera = datos[:fin.start()] if fin else datos
+
+    siguiente = None
+    for link in _RE_LINK.finditer(cabecera):
+        atributos = {
+            clave.lower(): valor
+            for clave, _, valor in _RE_ATRIBUTO.findall(link.group(0))
+        }
+        if atributos.get(b"rel") == b"next" and atributos.get(b"href"):
+            siguiente = unescape(atributos[b"href"].decode("utf-8")).strip()
+            break
+
+    actualizado = _RE_UPDATED.search(cabecera)
+    return Cabecera(
+        siguiente=siguiente,
+        actualizado=actualizado.group(1).decode("utf-8")
+        if actualizado else None,
+    )
+
+
+def _carpeta_anio(nombre: str, actualizado: Optional[str]) -> str:
+    """
+    Año de la página: el de su nombre (_AAAAMMDD_HHMMSS) o, en la
+    página principal, el de su <updated>.
+    """
+    match = _RE_ANIO_NOMBRE.search(nombre)
+    if match:
+        return match.group(1)
+
+    if actualizado:
+        try:
+            return str(datetime.fromisoformat(actualizado).year)
+        except ValueError:
+            pass
+
+    return str(datetime.now().year)
+
+
+def _paginas_en_disco(destino: Path) -> set:
+    return {
+        fuente.nombre.removesuffix(".gz")
+        for fuente in listar_fuentes(destino)
+    }
+
+
+# ======================================================
+# ESTADO
+# ======================================================
+
+def _cargar_estado(path: Path) -> dict:
+    if not path.exists():
+        return {"validadores": {}, "pendientes": []}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _guardar_estado(estado: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(
+        json.dumps(estado, indent=2, ensure_ascii=False),
+        encoding="utf-8"
+    )
+    os.replace(tmp_path, path)
+
+
+# ======================================================
+# DESCARGA DE UNA PÁGINA
+# ======================================================
+
+def _descargar(
+    url: str,
+    temporal: Path,
+    validadores: dict,
+    avisar: Callable,
+    timeout: float
+) -> tuple:
+    """
+    Descarga `url` en `temporal` (bloqueante) y llama a
+    `avisar(cabecera)` en cuanto ha recibido la cabecera del feed.
+
+    Returns
+    -------
+    tuple
+        (código HTTP, bytes, validadores de la respuesta)
+    """
+    cabeceras = {"User-Agent": _USER_AGENT}
+    if validadores.get("etag"):
+        cabeceras["If-None-Match"] = validadores["etag"]
+    if validadores.get("last_modified"):
+        cabeceras["If-Modified-Since"] = validadores["last_modified"]
+
+    try:
+        respuesta = urlopen(Request(url, headers=cabeceras), timeout=timeout)
+    except HTTPError as e:
+        if e.code == 304:
+            return 304, 0, validadores
+        raise
+
+    total = 0
+    leidos = bytearray()
+    with respuesta, open(temporal, "wb") as f:
+        while bloque := respuesta.read(_BLOQUE):
+            f.write(bloque)
+            total += len(bloque)
+
+            if leidos is not None:
+                leidos += bloque
+                cabecera = leer_cabecera(leidos, completa=False)
+                if cabecera is not None:
+                    avisar(cabecera)
+                    leidos = None
+
+        if leidos is not None:
+            avisar(leer_cabecera(leidos))
+
+        esperados = respuesta.headers.get("Content-Length")
+        if esperados is not None and int(esperados) != total:
+            raise http.client.IncompleteRead(b"", int(esperados) - total)
+
+    return 200, total, {
+        "etag": respuesta.headers.get("ETag"),
+        "last_modified": respuesta.headers.get("Last-Modified"),
+    }
+
+
+def _espera(error: Exception, intento: int, espera_base: float):
+    """
+    Segundos antes de reintentar tras `error` (None = no reintentar).
+    """
+    if isinstance(error, HTTPError):
+        if error.code not in _REINTENTAR_HTTP:
+            return None
+        retry_after = error.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), _MAX_RETRY_AFTER)
+    elif not isinstance(
+        error, (URLError, OSError, http.client.HTTPException)
+    ):
+        return None
+
+    return espera_base * 2 ** (intento - 1) * random.uniform(0.5, 1.5)
+
+
+def _resolver(futuro: asyncio.Future, cabecera: Optional[Cabecera]):
+    if not futuro.done():
+        futuro.set_result(cabecera)
+
+
+async def _pagina(
+    url: str,
+    destino: Path,
+    validadores: dict,
+    semaforo: asyncio.Semaphore,
+    cabecera: asyncio.Future,
+    opciones: dict
+) -> tuple:
+    """
+    Descarga una página con reintentos y la mueve a su carpeta de año.
+
+    Resuelve `cabecera` en cuanto se conoce (None si la página no ha
+    cambiado) para que el recorrido pueda lanzar la siguiente.
+
+    Returns
+    -------
+    tuple
+        (Pagina, validadores de la respuesta)
+    """
+    loop = asyncio.get_running_loop()
+    nombre = _nombre(url)
+    temporal = destino / _DIR_TEMPORAL / f"{nombre}.{os.getpid()}.tmp"
+
+    def avisar(leida: Cabecera) -> None:
+        loop.call_soon_threadsafe(_resolver, cabecera, leida)
+
+    async with semaforo:
+        for intento in range(1, opciones["reintentos"] + 1):
+            try:
+                codigo, n, nuevos = await asyncio.to_thread(
+                    _descargar, url, temporal, validadores, avisar,
+                    opciones["timeout"]
+                )
+                break
+            except Exception as e:
+                espera = _espera(e, intento, opciones["espera_base"])
+                if espera is None or intento == opciones["reintentos"]:
+                    temporal.unlink(missing_ok=True)
+                    if not cabecera.done():
+                        cabecera.set_exception(e)
+                    raise
+                print(f"{nombre}: {e}; reintento {intento} "
+                      f"en {espera:.1f}s")
+                await asyncio.sleep(espera)
+
+    if codigo == 304:
+        _resolver(cabecera, None)
+        return Pagina(nombre, url, "sin_cambios", 0, None), nuevos
+
+    leida = cabecera.result()
+    path = destino / _carpeta_anio(nombre, leida.actualizado) / nombre
+    path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temporal, path)
+
+    return Pagina(nombre, url, "descargada", n, path), nuevos
+
+
+# ======================================================
+# RECORRIDO
+# ======================================================
+
+async def _recorrer(
+    url: str,
+    destino: Path,
+    estado: dict,
+    en_disco: set,
+    lanzadas: set,
+    semaforo: asyncio.Semaphore,
+    descargas: list,
+    opciones: dict
+) -> Optional[str]:
+    """
+    Sigue la cadena desde `url` lanzando una descarga por página.
+
+    La página inicial siempre se pide (de forma condicional) salvo que
+    ya se haya lanzado en esta ejecución; el recorrido termina en la
+    primera página siguiente que ya está en disco o lanzada, al final
+    de la cadena, si una página no cambia o no se puede descargar, o
+    al llegar a `max_paginas`.
+
+    Returns
+    -------
+    str or None
+        URL en la que se cortó por `max_paginas`
+    """
+    loop = asyncio.get_running_loop()
+    inicial = True
+
+    while url:
+        nombre = _nombre(url)
+        if nombre in lanzadas:
+            return None
+        if not inicial and nombre in en_disco:
+            print(f"{nombre} ya está en disco: fin del recorrido")
+            return None
+
+        maximo = opciones["max_paginas"]
+        if maximo is not None and len(descargas) >= maximo:
+            return url
+
+        cabecera = loop.create_future()
+        tarea = asyncio.create_task(
+            _pagina(
+                url, destino, estado["validadores"].get(url, {}),
+                semaforo, cabecera, opciones
+            )
+        )
+        descargas.append((url, tarea))
+        lanzadas.add(nombre)
+        inicial = False
+
+        try:
+            leida = await cabecera
+        except Exception:
+            # El error se informa con el resultado de la tarea
+            return None
+
+        url = leida.siguiente if leida is not None else None
+
+    return None
+
+
+async def cosechar(
+    url: str = URL_FEED_MENORES,
+    destino: Path = RAW_DATA_DIR,
+    concurrencia: int = DESCARGA_CONCURRENCIA,
+    max_paginas: Optional[int] = None,
+    reintentos: int = DESCARGA_REINTENTOS,
+    espera_base: float = DESCARGA_ESPERA_BASE,
+    timeout: float = DESCARGA_TIMEOUT,
+    estado_path: Path = DESCARGA_ESTADO_PATH
+) -> list:
+    """
+    Descarga las páginas nuevas del feed en `destino`.
+
+    Se recorre la cadena desde `url` y, después, desde cada página
+    pendiente de la ejecución anterior (fallida o cortada por
+    `max_paginas`).
+
+    Parameters
+    ----------
+    url : str
+        Página más reciente del feed
+    destino : Path
+        Directorio base con las carpetas de años
+    concurrencia : int
+        Descargas simultáneas como máximo
+    max_paginas : int, optional
+        Páginas a descargar como máximo en esta ejecución
+    reintentos : int
+        Intentos por página
+    espera_base : float
+        Espera antes del primer reintento (se duplica en cada uno)
+    timeout : float
+        Timeout de cada petición (segundos)
+    estado_path : Path
+        Validadores HTTP y páginas pendientes entre ejecuciones
+
+    Returns
+    -------
+    list
+        `Pagina` de cada descarga correcta, en orden de recorrido (de
+        la más reciente a la más antigua)
+    """
+    inicio = time.perf_counter()
+    estado = _cargar_estado(estado_path)
+    opciones = {
+        "max_paginas": max_paginas,
+        "reintentos": reintentos,
+        "espera_base": espera_base,
+        "timeout": timeout,
+    }
+
+    temporales = destino / _DIR_TEMPORAL
+    temporales.mkdir(parents=True, exist_ok=True)
+    for restos in temporales.glob("*.tmp"):
+        restos.unlink()
+
+    en_disco = _paginas_en_disco(destino)
+    semaforo = asyncio.Semaphore(concurrencia)
+    descargas = []
+    pendientes = []
+
+    lanzadas = set()
+
+    for inicial in [url] + estado["pendientes"]:
+        corte = await _recorrer(
+            inicial, destino, estado, en_disco, lanzadas, semaforo,
+            descargas, opciones
+        )
+        if corte is not None:
+            pendientes.append(corte)
+
+    resultados = await asyncio.gather(
+        *(tarea for _, tarea in descargas), return_exceptions=True
+    )
+
+    paginas = []
+    for (url_pagina, _), resultado in zip(descargas, resultados):
+        if isinstance(resultado, BaseException):
+            print(f"No se pudo descargar {url_pagina}: {resultado}")
+            pendientes.append(url_pagina)
+            continue
+
+        pagina, validadores = resultado
+        paginas.append(pagina)
+        if pagina.estado == "descargada":
+            estado["validadores"][url_pagina] = validadores
+
+    estado["pendientes"] = list(dict.fromkeys(pendientes))
+    _guardar_estado(estado, estado_path)
+
+    descargadas = [p for p in paginas if p.estado == "descargada"]
+    segundos = time.perf_counter() - inicio
+    print(
+        f"{len(descargadas)} páginas descargadas "
+        f"({sum(p.bytes for p in descargadas) / 2**20:.1f} MB) en "
+        f"{segundos:.2f}s, {len(paginas) - len(descargadas)} sin cambios, "
+        f"{len(resultados) - len(paginas)} fallidas"
+    )
+    if estado["pendientes"]:
+        print(f"{len(estado['pendientes'])} páginas pendientes para la "
+              "siguiente ejecución")
+
+    return paginas
+
+
+# ======================================================
+# CLI
+# ======================================================
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Descarga las páginas nuevas del feed de contratos "
+                    "menores de PLACSP"
+    )
+    parser.add_argument("--url", default=URL_FEED_MENORES,
+                        help="página más reciente del feed")
+    parser.add_argument("--destino", type=Path, default=RAW_DATA_DIR,
+                        help="directorio con las carpetas de años")
+    parser.add_argument("--concurrencia", type=int,
+                        default=DESCARGA_CONCURRENCIA,
+                        help="descargas simultáneas")
+    parser.add_argument("--max-paginas", type=int,
+                        help="páginas a descargar como máximo")
+    parser.add_argument("--estado", type=Path,
+                        default=DESCARGA_ESTADO_PATH,
+                        help="archivo de validadores y páginas pendientes")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+
+    asyncio.run(
+        cosechar(
+            url=args.url,
+            destino=args.destino,
+            concurrencia=args.concurrencia,
+            max_paginas=args.max_paginas,
+            estado_path=args.estado
+        )
+    )
+
+    if _cargar_estado(args.estado)["pendientes"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Índice de páginas de los feeds de sindicación de PLACSP.
+
+Los feeds están paginados: cada página enlaza con la anterior (más
+antigua) mediante <link rel="next" href="..._YYYYMMDD_HHMMSS.atom">.
+
+Responsabilidad:
+- Leer solo la cabecera de cada archivo (enlaces y <updated>), sin
+  parsear los entries
+- Reconstruir la cadena de páginas a través de las carpetas de años
+- Ordenar las páginas de la más antigua a la más reciente, de modo que
+  las versiones más nuevas de cada entry se procesen las últimas
+- Cortar el recorrido en la última página ya ingerida (checkpoint)
+
+Este módulo NO:
+- parsea entries
+- decide qué archivos han cambiado (ver src.manifest)
+"""
+
+import heapq
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+from zoneinfo import ZoneInfo
+
+from src.config import XML_NAMESPACES, ZONA_HORARIA
+from src.fuentes import FuenteAtom, como_fuente, listar_fuentes
+
+
+_ATOM = XML_NAMESPACES["atom"]
+_TAG_LINK = f"{{{_ATOM}}}link"
+_TAG_UPDATED = f"{{{_ATOM}}}updated"
+
+# Al llegar al primer entry (o tombstone) la cabecera ya se ha leído
+_TAGS_FIN_CABECERA = {
+    f"{{{_ATOM}}}entry",
+    "entry",
+    f"{{{XML_NAMESPACES['at']}}}deleted-entry",
+}
+
+
+class PaginaFeed(NamedTuple):
+    """
+    Cabecera de un archivo de feed.
+
+    - fuente: archivo o miembro de paquete que contiene la página
+    - nombre: nombre de la página según su enlace rel="self"
+    - siguiente: nombre de la página enlazada con rel="next" (más antigua)
+    - actualizado: <updated> del feed en hora local sin zona
+    """
+    fuente: FuenteAtom
+    nombre: str
+    siguiente: Optional[str]
+    actualizado: Optional[datetime]
+
+
+def _nombre_enlace(href: Optional[str]) -> Optional[str]:
+    if not href:
+        return None
+    return href.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _a_hora_local(valor: Optional[str]) -> Optional[datetime]:
+    if not valor:
+        return None
+
+    try:
+        fecha = datetime.fromisoformat(valor.strip())
+    except ValueError:
+        return None
+
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(ZoneInfo(ZONA_HORARIA)).replace(tzinfo=None)
+
+    return fecha
+
+
+def leer_cabecera(path: Union[FuenteAtom, Path]) -> PaginaFeed:
+    """
+    Lee los enlaces y la fecha <updated> del nivel superior del feed.
+
+    El parseo se detiene en el primer entry, así que el coste no depende
+    del tamaño del archivo.
+    """
+    fuente = como_fuente(path)
+    enlaces = {}
+    actualizado = None
+    profundidad = 0
+
+    try:
+        with fuente.abrir() as f:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if elem.tag in _TAGS_FIN_CABECERA:
+                        break
+                    profundidad += 1
+                    continue
+
+                profundidad -= 1
+
+                # Solo hijos directos de <feed>
+                if profundidad != 1:
+                    continue
+
+                if elem.tag == _TAG_LINK:
+                    enlaces.setdefault(elem.get("rel"), elem.get("href"))
+                elif elem.tag == _TAG_UPDATED:
+                    actualizado = _a_hora_local(elem.text)
+
+    except ET.ParseError as e:
+        print(f"Cabecera ilegible en {fuente.nombre}: {e}")
+
+    return PaginaFeed(
+        fuente=fuente,
+        nombre=_nombre_enlace(enlaces.get("self")) or fuente.nombre,
+        siguiente=_nombre_enlace(enlaces.get("next")),
+        actualizado=actualizado,
+    )
+
+
+def indexar_feeds(base_folder: Path) -> list:
+    """
+    Lee la cabecera de todos los feeds de las subcarpetas (años) de
+    `base_folder`, incluidos los comprimidos y empaquetados.
+    """
+    return [
+        leer_cabecera(fuente)
+        for fuente in listar_fuentes(base_folder)
+    ]
+
+
+def _clave_tiempo(pagina: PaginaFeed) -> tuple:
+    return (pagina.actualizado or datetime.min, pagina.fuente.id)
+
+
+def ordenar_paginas(paginas: list) -> list:
+    """
+    Ordena las páginas siguiendo la cadena rel="next".
+
+    Cada página que no es enlazada por ninguna otra es una cabecera
+    (por ejemplo, distintas descargas de la página principal). Desde
+    cada cabecera se recorre la cadena hacia atrás hasta llegar a una
+    página ya visitada o a un enlace que no está en disco. Las cadenas
+    resultantes se intercalan por <updated> y las páginas inalcanzables
+    (ciclos) se añaden por fecha.
+
+    Returns
+    -------
+    list
+        Páginas de la más antigua a la más reciente
+    """
+    por_nombre = {}
+    for pagina in sorted(paginas, key=_clave_tiempo, reverse=True):
+        por_nombre.setdefault(pagina.nombre, []).append(pagina)
+
+    enlazadas = {pagina.siguiente for pagina in paginas}
+    cabezas = sorted(
+        (p for p in paginas if p.nombre not in enlazadas),
+        key=_clave_tiempo,
+        reverse=True
+    )
+
+    visitadas = set()
+    cadenas = []
+    rotos = set()
+
+    for cabeza in cabezas:
+        cadena = []
+        actual = cabeza
+
+        while actual is not None and actual.fuente not in visitadas:
+            cadena.append(actual)
+            visitadas.add(actual.fuente)
+
+            if actual.siguiente is None:
+                break
+
+            candidatas = [
+                p for p in por_nombre.get(actual.siguiente, [])
+                if p.fuente not in visitadas
+            ]
+            if not candidatas and actual.siguiente not in por_nombre:
+                rotos.add(actual.siguiente)
+            actual = candidatas[0] if candidatas else None
+
+        cadenas.append(cadena)
+
+    sueltas = sorted(
+        (p for p in paginas if p.fuente not in visitadas),
+        key=_clave_tiempo,
+        reverse=True
+    )
+    if sueltas:
+        cadenas.append(sueltas)
+
+    if rotos:
+        print(f"{len(rotos)} páginas enlazadas no están en disco "
+              f"(ej: {min(rotos)})")
+
+    recientes_primero = list(
+        heapq.merge(*cadenas, key=_clave_tiempo, reverse=True)
+    )
+    return recientes_primero[::-1]
+
+
+def paginas_desde_checkpoint(
+    paginas: list,
+    checkpoint: Optional[datetime],
+    conocidas: set
+) -> list:
+    """
+    Recorre las páginas de la más reciente a la más antigua y se
+    detiene en la primera ya ingerida (`conocidas`) cuyo <updated> no
+    supera el checkpoint: todo lo anterior ya se cargó en ejecuciones
+    previas.
+
+    Parameters
+    ----------
+    paginas : list
+        Páginas ordenadas de la más antigua a la más reciente
+    checkpoint : datetime, optional
+        Máximo atom:updated ya ingerido
+    conocidas : set
+        Fuentes de las páginas ya registradas en el manifiesto
+
+    Returns
+    -------
+    list
+        Páginas posteriores al checkpoint, de la más antigua a la más
+        reciente
+    """
+    if checkpoint is None:
+        return list(paginas)
+
+    nuevas = []
+    for pagina in reversed(paginas):
+        if (
+            pagina.fuente in conocidas
+            and pagina.actualizado is not None
+            and pagina.actualizado <= checkpoint
+        ):
+            break
+        nuevas.append(pagina)
+
+    return nuevas[::-1]
@@ -0,0 +1,287 @@
+"""
+Ejecución en flujo del pipeline ETL: parseo, limpieza y carga
+solapados.
+
+    procesos de parseo -> proceso principal (limpieza por lotes)
+                       -> cola acotada -> hilo de carga
+
+Responsabilidad:
+- Parsear los feeds en procesos (`iter_atom_folders`) mientras el
+  proceso principal agrupa los archivos en lotes de `FLUJO_LOTE` filas
+  y los limpia, y un hilo carga los lotes ya limpios
+- Acotar la memoria en cada paso: como mucho `FLUJO_COLA` lotes
+  limpios esperan a la carga, y si la cola está llena se deja de
+  recoger (y por tanto de lanzar) parseos
+- Cargar en cada lote empresas y órganos a la vez, cada uno en su
+  conexión, después los contratos que dependen de sus ids y por último
+  las bajas (<at:deleted-entry>) del lote
+- Informar del tiempo ocupado de cada fase frente al total: con las
+  fases solapadas, el total se acerca a la más lenta y no a su suma
+
+Diferencias con la ejecución por etapas (src.pipeline):
+- Los duplicados se eliminan dentro de cada lote; entre lotes los
+  resuelve la fusión por versión de `contrato` (ver
+  `src.db.bulk.fusionar_dataframe`), así que la tabla `contrato`
+  queda igual. Sí se cargan empresas y órganos que solo aparecen en
+  versiones superadas de un contrato
+- Las bajas también se fusionan por versión y dan de baja lo mismo,
+  pero sus datos pueden diferir: si un lote trae la baja de un
+  contrato y un lote posterior una publicación anterior a ella (feeds
+  fuera de orden), la fila queda solo con la baja y sin los datos de
+  la publicación, que la ejecución por etapas sí conserva porque
+  carga todas las publicaciones antes que las bajas
+- No hay checkpoints ni --reanudar: la carga es idempotente y tras un
+  fallo basta con repetir la ejecución. El manifiesto de ingesta solo
+  se guarda si la ejecución termina bien
+
+Este módulo NO:
+- parsea, limpia ni inserta por sí mismo (delega en src.loader,
+  src.transform.cleaning y src.db.insert)
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from src import metricas
+from src.config import (
+    FLUJO_COLA,
+    FLUJO_LOTE,
+    PARSE_WORKERS,
+    RAW_DATA_DIR,
+)
+from src.manifest import cargar_manifest, guardar_manifest
+
+
+# Marca de fin de la cola de carga
+_FIN = object()
+
+# Fases cuyo tiempo ocupado se mide
+_FASES = ("espera_parseo", "limpieza", "espera_cola", "carga")
+
+
+# ======================================================
+# PRODUCTOR: PARSEO Y LIMPIEZA
+# ======================================================
+
+def _cronometrar(archivos: Iterator, tiempos: dict) -> Iterator:
+    """
+    Suma en `tiempos["espera_parseo"]` lo que se espera a cada archivo
+    parseado.
+    """
+    while True:
+        inicio = time.perf_counter()
+        try:
+            archivo = next(archivos)
+        except StopIteration:
+            return
+        finally:
+            tiempos["espera_parseo"] += time.perf_counter() - inicio
+        yield archivo
+
+
+def _lotes_limpios(
+    archivos: Iterable,
+    tamano_lote: int,
+    tiempos: dict
+) -> Iterator[pd.DataFrame]:
+    """
+    Agrupa los archivos parseados en lotes de al menos `tamano_lote`
+    filas (sin partir archivos) y devuelve cada lote limpio.
+    """
+    from src.transform.cleaning import limpiar_contratos
+    from src.transform.tipos import categorizar
+
+    def limpiar(dfs):
+        inicio = time.perf_counter()
+        lote = categorizar(
+            limpiar_contratos(pd.concat(dfs, ignore_index=True))
+        )
+        tiempos["limpieza"] += time.perf_counter() - inicio
+        return lote
+
+    acumulados, filas = [], 0
+    for _fuente, df in archivos:
+        if df.empty:
+            continue
+
+        acumulados.append(df)
+        filas += len(df)
+        if filas >= tamano_lote:
+            yield limpiar(acumulados)
+            acumulados, filas = [], 0
+
+    if acumulados:
+        yield limpiar(acumulados)
+
+
+# ======================================================
+# CONSUMIDOR: CARGA
+# ======================================================
+
+def _cargar_lote(df: pd.DataFrame, entidades: ThreadPoolExecutor) -> None:
+    from src.db.insert import (
+        insertar_bajas,
+        insertar_contratos,
+        insertar_empresas,
+        insertar_organos,
+    )
+    from src.transform.cleaning import separar_bajas
+
+    df, bajas = separar_bajas(df)
+
+    if not df.empty:
+        empresas = entidades.submit(insertar_empresas, df)
+        organos = entidades.submit(insertar_organos, df)
+
+        df = df.assign(
+            empresa_id=empresas.result()["empresa_id"],
+            organo_id=organos.result()["organo_id"]
+        )
+        insertar_contratos(df)
+
+    insertar_bajas(bajas)
+
+
+def _cargador(cola: queue.Queue, estado: dict, tiempos: dict) -> None:
+    """
+    Carga los lotes de `cola` hasta `_FIN`.
+
+    Tras un error se siguen vaciando los lotes (sin cargarlos) para
+    que el productor nunca quede bloqueado en una cola llena.
+    """
+    with ThreadPoolExecutor(
+        max_workers=2, thread_name_prefix="entidades"
+    ) as entidades:
+        while True:
+            lote = cola.get()
+            if lote is _FIN:
+                return
+            if estado["error"] is not None:
+                continue
+
+            inicio = time.perf_counter()
+            try:
+                _cargar_lote(lote, entidades)
+            except Exception as e:
+                estado["error"] = e
+            tiempos["carga"] += time.perf_counter() - inicio
+
+
+# ======================================================
+# EJECUCIÓN
+# ======================================================
+
+def _imprimir_fases(tiempos: dict, total: float) -> None:
+    print(f"\nFlujo completado en {total:.2f}s. Tiempo por fase:")
+    for fase in _FASES:
+        print(
+            f"  {fase:<14} {tiempos[fase]:8.2f}s "
+            f"({tiempos[fase] / total if total else 0:.0%})"
+        )
+
+
+def ejecutar_flujo(
+    workers: int = PARSE_WORKERS,
+    incremental: bool = False,
+    cache: bool = True,
+    tamano_lote: int = FLUJO_LOTE,
+    tamano_cola: int = FLUJO_COLA
+) -> dict:
+    """
+    Ejecuta el pipeline completo con las fases solapadas.
+
+    Parameters
+    ----------
+    workers : int
+        Procesos de parseo (al menos uno)
+    incremental : bool
+        Parsear solo archivos nuevos o modificados (ver src.manifest)
+    cache : bool
+        Reutilizar la caché del parseo por archivo (ver
+        src.cache_parseo)
+    tamano_lote : int
+        Filas mínimas por lote limpio
+    tamano_cola : int
+        Lotes limpios que pueden esperar a la carga
+
+    Returns
+    -------
+    dict
+        Informe de métricas de la ejecución (ver src.metricas)
+    """
+    from src.db.claves import guardar_claves
+    from src.db.insert import insertar_tablas_maestras
+    from src.db.schema import ejecutar_schema
+    from src.loader import iter_atom_folders
+
+    metricas.reiniciar()
+    tiempos = dict.fromkeys(_FASES, 0.0)
+    estado = {"error": None}
+    resultado = "fallida"
+
+    manifest = cargar_manifest() if incremental else {}
+    cola = queue.Queue(maxsize=tamano_cola)
+    cargador = threading.Thread(
+        target=_cargador, args=(cola, estado, tiempos), name="cargador"
+    )
+
+    try:
+        with metricas.medir_etapa("esquema"):
+            ejecutar_schema()
+            insertar_tablas_maestras()
+
+        archivos = iter_atom_folders(
+            RAW_DATA_DIR,
+            workers=workers,
+            manifest=manifest,
+            solo_pendientes=incremental,
+            cache=cache
+        )
+
+        with metricas.medir_etapa("flujo") as medicion:
+            inicio = time.perf_counter()
+            filas = 0
+            cargador.start()
+            try:
+                for lote in _lotes_limpios(
+                    _cronometrar(archivos, tiempos), tamano_lote, tiempos
+                ):
+                    if estado["error"] is not None:
+                        break
+
+                    espera = time.perf_counter()
+                    cola.put(lote)
+                    tiempos["espera_cola"] += time.perf_counter() - espera
+                    filas += len(lote)
+            finally:
+                archivos.close()
+                cola.put(_FIN)
+                cargador.join()
+                # Las cachés de claves se escriben una vez por
+                # ejecución; los ids ya resueltos están en la base de
+                # datos aunque la carga haya fallado
+                guardar_claves()
+
+            if estado["error"] is not None:
+                raise estado["error"]
+
+            medicion["filas_salida"] = filas
+            medicion.update({
+                f"{fase}_segundos": round(segundos, 4)
+                for fase, segundos in tiempos.items()
+            })
+
+        _imprimir_fases(tiempos, time.perf_counter() - inicio)
+
+        guardar_manifest(manifest)
+        resultado = "completada"
+
+    finally:
+        informe = metricas.guardar_ejecucion(resultado)
+
+    return informe
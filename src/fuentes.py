@@ -0,0 +1,171 @@
+"""
+Fuentes de feeds .atom en disco: archivos sueltos, comprimidos o
+empaquetados.
+
+Responsabilidad:
+- Enumerar los feeds de las carpetas de años: `*.atom`, `*.atom.gz`,
+  miembros `.atom` de paquetes `.zip` y de archivos tar (`.tar`,
+  `.tar.gz`, `.tgz`, `.tar.bz2`, `.tar.xz`)
+- Abrir cada feed como un stream binario sin extraerlo a disco
+- Identificar cada feed con una clave estable (ruta + miembro)
+
+Este módulo NO:
+- parsea XML
+"""
+
+import gzip
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Union
+
+
+# Separador entre la ruta del paquete y el nombre del miembro
+SEPARADOR_MIEMBRO = "::"
+
+_SUFIJOS_TAR = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+class FuenteAtom(NamedTuple):
+    """
+    Un feed .atom: un archivo en disco o un miembro de un paquete.
+    """
+    path: Path
+    miembro: Optional[str] = None
+
+    @property
+    def nombre(self) -> str:
+        """Nombre del feed (sin la ruta del paquete)."""
+        if self.miembro is not None:
+            return Path(self.miembro).name
+        return self.path.name
+
+    @property
+    def id(self) -> str:
+        return _con_miembro(self.path.as_posix(), self.miembro)
+
+    def clave(self, base_folder: Path) -> str:
+        """Identificador relativo a `base_folder`, estable entre equipos."""
+        return _con_miembro(
+            self.path.relative_to(base_folder).as_posix(),
+            self.miembro
+        )
+
+    @contextmanager
+    def abrir(self) -> Iterator[BinaryIO]:
+        """Abre el feed como stream binario descomprimido."""
+        if self.miembro is None:
+            abrir = gzip.open if _es_gzip(self.path) else open
+            with abrir(self.path, "rb") as f:
+                yield f
+
+        elif _es_zip(self.path):
+            with zipfile.ZipFile(self.path) as paquete:
+                with paquete.open(self.miembro) as f:
+                    yield f
+
+        else:
+            with tarfile.open(self.path, "r:*") as paquete:
+                f = paquete.extractfile(self.miembro)
+                if f is None:
+                    raise FileNotFoundError(
+                        f"{self.miembro} no es un archivo en {self.path}"
+                    )
+                with f:
+                    yield f
+
+    def stat(self) -> tuple:
+        """Devuelve (tamaño, mtime) del feed o del miembro."""
+        if self.miembro is None:
+            stat = self.path.stat()
+            return stat.st_size, stat.st_mtime
+
+        if _es_zip(self.path):
+            with zipfile.ZipFile(self.path) as paquete:
+                info = paquete.getinfo(self.miembro)
+                return (
+                    info.file_size,
+                    datetime(*info.date_time).timestamp()
+                )
+
+        with tarfile.open(self.path, "r:*") as paquete:
+            info = paquete.getmember(self.miembro)
+            return info.size, float(info.mtime)
+
+
+def _con_miembro(ruta: str, miembro: Optional[str]) -> str:
+    if miembro is None:
+        return ruta
+    return f"{ruta}{SEPARADOR_MIEMBRO}{miembro}"
+
+
+def _es_gzip(path: Path) -> bool:
+    return path.name.endswith(".atom.gz")
+
+
+def _es_zip(path: Path) -> bool:
+    return path.suffix == ".zip"
+
+
+def _es_tar(path: Path) -> bool:
+    return path.name.endswith(_SUFIJOS_TAR)
+
+
+def _es_feed(nombre: str) -> bool:
+    return nombre.endswith(".atom")
+
+
+def como_fuente(origen: Union[FuenteAtom, Path, str]) -> FuenteAtom:
+    """
+    Normaliza una ruta (o una fuente) a `FuenteAtom`.
+    """
+    if isinstance(origen, FuenteAtom):
+        return origen
+    return FuenteAtom(Path(origen))
+
+
+def es_paquete(path: Path) -> bool:
+    """True si `path` es un .zip o un tar con varios feeds dentro."""
+    return _es_zip(path) or _es_tar(path)
+
+
+def fuentes_de_paquete(path: Path) -> list:
+    """
+    Devuelve un `FuenteAtom` por cada miembro .atom de un paquete,
+    ordenados por nombre.
+    """
+    if _es_zip(path):
+        with zipfile.ZipFile(path) as paquete:
+            miembros = [
+                info.filename for info in paquete.infolist()
+                if not info.is_dir() and _es_feed(info.filename)
+            ]
+    else:
+        with tarfile.open(path, "r:*") as paquete:
+            miembros = [
+                info.name for info in paquete.getmembers()
+                if info.isfile() and _es_feed(info.name)
+            ]
+
+    return [FuenteAtom(path, miembro) for miembro in sorted(miembros)]
+
+
+def listar_fuentes(base_folder: Path) -> list:
+    """
+    Enumera todos los feeds de las subcarpetas (años) de `base_folder`,
+    incluidos los comprimidos y los miembros de paquetes.
+    """
+    fuentes = []
+
+    for path in sorted(base_folder.glob("*/*")):
+        if not path.is_file():
+            continue
+
+        if _es_feed(path.name) or _es_gzip(path):
+            fuentes.append(FuenteAtom(path))
+        elif es_paquete(path):
+            fuentes.extend(fuentes_de_paquete(path))
+
+    return fuentes
@@ -1,35 +1,311 @@
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterator, Optional
+
 import pandas as pd
+import pyarrow as pa
+
 from src.atom_parser import parse_atom_file
+from src.cache_parseo import (
+    desalojar,
+    hashes_feeds,
+    leer_cache,
+    parse_atom_file_cache,
+)
+from src.config import FLUJO_EN_VUELO_POR_WORKER, PARSE_WORKERS
+from src.feed_index import (
+    indexar_feeds,
+    ordenar_paginas,
+    paginas_desde_checkpoint,
+)
+from src.fuentes import FuenteAtom
+from src.manifest import (
+    archivos_pendientes,
+    checkpoint,
+    fuentes_registradas,
+    registrar_archivo,
+)
+from src.metricas import extraer_parseo, registrar_parseo
+from src.transform.tipos import categorizar
+
+
+def _listar_archivos_atom(
+    base_folder: Path,
+    manifest: Optional[dict] = None
+) -> list:
+    """
+    Devuelve los feeds de todas las subcarpetas (años) en el orden de
+    la cadena de páginas: de la más antigua a la más reciente (ver
+    src.feed_index). Incluye .atom.gz y miembros de paquetes .zip/tar.
+
+    Si se pasa `manifest`, el recorrido se detiene en la última página
+    ya ingerida anterior al checkpoint.
+    """
+    paginas = indexar_feeds(base_folder)
+
+    por_carpeta = Counter(
+        pagina.fuente.path.parent.name for pagina in paginas
+    )
+    for carpeta, n in sorted(por_carpeta.items()):
+        print(f"Carpeta {carpeta}: {n} archivos encontrados")
+
+    paginas = ordenar_paginas(paginas)
+
+    if manifest is not None:
+        paginas = paginas_desde_checkpoint(
+            paginas,
+            checkpoint(manifest),
+            fuentes_registradas(manifest, base_folder)
+        )
+
+    return [pagina.fuente for pagina in paginas]
+
+
+def _parsear_archivo(
+    fuente: FuenteAtom,
+    sha256: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Parsea un archivo; con `sha256`, a través de la caché del parseo.
+    """
+    if sha256 is None:
+        return parse_atom_file(fuente)
+    return parse_atom_file_cache(fuente, sha256)
+
+
+def _parse_atom_file_ipc(
+    fuente: FuenteAtom,
+    sha256: Optional[str] = None
+) -> tuple:
+    """
+    Parsea un archivo en un proceso worker y devuelve el resultado
+    serializado como stream Arrow IPC, junto con los contadores de
+    parseo del worker (src.metricas) para sumarlos en el proceso
+    principal.
+
+    Arrow viaja entre procesos como buffers columnares contiguos,
+    mucho más compactos que un DataFrame de objetos Python en pickle.
+    """
+    df = _parsear_archivo(fuente, sha256)
+    contadores = extraer_parseo(fuente.id)
+    if df.empty:
+        return b"", contadores
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return sink.getvalue().to_pybytes(), contadores
+
+
+def _leer_ipc(fuente: FuenteAtom, resultado: tuple) -> pd.DataFrame:
+    buffer, contadores = resultado
+    registrar_parseo(fuente.id, **contadores)
+
+    if not buffer:
+        return pd.DataFrame()
+
+    return pa.ipc.open_stream(buffer).read_all().to_pandas()
+
+
+def _parsear(fuentes: list, workers: int, hashes: dict) -> list:
+    """
+    Parsea `fuentes` en orden, en un pool de procesos si `workers > 1`.
+    Las que tienen hash en `hashes` pasan por la caché del parseo.
+    """
+    if workers > 1 and len(fuentes) > 1:
+        print(f"Parseando {len(fuentes)} archivos con {workers} procesos")
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultados = pool.map(
+                _parse_atom_file_ipc,
+                fuentes,
+                [hashes.get(fuente) for fuente in fuentes]
+            )
+            return [
+                _leer_ipc(fuente, resultado)
+                for fuente, resultado in zip(fuentes, resultados)
+            ]
+
+    return [
+        _parsear_archivo(fuente, hashes.get(fuente)) for fuente in fuentes
+    ]
 
 
-def load_all_atom_folders(base_folder: Path) -> pd.DataFrame:
+def _fuentes_a_parsear(
+    base_folder: Path,
+    manifest: Optional[dict],
+    solo_pendientes: bool
+) -> tuple:
+    """
+    Devuelve (fuentes en orden, {fuente: sha256} ya calculados).
+    """
+    incremental = manifest is not None and solo_pendientes
+    fuentes = _listar_archivos_atom(
+        base_folder,
+        manifest if incremental else None
+    )
+
+    hashes = {}
+    if incremental:
+        hashes = archivos_pendientes(fuentes, manifest, base_folder)
+        fuentes = [fuente for fuente in fuentes if fuente in hashes]
+        print(f"{len(fuentes)} feeds nuevos o modificados")
+
+    return fuentes, hashes
+
+
+def _registrar(
+    manifest: dict,
+    fuente: FuenteAtom,
+    base_folder: Path,
+    df: pd.DataFrame,
+    sha256: Optional[str]
+) -> None:
+    max_updated = df["fecha_actualizacion"].max() if not df.empty else None
+    registrar_archivo(
+        manifest,
+        fuente,
+        base_folder,
+        None if pd.isna(max_updated) else max_updated,
+        sha256=sha256
+    )
+
+
+def load_all_atom_folders(
+    base_folder: Path,
+    workers: int = PARSE_WORKERS,
+    manifest: Optional[dict] = None,
+    solo_pendientes: bool = False,
+    cache: bool = True
+) -> pd.DataFrame:
     """
     Lee todos los archivos .atom de todas las subcarpetas
     (ej: 2020/, 2021/, 2022/, etc.) y devuelve un DataFrame unificado.
+
+    Además de archivos .atom sueltos se leen .atom.gz y los miembros
+    .atom de paquetes .zip y tar, en streaming y sin extraerlos a disco.
+
+    Los archivos se procesan en el orden de la cadena de páginas del
+    feed (de la más antigua a la más reciente), de modo que la
+    deduplicación posterior con keep="last" conserva la versión más
+    nueva de cada entry. Con `workers > 1` los archivos se parsean en
+    un pool de procesos manteniendo ese mismo orden de filas.
+
+    Si se pasa `manifest`, cada archivo parseado se registra en él
+    (en memoria; guardarlo es responsabilidad de quien llama una vez
+    cargados los datos). Con `solo_pendientes=True` solo se parsean
+    los archivos nuevos o modificados respecto al manifiesto, y el
+    recorrido de páginas se corta en el último checkpoint.
+
+    Con `cache=True` los archivos cuyo contenido ya se parseó con la
+    misma versión del parser se leen de la caché Arrow del parseo
+    (ver src.cache_parseo) en lugar de volver a parsear el XML. Solo
+    se lee entero (para calcular su hash) un archivo cuyo tamaño o
+    mtime ha cambiado desde la ejecución anterior.
     """
-    all_dfs = []
-    
-    # Iterar sobre cada subcarpeta (años)
-    for year_folder in base_folder.iterdir():
-        if not year_folder.is_dir():
-            continue
-        
-        print(f"\nProcesando carpeta: {year_folder.name}")
-        
-        atom_files = list(year_folder.glob("*.atom"))
-        print(f"{len(atom_files)} archivos encontrados")
-        
-        for file in atom_files:
-            df = parse_atom_file(file)
-            if not df.empty:
-                all_dfs.append(df)
-    
+    fuentes, hashes = _fuentes_a_parsear(
+        base_folder, manifest, solo_pendientes
+    )
+
+    all_dfs = [None] * len(fuentes)
+    if cache:
+        hashes = hashes_feeds(fuentes, hashes)
+        all_dfs = [leer_cache(fuente, hashes[fuente]) for fuente in fuentes]
+
+    pendientes = [
+        fuente for fuente, df in zip(fuentes, all_dfs) if df is None
+    ]
+    if cache:
+        print(f"Caché del parseo: {len(fuentes) - len(pendientes)} de "
+              f"{len(fuentes)} archivos")
+
+    parseados = iter(
+        _parsear(pendientes, workers, hashes if cache else {})
+    )
+    all_dfs = [df if df is not None else next(parseados) for df in all_dfs]
+
+    if cache:
+        desalojar()
+
+    if manifest is not None:
+        for fuente, df in zip(fuentes, all_dfs):
+            _registrar(manifest, fuente, base_folder, df, hashes.get(fuente))
+
+    all_dfs = [df for df in all_dfs if not df.empty]
+
     if not all_dfs:
         print("No se encontraron datos en ninguna carpeta")
         return pd.DataFrame()
-    
-    df_combined = pd.concat(all_dfs, ignore_index=True)
+
+    df_combined = categorizar(pd.concat(all_dfs, ignore_index=True))
     print(f"\nTotal combinado: {len(df_combined)} registros")
-    
-    return df_combined
\ No newline at end of file
+
+    return df_combined
+
+
+def iter_atom_folders(
+    base_folder: Path,
+    workers: int = PARSE_WORKERS,
+    manifest: Optional[dict] = None,
+    solo_pendientes: bool = False,
+    cache: bool = True,
+    en_vuelo: Optional[int] = None
+) -> Iterator[tuple]:
+    """
+    Versión en streaming de `load_all_atom_folders`: devuelve
+    (fuente, DataFrame) por archivo, en el orden de la cadena de
+    páginas, mientras los archivos siguientes se parsean.
+
+    El parseo se hace siempre en procesos (`workers`, al menos uno),
+    de modo que no compite por el GIL con quien consume los
+    resultados. Como mucho `en_vuelo` archivos (por defecto,
+    `FLUJO_EN_VUELO_POR_WORKER` por proceso) están parseándose o
+    esperando a ser consumidos: si el consumidor va más lento, el
+    parseo se detiene.
+
+    `manifest`, `solo_pendientes` y `cache` funcionan como en
+    `load_all_atom_folders`; cada archivo se registra en el manifiesto
+    al entregarse.
+    """
+    workers = max(1, workers)
+    en_vuelo = en_vuelo or FLUJO_EN_VUELO_POR_WORKER * workers
+    fuentes, hashes = _fuentes_a_parsear(
+        base_folder, manifest, solo_pendientes
+    )
+    if cache:
+        hashes = hashes_feeds(fuentes, hashes)
+
+    def entregar(pendiente):
+        fuente, sha256, resultado = pendiente
+        df = (
+            resultado if isinstance(resultado, pd.DataFrame)
+            else _leer_ipc(fuente, resultado.result())
+        )
+        if manifest is not None:
+            _registrar(manifest, fuente, base_folder, df, sha256)
+        return fuente, df
+
+    pendientes = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for fuente in fuentes:
+            sha256 = hashes.get(fuente)
+            df = leer_cache(fuente, sha256) if cache else None
+
+            if df is None:
+                df = pool.submit(
+                    _parse_atom_file_ipc, fuente, sha256 if cache else None
+                )
+            pendientes.append((fuente, sha256, df))
+
+            while len(pendientes) >= en_vuelo:
+                yield entregar(pendientes.popleft())
+
+        while pendientes:
+            yield entregar(pendientes.popleft())
+
+    if cache:
+        desalojar()
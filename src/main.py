@@ -2,65 +2,178 @@
 Pipeline ETL - Contratos menores (España)
 
 Ejecución completa:
+- creación de esquema
 - parsing
 - limpieza
-- creación de esquema
 - inserción en base de datos
 
-Este archivo solo orquesta el flujo.
+Este archivo solo orquesta el flujo: las etapas, sus checkpoints y el
+estado de cada ejecución están en src.pipeline.
+
+Uso:
+    python -m src.main [--workers N] [--incremental]
+                       [--desde ETAPA] [--hasta ETAPA]
+                       [--saltar ETAPA ...] [--reanudar]
+                       [--profile [ETAPA ...]] [--sin-cache]
+    python -m src.main --flujo [--workers N] [--incremental]
+                       [--sin-cache]
+
+Etapas: esquema, parseo, limpieza, maestras, empresas, organos,
+contratos.
+
+En modo incremental solo se parsean y cargan los archivos nuevos o
+modificados desde la última ejecución (ver src.manifest).
+
+Cada ejecución deja sus métricas (tiempos, memoria, errores de parseo,
+filas/segundo por tabla) en JSON y en formato Prometheus (ver
+src.metricas). `--profile` ejecuta las etapas indicadas (todas si no
+se indica ninguna) bajo cProfile y tracemalloc.
+
+El parseo de cada archivo se guarda en una caché Arrow por contenido y
+versión del parser (ver src.cache_parseo): volver a ejecutar el
+pipeline sobre feeds ya parseados no vuelve a leer su XML.
+`--sin-cache` fuerza el parseo de todos los archivos.
+
+Con `--flujo` el parseo, la limpieza y la carga se solapan en lugar
+de ejecutarse por etapas (ver src.flujo): sin checkpoints, pero con
+un tiempo total cercano al de la fase más lenta.
+
+Ejemplos:
+    python -m src.main --hasta limpieza     # solo parsear y limpiar
+    python -m src.main --desde empresas     # cargar desde el checkpoint
+    python -m src.main --reanudar           # seguir tras un fallo
+    python -m src.main --profile parseo     # perfilar el parseo
 """
 
-from pathlib import Path
-from src.config import RAW_DATA_DIR, DDL_PATH  
-from src.loader import load_all_atom_folders
-from src.transform.cleaning import limpiar_contratos 
-from src.db.schema import ejecutar_schema
-from src.db.insert import (
-    insertar_tablas_maestras,
-    insertar_empresas,
-    insertar_organos,
-    insertar_contratos,
-)
+import argparse
+from src.config import PARSE_WORKERS
+from src.flujo import ejecutar_flujo
+from src.pipeline import NOMBRES_ETAPAS, ejecutar_pipeline
 
 
-def main() -> None:
-    print("Iniciando pipeline ETL")
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Pipeline ETL de contratos menores"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=PARSE_WORKERS,
+        help="procesos para parsear archivos .atom (1 = secuencial)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="procesar solo archivos nuevos o modificados",
+    )
+    parser.add_argument(
+        "--desde",
+        choices=NOMBRES_ETAPAS,
+        help="primera etapa a ejecutar (lee el checkpoint de la anterior)",
+    )
+    parser.add_argument(
+        "--hasta",
+        choices=NOMBRES_ETAPAS,
+        help="última etapa a ejecutar",
+    )
+    parser.add_argument(
+        "--saltar",
+        nargs="+",
+        choices=NOMBRES_ETAPAS,
+        default=[],
+        metavar="ETAPA",
+        help="etapas a omitir",
+    )
+    parser.add_argument(
+        "--reanudar",
+        action="store_true",
+        help="continuar desde la primera etapa no completada "
+             "de la última ejecución",
+    )
+
+    parser.add_argument(
+        "--profile",
+        nargs="*",
+        choices=NOMBRES_ETAPAS,
+        metavar="ETAPA",
+        help="perfilar con cProfile y tracemalloc las etapas indicadas "
+             "(todas si no se indica ninguna)",
+    )
+
+    parser.add_argument(
+        "--flujo",
+        action="store_true",
+        help="solapar parseo, limpieza y carga (sin etapas ni "
+             "checkpoints)",
+    )
+    parser.add_argument(
+        "--sin-cache",
+        action="store_true",
+        help="parsear todos los archivos sin usar la caché del parseo",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.reanudar and (args.desde or args.hasta or args.saltar):
+        parser.error("--reanudar no se combina con --desde/--hasta/--saltar")
 
-    # --------------------------------------------------
-    # 1. Ejecutar esquema SQL
-    # --------------------------------------------------
-    print("Ejecutando esquema SQL...")
-    ejecutar_schema(DDL_PATH)
+    if args.flujo and (
+        args.desde or args.hasta or args.saltar or args.reanudar
+        or args.profile is not None
+    ):
+        parser.error(
+            "--flujo no se combina con --desde/--hasta/--saltar/"
+            "--reanudar/--profile"
+        )
 
-    # --------------------------------------------------
-    # 2. Parsing de archivos ATOM
-    # --------------------------------------------------
-    print("Parseando archivos .atom...")
-    df_raw = load_all_atom_folders(RAW_DATA_DIR)
+    orden = NOMBRES_ETAPAS.index
+    if args.desde and args.hasta and orden(args.desde) > orden(args.hasta):
+        parser.error("--desde debe ser anterior o igual a --hasta")
 
-    # --------------------------------------------------
-    # 3. Limpieza y normalización
-    # --------------------------------------------------
-    print("Limpiando datos...")
-    df_clean = limpiar_contratos(df_raw)
+    return args
 
-    # --------------------------------------------------
-    # 4. Inserción en base de datos
-    # --------------------------------------------------
-    print("Insertando tablas maestras...")
-    insertar_tablas_maestras()
 
-    print("Insertando empresas...")
-    df_clean = insertar_empresas(df_clean)
+def main(argv=None) -> None:
+    args = parse_args(argv)
+
+    perfilar = ()
+    if args.profile is not None:
+        perfilar = tuple(args.profile or NOMBRES_ETAPAS)
+
+    print("Iniciando pipeline ETL")
+
+    if args.flujo:
+        ejecutar_flujo(
+            workers=args.workers,
+            incremental=args.incremental,
+            cache=not args.sin_cache
+        )
+        print("Pipeline ETL finalizado correctamente")
+        return
 
-    print("Insertando órganos...")
-    df_clean = insertar_organos(df_clean)
+    estado = ejecutar_pipeline(
+        desde=args.desde,
+        hasta=args.hasta,
+        saltar=tuple(args.saltar),
+        reanudar=args.reanudar,
+        workers=args.workers,
+        incremental=args.incremental,
+        perfilar=perfilar,
+        cache=not args.sin_cache
+    )
 
-    print("Insertando contratos...")
-    insertar_contratos(df_clean)
+    print("\nResumen de etapas:")
+    for nombre, registro in estado.get("etapas", {}).items():
+        segundos = registro.get("segundos")
+        print(
+            f"  {nombre:<10} {registro['estado']:<11}"
+            + (f" {segundos:8.2f}s" if segundos is not None else "")
+            + (f" {registro['filas']} filas"
+               if registro.get("filas") is not None else "")
+        )
 
     print("Pipeline ETL finalizado correctamente")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,161 @@
+"""
+Manifiesto de archivos de feed ya ingeridos.
+
+Responsabilidad:
+- Registrar cada feed procesado (ruta, tamaño, mtime, hash del
+  contenido y máximo atom:updated de sus entries). Los feeds dentro de
+  paquetes .zip / tar se registran por miembro ("ruta::miembro")
+- Detectar qué archivos son nuevos o han cambiado desde la última carga
+- Persistir el manifiesto en disco de forma atómica
+
+Este módulo NO:
+- parsea archivos
+- accede a la base de datos
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from src.config import MANIFEST_PATH
+from src.fuentes import SEPARADOR_MIEMBRO, FuenteAtom
+
+
+# Tamaño de bloque para calcular el hash sin cargar el archivo entero
+_BLOQUE_HASH = 1024 * 1024
+
+
+def hash_archivo(fuente: FuenteAtom) -> str:
+    """
+    Devuelve el SHA-256 del contenido (descomprimido) de un feed.
+    """
+    sha = hashlib.sha256()
+    with fuente.abrir() as f:
+        for bloque in iter(lambda: f.read(_BLOQUE_HASH), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def cargar_manifest(path: Path = MANIFEST_PATH) -> dict:
+    """
+    Carga el manifiesto desde disco.
+
+    Devuelve un diccionario vacío si todavía no existe.
+    """
+    if not path.exists():
+        return {}
+
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def guardar_manifest(manifest: dict, path: Path = MANIFEST_PATH) -> None:
+    """
+    Escribe el manifiesto en disco.
+
+    Se escribe primero en un archivo temporal y se renombra, de modo
+    que una ejecución interrumpida nunca deja un manifiesto a medias.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(
+        json.dumps(manifest, indent=2, ensure_ascii=False, sort_keys=True),
+        encoding="utf-8"
+    )
+    os.replace(tmp_path, path)
+
+
+def archivos_pendientes(
+    fuentes: list,
+    manifest: dict,
+    base_folder: Path
+) -> dict:
+    """
+    Filtra los archivos nuevos o modificados respecto al manifiesto.
+
+    Si tamaño y mtime coinciden con lo registrado el archivo se da por
+    procesado sin leerlo. Si difieren se compara el hash: un archivo
+    solo "tocado" (mismo contenido) se actualiza en el manifiesto y no
+    se vuelve a procesar.
+
+    Returns
+    -------
+    dict
+        {fuente: sha256} de los feeds que hay que procesar
+    """
+    pendientes = {}
+
+    for fuente in fuentes:
+        registro = manifest.get(fuente.clave(base_folder))
+        tamano, mtime = fuente.stat()
+
+        if (
+            registro is not None
+            and registro["tamano"] == tamano
+            and registro["mtime"] == mtime
+        ):
+            continue
+
+        sha256 = hash_archivo(fuente)
+
+        if registro is not None and registro["sha256"] == sha256:
+            registro["tamano"] = tamano
+            registro["mtime"] = mtime
+            continue
+
+        pendientes[fuente] = sha256
+
+    return pendientes
+
+
+def registrar_archivo(
+    manifest: dict,
+    fuente: FuenteAtom,
+    base_folder: Path,
+    max_updated: Optional[datetime],
+    sha256: Optional[str] = None
+) -> None:
+    """
+    Añade o actualiza la entrada de un feed procesado.
+    """
+    tamano, mtime = fuente.stat()
+
+    manifest[fuente.clave(base_folder)] = {
+        "tamano": tamano,
+        "mtime": mtime,
+        "sha256": sha256 or hash_archivo(fuente),
+        "max_updated": (
+            max_updated.isoformat() if max_updated is not None else None
+        ),
+        "procesado": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def checkpoint(manifest: dict) -> Optional[datetime]:
+    """
+    Devuelve el máximo atom:updated registrado en el manifiesto.
+    """
+    fechas = [
+        datetime.fromisoformat(registro["max_updated"])
+        for registro in manifest.values()
+        if registro.get("max_updated")
+    ]
+    return max(fechas) if fechas else None
+
+
+def fuentes_registradas(manifest: dict, base_folder: Path) -> set:
+    """
+    Devuelve las fuentes de todos los feeds registrados.
+
+    Las claves son rutas relativas a `base_folder` en formato POSIX,
+    con el miembro tras `SEPARADOR_MIEMBRO` si el feed está en un
+    paquete.
+    """
+    fuentes = set()
+    for clave in manifest:
+        ruta, _, miembro = clave.partition(SEPARADOR_MIEMBRO)
+        fuentes.add(FuenteAtom(base_folder / ruta, miembro or None))
+    return fuentes
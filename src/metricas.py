@@ -0,0 +1,447 @@
+"""
+Métricas e instrumentación del pipeline ETL.
+
+Responsabilidad:
+- Medir cada etapa: tiempo real, tiempo de CPU, pico de RSS, filas de
+  entrada y salida y entries por segundo
+- Contar por archivo los entries y bajas (<at:deleted-entry>)
+  parseados (y cuántos vienen de la caché del parseo), los entries con
+  error de extracción (`parse_error`), los errores de XML, los entries
+  descartados al recuperar un XML mal formado y los archivos fallidos
+- Registrar por tabla las filas cargadas y las filas por segundo
+- Escribir el informe de la ejecución en JSON y en formato de texto
+  de Prometheus (textfile collector)
+- Perfilar etapas concretas con cProfile y tracemalloc (--profile)
+
+Las métricas se acumulan en el proceso actual. Los workers de parseo
+devuelven las suyas con `extraer_parseo` y el proceso principal las
+suma con `registrar_parseo`.
+
+Este módulo NO:
+- decide qué etapas se ejecutan (ver src.pipeline)
+"""
+
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from src.config import (
+    INFORME_METRICAS_PATH,
+    PERFILES_DIR,
+    PROMETHEUS_PATH,
+)
+
+
+# Prefijo de las métricas de Prometheus
+PREFIJO = "contratos_etl"
+
+# Intervalo de muestreo del RSS (segundos)
+_INTERVALO_RSS = 0.005
+
+# Líneas de cProfile y asignaciones de tracemalloc en cada resumen
+_LINEAS_PERFIL = 40
+
+# Contadores de parseo por archivo; "desde_cache" son los entries
+# leídos de la caché del parseo (src.cache_parseo) en lugar del XML
+_ERRORES_PARSEO = (
+    "errores_entry",
+    "errores_xml",
+    "descartados",
+    "fallidos",
+)
+_CONTADORES_PARSEO = ("entries", "bajas", "desde_cache") + _ERRORES_PARSEO
+
+_registro = {
+    "inicio": None,
+    "etapas": {},
+    "parseo": {},
+    "carga": {},
+}
+
+
+# ======================================================
+# RSS
+# ======================================================
+
+def _rss_actual() -> int:
+    """
+    RSS del proceso en bytes (Linux: /proc/self/statm).
+    """
+    with open("/proc/self/statm") as f:
+        paginas = int(f.read().split()[1])
+    return paginas * os.sysconf("SC_PAGE_SIZE")
+
+
+class MedidorRSS:
+    """
+    Pico de RSS del proceso durante un bloque `with`, muestreado en un
+    hilo.
+
+    Sin /proc (macOS) se usa `ru_maxrss`, que es el pico de toda la
+    vida del proceso y no el del bloque. Donde tampoco existe el módulo
+    `resource` (Windows) el pico queda en None.
+    """
+
+    def __init__(self):
+        self.pico = 0
+        self._parar = threading.Event()
+        self._hilo = None
+        self._proc = Path("/proc/self/statm").exists()
+
+    def _muestrear(self) -> None:
+        while not self._parar.is_set():
+            self.pico = max(self.pico, _rss_actual())
+            self._parar.wait(_INTERVALO_RSS)
+
+    def __enter__(self):
+        if self._proc:
+            self.pico = _rss_actual()
+            self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+            self._hilo.start()
+        return self
+
+    def __exit__(self, *_):
+        if self._proc:
+            self._parar.set()
+            self._hilo.join()
+            self.pico = max(self.pico, _rss_actual())
+        else:
+            self.pico = _rss_maximo()
+
+
+def _rss_maximo() -> Optional[int]:
+    """
+    Pico de RSS de la vida del proceso en bytes (`ru_maxrss`), o None
+    si la plataforma no tiene el módulo `resource`.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # ru_maxrss: KB en Linux, bytes en macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if platform.system() == "Darwin" else maxrss * 1024
+
+
+# ======================================================
+# REGISTRO
+# ======================================================
+
+def reiniciar() -> None:
+    """
+    Empieza una ejecución nueva con las métricas vacías.
+    """
+    _registro["inicio"] = datetime.now().isoformat(timespec="seconds")
+    for seccion in ("etapas", "parseo", "carga"):
+        _registro[seccion] = {}
+
+
+@contextmanager
+def medir_etapa(nombre: str, filas_entrada: Optional[int] = None):
+    """
+    Mide el bloque como la etapa `nombre`.
+
+    Devuelve un dict en el que el bloque puede fijar "filas_salida".
+    Si el bloque lanza una excepción la etapa queda como "fallida".
+    """
+    medicion = {
+        "estado": "fallida",
+        "filas_entrada": filas_entrada,
+        "filas_salida": None,
+    }
+
+    inicio = time.perf_counter()
+    inicio_cpu = time.process_time()
+
+    try:
+        with MedidorRSS() as rss:
+            yield medicion
+        medicion["estado"] = "completada"
+    finally:
+        segundos = time.perf_counter() - inicio
+        filas = (
+            filas_entrada if filas_entrada is not None
+            else medicion["filas_salida"]
+        )
+
+        medicion.update({
+            "segundos": round(segundos, 4),
+            "cpu_segundos": round(time.process_time() - inicio_cpu, 4),
+            "rss_pico_bytes": rss.pico,
+            "entries_por_segundo": (
+                round(filas / segundos, 1)
+                if filas is not None and segundos > 0 else None
+            ),
+        })
+        _registro["etapas"][nombre] = medicion
+
+
+def registrar_parseo(archivo: str, **contadores: int) -> None:
+    """
+    Suma contadores de parseo (`_CONTADORES_PARSEO`) del archivo
+    `archivo`.
+    """
+    registro = _registro["parseo"].setdefault(
+        archivo, dict.fromkeys(_CONTADORES_PARSEO, 0)
+    )
+    for contador, valor in contadores.items():
+        registro[contador] += int(valor)
+
+
+def contadores_parseo(archivo: str) -> dict:
+    """
+    Copia de los contadores de `archivo` ({} si no hay ninguno).
+    """
+    return dict(_registro["parseo"].get(archivo, {}))
+
+
+def extraer_parseo(archivo: str) -> dict:
+    """
+    Devuelve y elimina los contadores de `archivo` (para enviarlos
+    desde un worker al proceso principal).
+    """
+    return _registro["parseo"].pop(archivo, {})
+
+
+def registrar_carga(
+    tabla: str,
+    filas: int,
+    segundos: float,
+    metodo: str
+) -> None:
+    """
+    Suma una carga en `tabla` (una tabla puede cargarse varias veces
+    en la misma ejecución).
+    """
+    registro = _registro["carga"].setdefault(
+        tabla, {"filas": 0, "segundos": 0.0, "metodo": metodo}
+    )
+    registro["filas"] += int(filas)
+    registro["segundos"] = round(registro["segundos"] + segundos, 4)
+    registro["metodo"] = metodo
+    registro["filas_por_segundo"] = (
+        round(registro["filas"] / registro["segundos"], 1)
+        if registro["segundos"] > 0 else None
+    )
+
+
+# ======================================================
+# INFORMES
+# ======================================================
+
+def informe(estado: str = "completada") -> dict:
+    """
+    Informe de la ejecución actual.
+    """
+    parseo = _registro["parseo"]
+    totales = {
+        contador: sum(r[contador] for r in parseo.values())
+        for contador in _CONTADORES_PARSEO
+    }
+
+    return {
+        "inicio": _registro["inicio"],
+        "fin": datetime.now().isoformat(timespec="seconds"),
+        "estado": estado,
+        "etapas": _registro["etapas"],
+        "parseo": {
+            "archivos": len(parseo),
+            "totales": totales,
+            # Solo los archivos con algún problema, para que el informe
+            # no crezca con el número de páginas del feed
+            "archivos_con_errores": {
+                archivo: registro for archivo, registro in parseo.items()
+                if any(registro[c] for c in _ERRORES_PARSEO)
+            },
+        },
+        "carga": _registro["carga"],
+    }
+
+
+def _escribir_atomico(path: Path, texto: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(texto, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def guardar_informe(
+    datos: dict,
+    path: Path = INFORME_METRICAS_PATH
+) -> None:
+    _escribir_atomico(
+        path, json.dumps(datos, indent=2, ensure_ascii=False)
+    )
+
+
+def _escapar(valor) -> str:
+    return (
+        str(valor)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _etiquetas(**etiquetas) -> str:
+    pares = ",".join(
+        f'{clave}="{_escapar(valor)}"' for clave, valor in etiquetas.items()
+    )
+    return f"{{{pares}}}" if pares else ""
+
+
+def a_prometheus(datos: dict) -> str:
+    """
+    Convierte el informe al formato de texto de Prometheus.
+    """
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda, muestras):
+        nombre = f"{PREFIJO}_{nombre}"
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        for etiquetas, valor in muestras:
+            if valor is not None:
+                lineas.append(f"{nombre}{_etiquetas(**etiquetas)} {valor}")
+
+    etapas = datos["etapas"].items()
+    for campo, nombre, ayuda in (
+        ("segundos", "etapa_segundos", "Tiempo real de la etapa"),
+        ("cpu_segundos", "etapa_cpu_segundos",
+         "Tiempo de CPU del proceso principal en la etapa"),
+        ("rss_pico_bytes", "etapa_rss_pico_bytes",
+         "Pico de RSS del proceso principal en la etapa"),
+        ("filas_entrada", "etapa_filas_entrada", "Filas de entrada"),
+        ("filas_salida", "etapa_filas_salida", "Filas de salida"),
+        ("entries_por_segundo", "etapa_entries_por_segundo",
+         "Entries procesados por segundo"),
+    ):
+        metrica(nombre, "gauge", ayuda, [
+            ({"etapa": etapa}, registro.get(campo))
+            for etapa, registro in etapas
+        ])
+
+    metrica("etapa_correcta", "gauge", "1 si la etapa se completó", [
+        ({"etapa": etapa}, int(registro["estado"] == "completada"))
+        for etapa, registro in etapas
+    ])
+
+    parseo = datos["parseo"]
+    metrica("parseo_archivos", "gauge", "Archivos parseados",
+            [({}, parseo["archivos"])])
+    metrica("parseo_total", "gauge",
+            "Contadores de parseo sumados para todos los archivos", [
+                ({"contador": contador}, valor)
+                for contador, valor in parseo["totales"].items()
+            ])
+    metrica("parseo_archivo_errores", "gauge",
+            "Contadores de los archivos con errores de parseo", [
+                ({"archivo": archivo, "contador": contador}, valor)
+                for archivo, registro in parseo["archivos_con_errores"].items()
+                for contador, valor in registro.items()
+                if contador in _ERRORES_PARSEO
+            ])
+
+    for campo, nombre, ayuda in (
+        ("filas", "carga_filas", "Filas cargadas por tabla"),
+        ("segundos", "carga_segundos", "Tiempo de carga por tabla"),
+        ("filas_por_segundo", "carga_filas_por_segundo",
+         "Filas cargadas por segundo"),
+    ):
+        metrica(nombre, "gauge", ayuda, [
+            ({"tabla": tabla}, registro.get(campo))
+            for tabla, registro in datos["carga"].items()
+        ])
+
+    metrica("ejecucion_correcta", "gauge",
+            "1 si la última ejecución terminó sin errores",
+            [({}, int(datos["estado"] == "completada"))])
+    metrica("ultima_ejecucion_timestamp_seconds", "gauge",
+            "Fin de la última ejecución (epoch)",
+            [({}, round(time.time()))])
+
+    return "\n".join(lineas) + "\n"
+
+
+def guardar_prometheus(
+    datos: dict,
+    path: Path = PROMETHEUS_PATH
+) -> None:
+    """
+    Escribe el informe en `path` de forma atómica, como espera el
+    textfile collector de node_exporter.
+    """
+    _escribir_atomico(path, a_prometheus(datos))
+
+
+def guardar_ejecucion(estado: str) -> dict:
+    """
+    Genera el informe de la ejecución con `estado` ("completada" o
+    "fallida"), lo guarda en JSON y en formato Prometheus y lo
+    devuelve.
+    """
+    datos = informe(estado)
+    guardar_informe(datos)
+    guardar_prometheus(datos)
+    print(f"Métricas guardadas en {INFORME_METRICAS_PATH} y "
+          f"{PROMETHEUS_PATH}")
+    return datos
+
+
+# ======================================================
+# PERFILADO
+# ======================================================
+
+@contextmanager
+def perfilar(nombre: str, directorio: Path = PERFILES_DIR):
+    """
+    Ejecuta el bloque bajo cProfile y tracemalloc y guarda en
+    `directorio`:
+
+    - <nombre>.prof: estadísticas de cProfile (pstats, snakeviz, ...)
+    - <nombre>.txt: funciones con más tiempo acumulado y líneas con
+      más memoria asignada que sigue viva al terminar, más el pico
+      de memoria de Python
+    """
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    perfil = cProfile.Profile()
+    tracemalloc.start()
+    perfil.enable()
+
+    try:
+        yield
+    finally:
+        perfil.disable()
+        instantanea = tracemalloc.take_snapshot()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        perfil.dump_stats(directorio / f"{nombre}.prof")
+
+        texto = io.StringIO()
+        texto.write(f"Etapa: {nombre}\n")
+        texto.write(f"Pico de memoria de Python: {pico / 2**20:.1f} MB\n\n")
+        pstats.Stats(perfil, stream=texto).sort_stats(
+            "cumulative"
+        ).print_stats(_LINEAS_PERFIL)
+
+        texto.write("\nMemoria asignada por línea (viva al terminar):\n")
+        for estadistica in instantanea.statistics("lineno")[:_LINEAS_PERFIL]:
+            texto.write(f"{estadistica}\n")
+
+        (directorio / f"{nombre}.txt").write_text(
+            texto.getvalue(), encoding="utf-8"
+        )
+        print(f"Perfil de '{nombre}' guardado en {directorio}")
@@ -0,0 +1,460 @@
+"""
+Ejecución por etapas del pipeline ETL, con checkpoints reanudables.
+
+Etapas (en orden):
+    esquema -> parseo -> limpieza -> maestras -> empresas -> organos
+    -> contratos
+
+Responsabilidad:
+- Ejecutar un rango de etapas (desde / hasta), saltando las indicadas
+- Guardar la salida de cada etapa de datos como checkpoint Parquet
+  (parseado, limpio, con empresa_id, con organo_id) en
+  `CHECKPOINT_DIR`, de modo que una etapa posterior puede ejecutarse
+  en otra invocación leyendo el checkpoint de la anterior
+- Registrar por etapa estado, duración y filas en
+  `ESTADO_PIPELINE_PATH`, y reanudar desde la primera etapa no
+  completada de la última ejecución
+- Dar a la limpieza su entrada por lotes (row groups del checkpoint
+  del parseo), sin cargar el DataFrame parseado completo
+- Apartar en la limpieza las bajas (<at:deleted-entry>) y aplicarlas
+  en la etapa `contratos`, después de cargar los contratos
+- Medir cada etapa y escribir el informe de métricas de la ejecución
+  (ver src.metricas), también si una etapa falla, y perfilar las
+  etapas pedidas
+
+Este módulo NO:
+- parsea, limpia ni inserta por sí mismo (delega en los módulos de
+  cada etapa)
+"""
+
+import json
+import os
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+from src import metricas
+from src.config import (
+    CHECKPOINT_DIR,
+    CLEAN_CHUNK_SIZE,
+    ESTADO_PIPELINE_PATH,
+    MANIFEST_PATH,
+    RAW_DATA_DIR,
+)
+from src.manifest import cargar_manifest, guardar_manifest
+
+
+# Manifiesto actualizado por el parseo, pendiente hasta cargar contratos
+_MANIFEST_PENDIENTE = CHECKPOINT_DIR / "manifest_pendiente.json"
+
+# Bajas separadas en la limpieza, pendientes hasta cargar contratos
+_BAJAS_PENDIENTES = CHECKPOINT_DIR / "bajas_pendientes.parquet"
+
+
+class Etapa(NamedTuple):
+    """
+    Una etapa del pipeline.
+
+    - funcion: recibe (DataFrame de entrada o None, opciones) y devuelve
+      el DataFrame de salida o None
+    - entrada: etapa cuyo checkpoint consume (None = ninguna)
+    - checkpoint: si True, la salida se guarda en Parquet
+    - por_lotes: si True, `funcion` recibe en lugar del DataFrame una
+      función que devuelve los lotes del checkpoint de `entrada`
+    """
+    nombre: str
+    funcion: Callable
+    entrada: Optional[str] = None
+    checkpoint: bool = False
+    por_lotes: bool = False
+
+
+# ======================================================
+# ETAPAS
+# ======================================================
+
+def _esquema(_df, _opciones: dict) -> None:
+    from src.db.schema import ejecutar_schema
+    ejecutar_schema()
+
+
+def _parseo(_df, opciones: dict):
+    from src.loader import load_all_atom_folders
+
+    incremental = opciones["incremental"]
+    manifest = cargar_manifest() if incremental else {}
+
+    df = load_all_atom_folders(
+        RAW_DATA_DIR,
+        workers=opciones["workers"],
+        manifest=manifest,
+        solo_pendientes=incremental,
+        cache=opciones["cache"]
+    )
+
+    if df.empty and incremental:
+        # Puede haber archivos solo "tocados" (mismo hash)
+        guardar_manifest(manifest)
+    else:
+        guardar_manifest(manifest, _MANIFEST_PENDIENTE)
+
+    return df
+
+
+def _limpieza(lotes, _opciones: dict):
+    from src.transform.cleaning import (
+        concatenar_lotes,
+        limpiar_contratos_por_lotes,
+        separar_bajas,
+    )
+
+    contratos, bajas = separar_bajas(
+        concatenar_lotes(limpiar_contratos_por_lotes(lotes))
+    )
+
+    if bajas.empty:
+        _BAJAS_PENDIENTES.unlink(missing_ok=True)
+    else:
+        _guardar_bajas(bajas)
+        print(f"{len(bajas)} bajas pendientes de aplicar")
+
+    return contratos
+
+
+def _maestras(_df, _opciones: dict) -> None:
+    from src.db.insert import insertar_tablas_maestras
+    insertar_tablas_maestras()
+
+
+def _empresas(df, _opciones: dict):
+    from src.db.claves import guardar_claves
+    from src.db.insert import insertar_empresas
+
+    df = insertar_empresas(df)
+    guardar_claves()
+    return df
+
+
+def _organos(df, _opciones: dict):
+    from src.db.claves import guardar_claves
+    from src.db.insert import insertar_organos
+
+    df = insertar_organos(df)
+    guardar_claves()
+    return df
+
+
+def _contratos(df, _opciones: dict) -> None:
+    import pandas as pd
+    from src.db.insert import insertar_bajas, insertar_contratos
+
+    if not df.empty:
+        insertar_contratos(df)
+
+    if _BAJAS_PENDIENTES.exists():
+        insertar_bajas(pd.read_parquet(_BAJAS_PENDIENTES))
+        _BAJAS_PENDIENTES.unlink()
+
+    # El manifiesto solo se actualiza cuando los datos ya están cargados
+    if _MANIFEST_PENDIENTE.exists():
+        manifest = cargar_manifest(_MANIFEST_PENDIENTE)
+        guardar_manifest(manifest, MANIFEST_PATH)
+        _MANIFEST_PENDIENTE.unlink()
+
+
+ETAPAS = [
+    Etapa("esquema", _esquema),
+    Etapa("parseo", _parseo, checkpoint=True),
+    Etapa(
+        "limpieza", _limpieza,
+        entrada="parseo", checkpoint=True, por_lotes=True
+    ),
+    Etapa("maestras", _maestras),
+    Etapa("empresas", _empresas, entrada="limpieza", checkpoint=True),
+    Etapa("organos", _organos, entrada="empresas", checkpoint=True),
+    Etapa("contratos", _contratos, entrada="organos"),
+]
+
+NOMBRES_ETAPAS = [etapa.nombre for etapa in ETAPAS]
+
+
+# ======================================================
+# CHECKPOINTS Y ESTADO
+# ======================================================
+
+def _ruta_checkpoint(nombre: str):
+    return CHECKPOINT_DIR / f"{nombre}.parquet"
+
+
+def _guardar_checkpoint(nombre: str, df) -> None:
+    path = _ruta_checkpoint(nombre)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp_path, index=False, row_group_size=CLEAN_CHUNK_SIZE)
+    os.replace(tmp_path, path)
+
+
+def _guardar_bajas(df) -> None:
+    _BAJAS_PENDIENTES.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = _BAJAS_PENDIENTES.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, _BAJAS_PENDIENTES)
+
+
+def _leer_checkpoint(nombre: str):
+    import pandas as pd
+
+    path = _ruta_checkpoint(nombre)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"No hay checkpoint de la etapa '{nombre}': "
+            f"ejecutar con --desde {nombre}"
+        )
+
+    print(f"Leyendo checkpoint de '{nombre}': {path}")
+    return pd.read_parquet(path)
+
+
+def _lotes_checkpoint(nombre: str) -> Callable:
+    """
+    Devuelve una función que, en cada llamada, recorre el checkpoint
+    de `nombre` por lotes de `CLEAN_CHUNK_SIZE` filas.
+    """
+    import pyarrow.parquet as pq
+
+    path = _ruta_checkpoint(nombre)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"No hay checkpoint de la etapa '{nombre}': "
+            f"ejecutar con --desde {nombre}"
+        )
+
+    def lotes():
+        archivo = pq.ParquetFile(path)
+        for batch in archivo.iter_batches(batch_size=CLEAN_CHUNK_SIZE):
+            yield batch.to_pandas()
+
+    print(f"Leyendo checkpoint de '{nombre}' por lotes: {path}")
+    return lotes
+
+
+def _filas_entrada(etapa: Etapa, entrada) -> Optional[int]:
+    if entrada is None:
+        return None
+    if not callable(entrada):
+        return len(entrada)
+
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(_ruta_checkpoint(etapa.entrada)).metadata.num_rows
+
+
+def cargar_estado() -> dict:
+    """
+    Devuelve el estado de la última ejecución ({} si no hay ninguna).
+    """
+    if not ESTADO_PIPELINE_PATH.exists():
+        return {}
+    return json.loads(ESTADO_PIPELINE_PATH.read_text(encoding="utf-8"))
+
+
+def _guardar_estado(estado: dict) -> None:
+    ESTADO_PIPELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = ESTADO_PIPELINE_PATH.with_suffix(".json.tmp")
+    tmp_path.write_text(
+        json.dumps(estado, indent=2, ensure_ascii=False),
+        encoding="utf-8"
+    )
+    os.replace(tmp_path, ESTADO_PIPELINE_PATH)
+
+
+def _etapa_pendiente(estado: dict) -> Optional[str]:
+    """
+    Primera etapa de la última ejecución que no llegó a completarse.
+    """
+    for nombre in estado.get("etapas_seleccionadas", []):
+        registro = estado["etapas"].get(nombre, {})
+        if registro.get("estado") not in ("completada", "omitida"):
+            return nombre
+    return None
+
+
+# ======================================================
+# EJECUCIÓN
+# ======================================================
+
+def seleccionar_etapas(
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    saltar: tuple = ()
+) -> list:
+    """
+    Devuelve las etapas entre `desde` y `hasta` (incluidas), sin las
+    de `saltar`.
+    """
+    inicio = NOMBRES_ETAPAS.index(desde) if desde else 0
+    fin = NOMBRES_ETAPAS.index(hasta) if hasta else len(ETAPAS) - 1
+
+    return [
+        etapa for etapa in ETAPAS[inicio:fin + 1]
+        if etapa.nombre not in saltar
+    ]
+
+
+def ejecutar_pipeline(
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    saltar: tuple = (),
+    reanudar: bool = False,
+    workers: int = 1,
+    incremental: bool = False,
+    perfilar: tuple = (),
+    cache: bool = True
+) -> dict:
+    """
+    Ejecuta las etapas seleccionadas en orden.
+
+    Parameters
+    ----------
+    desde, hasta : str, optional
+        Primera y última etapa a ejecutar (por defecto, todas)
+    saltar : tuple
+        Etapas a omitir
+    reanudar : bool
+        Empezar en la primera etapa no completada de la última
+        ejecución (con el mismo `hasta` y `saltar` que entonces)
+    workers : int
+        Procesos para el parseo
+    incremental : bool
+        Parsear solo archivos nuevos o modificados (ver src.manifest)
+    perfilar : tuple
+        Etapas a ejecutar bajo cProfile y tracemalloc (ver
+        `metricas.perfilar`)
+    cache : bool
+        Reutilizar la caché del parseo por archivo (ver
+        src.cache_parseo)
+
+    Returns
+    -------
+    dict
+        Estado de la ejecución (también guardado en disco)
+    """
+    if reanudar:
+        anterior = cargar_estado()
+        desde = _etapa_pendiente(anterior)
+        if desde is None:
+            print("Nada que reanudar: la última ejecución se completó")
+            return anterior
+
+        seleccionadas = [
+            nombre for nombre in anterior["etapas_seleccionadas"]
+            if NOMBRES_ETAPAS.index(nombre) >= NOMBRES_ETAPAS.index(desde)
+        ]
+        etapas = [e for e in ETAPAS if e.nombre in seleccionadas]
+        estado = anterior
+        print(f"Reanudando desde la etapa '{desde}'")
+    else:
+        etapas = seleccionar_etapas(desde, hasta, saltar)
+        estado = {
+            "inicio": datetime.now().isoformat(timespec="seconds"),
+            "etapas_seleccionadas": [e.nombre for e in etapas],
+            "etapas": {},
+        }
+
+    opciones = {
+        "workers": workers,
+        "incremental": incremental,
+        "cache": cache,
+    }
+    salidas = {}
+    metricas.reiniciar()
+
+    for etapa in etapas:
+        print(f"\n=== Etapa: {etapa.nombre} ===")
+
+        entrada = None
+        if etapa.por_lotes:
+            # La salida previa ya está en su checkpoint: se libera
+            salidas.pop(etapa.entrada, None)
+            entrada = _lotes_checkpoint(etapa.entrada)
+        elif etapa.entrada is not None:
+            entrada = salidas.get(etapa.entrada)
+            if entrada is None:
+                entrada = _leer_checkpoint(etapa.entrada)
+
+        registro = {
+            "estado": "en_curso",
+            "inicio": datetime.now().isoformat(timespec="seconds"),
+        }
+        estado["etapas"][etapa.nombre] = registro
+        _guardar_estado(estado)
+
+        perfil = (
+            metricas.perfilar(etapa.nombre) if etapa.nombre in perfilar
+            else nullcontext()
+        )
+
+        inicio = time.perf_counter()
+        try:
+            with metricas.medir_etapa(
+                etapa.nombre, _filas_entrada(etapa, entrada)
+            ) as medicion, perfil:
+                salida = etapa.funcion(entrada, opciones)
+                if salida is not None:
+                    medicion["filas_salida"] = len(salida)
+        except Exception:
+            registro["estado"] = "fallida"
+            registro["segundos"] = round(time.perf_counter() - inicio, 3)
+            _guardar_estado(estado)
+            metricas.guardar_ejecucion("fallida")
+            print(f"La etapa '{etapa.nombre}' ha fallado: "
+                  "reanudar con --reanudar")
+            raise
+
+        registro["segundos"] = round(time.perf_counter() - inicio, 3)
+        datos = salida if salida is not None else entrada
+        registro["filas"] = (
+            len(datos) if datos is not None and not callable(datos)
+            else None
+        )
+
+        # La entrada ya está consumida (y en su checkpoint): se libera
+        # antes de la etapa siguiente
+        salidas.pop(etapa.entrada, None)
+        entrada = datos = None
+
+        if salida is not None:
+            salidas[etapa.nombre] = salida
+            if etapa.checkpoint:
+                _guardar_checkpoint(etapa.nombre, salida)
+                registro["checkpoint"] = str(
+                    _ruta_checkpoint(etapa.nombre)
+                )
+
+        registro["estado"] = "completada"
+        _guardar_estado(estado)
+
+        filas = (
+            f" ({registro['filas']} filas)"
+            if registro["filas"] is not None else ""
+        )
+        print(f"Etapa '{etapa.nombre}' completada en "
+              f"{registro['segundos']:.2f}s{filas}")
+
+        if (
+            salida is not None and salida.empty
+            and not _BAJAS_PENDIENTES.exists()
+        ):
+            print("Sin datos nuevos: se omiten las etapas siguientes")
+            for siguiente in etapas[etapas.index(etapa) + 1:]:
+                estado["etapas"][siguiente.nombre] = {"estado": "omitida"}
+            break
+
+    estado["fin"] = datetime.now().isoformat(timespec="seconds")
+    _guardar_estado(estado)
+    metricas.guardar_ejecucion("completada")
+
+    return estado
@@ -1,9 +1,29 @@
 """
 Limpieza y normalización del DataFrame de contratos.
+
+Responsabilidad:
+- Eliminar columnas que no se cargan en la base de datos
+- Extraer `id_entry_num` (número final de `id_entry`)
+- Deduplicar por `id_entry_num` conservando la versión más reciente
+  (mayor `fecha_actualizacion`; a igualdad, la última en el orden del
+  feed). Las bajas (<at:deleted-entry>) se deduplican aparte: de cada
+  contrato sobreviven su última publicación y su última baja, y la
+  carga decide cuál vale (ver src.db.insert.insertar_bajas)
+- Separar las bajas supervivientes de los contratos (`separar_bajas`)
+- Hacer lo mismo por lotes, sin tener todo el DataFrame en memoria
+  (`limpiar_contratos_por_lotes`)
+
+Este módulo NO:
+- lee archivos ni accede a la base de datos
 """
 
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
 import pandas as pd
 
+from src.transform.tipos import categorizar
+
 
 COLUMNAS_A_ELIMINAR = [
     "objeto_contrato",
@@ -16,23 +36,227 @@ COLUMNAS_A_ELIMINAR = [
 ]
 
 
-def limpiar_contratos(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+# ======================================================
+# IDENTIFICADOR Y VERSIÓN
+# ======================================================
+
+def extraer_id_entry_num(id_entry: pd.Series) -> pd.Series:
+    """
+    Devuelve el número final de cada `id_entry` (NaN si no tiene).
+
+    Los ids de la plataforma son URLs que terminan en "/<número>": se
+    toma lo que sigue a la última "/" y, solo si no son todo dígitos
+    decimales (`str.isdecimal`, lo mismo que acepta `\\d`; `isdigit`
+    también aceptaría superíndices), se recurre a la expresión regular
+    `(\\d+)$`. El resultado es el mismo que aplicar la expresión a
+    toda la columna.
+    """
+    texto = id_entry.astype(str)
+    # Lo que sigue a la última "/" (todo el texto si no hay ninguna).
+    # Con cadenas de pyarrow la sustitución se hace sin pasar por
+    # objetos Python, a diferencia de str.rpartition
+    cola = texto.str.replace(r"(?s)^.*/", "", regex=True)
+
+    es_numero = cola.str.isdecimal() & (cola != "")
+    ids = cola.where(es_numero)
+
+    resto = ~es_numero
+    if resto.any():
+        ids[resto] = texto[resto].str.extract(r"(\d+)$", expand=False)
+
+    return ids
+
+
+def _versiones(fechas: pd.Series) -> np.ndarray:
+    """
+    `fecha_actualizacion` como enteros comparables (NaT = la menor).
+    """
+    return (
+        pd.to_datetime(fechas, errors="coerce")
+        .astype("datetime64[ns]")
+        .to_numpy()
+        .view("int64")
+    )
+
 
+def _es_baja(df: pd.DataFrame) -> pd.Series:
+    """
+    Filas que son bajas (False en todas si no hay `fecha_baja`).
+    """
+    if "fecha_baja" not in df.columns:
+        # Checkpoints anteriores a las bajas
+        return pd.Series(False, index=df.index)
+    return df["fecha_baja"].notna()
+
+
+def _preparar(df: pd.DataFrame) -> pd.DataFrame:
     df = df.drop(
         columns=COLUMNAS_A_ELIMINAR,
         errors="ignore"
     )
+    df["id_entry_num"] = extraer_id_entry_num(df["id_entry"])
+    return df
 
-    df["id_entry_num"] = (
-        df["id_entry"]
-        .astype(str)
-        .str.extract(r"(\d+)$")
-    )
 
-    df = df.drop_duplicates(
-        subset=["id_entry_num"],
-        keep="last"
-    )
+# ======================================================
+# LIMPIEZA EN MEMORIA
+# ======================================================
 
-    return df
+def limpiar_contratos(df: pd.DataFrame) -> pd.DataFrame:
+    df = _preparar(df)
+
+    # Orden estable por versión: entre versiones iguales se mantiene
+    # el orden del feed, y keep="last" conserva la más reciente.
+    # Publicaciones y bajas se deduplican por separado: si la baja
+    # ganara a la publicación, el contrato se guardaría sin datos
+    orden = np.argsort(_versiones(df["fecha_actualizacion"]), kind="stable")
+    claves = pd.DataFrame({"id": df["id_entry_num"], "baja": _es_baja(df)})
+    ultimas = ~claves.iloc[orden].duplicated(keep="last")
+
+    return df.iloc[np.sort(orden[ultimas.to_numpy()])]
+
+
+# ======================================================
+# LIMPIEZA POR LOTES
+# ======================================================
+
+def _reducir(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Deja, de las filas de `df` (en el orden del feed), la ganadora de
+    cada (id, es_baja): la de mayor versión y, a igualdad, la posterior
+    en el feed. Sin número, todas cuentan como el mismo id (NaN), como
+    en `limpiar_contratos`.
+
+    El resultado sigue en el orden del feed.
+    """
+    # Una sola clave entera: deduplicar por dos columnas de texto y
+    # booleana es varias veces más lento
+    ids, _ = pd.factorize(df["id"], use_na_sentinel=False)
+    claves = pd.Series(ids * 2 + df["baja"].to_numpy())
+
+    orden = np.argsort(df["version"].to_numpy(), kind="stable")
+    ultimas = ~claves.iloc[orden].duplicated(keep="last").to_numpy()
+
+    return df.iloc[np.sort(orden[ultimas])]
+
+
+def _versiones_ganadoras(lotes: Iterable[pd.DataFrame]) -> np.ndarray:
+    """
+    Primera pasada: posiciones globales (orden del feed) de la versión
+    más reciente de cada `id_entry_num`, y de su baja más reciente.
+
+    Cada lote se reduce a sus ganadoras y estas se acumulan; cuando lo
+    acumulado supera a las ganadoras ya reducidas se vuelve a reducir
+    todo junto, así que en memoria hay como mucho unas dos filas
+    (id, es_baja, versión, posición) por clave distinta. Las
+    posiciones salen ordenadas.
+    """
+    # partes[0] son las ganadoras de la última reducción (si la hay) y
+    # el resto, las de los lotes posteriores
+    partes = []
+    reducidas = 0
+    pendientes = 0
+    inicio = 0
+
+    for lote in lotes:
+        df = _reducir(pd.DataFrame({
+            "id": extraer_id_entry_num(lote["id_entry"]).array,
+            "baja": _es_baja(lote).to_numpy(),
+            "version": _versiones(lote["fecha_actualizacion"]),
+            "posicion": np.arange(inicio, inicio + len(lote)),
+        }))
+        inicio += len(lote)
+
+        partes.append(df)
+        pendientes += len(df)
+        if pendientes > reducidas:
+            partes = [_reducir(pd.concat(partes, ignore_index=True))]
+            reducidas = len(partes[0])
+            pendientes = 0
+
+    if not partes:
+        return np.array([], dtype=np.int64)
+
+    ganadoras = _reducir(pd.concat(partes, ignore_index=True))
+    return ganadoras["posicion"].to_numpy(dtype=np.int64)
+
+
+def limpiar_contratos_por_lotes(
+    lotes: Callable[[], Iterable[pd.DataFrame]]
+) -> Iterator[pd.DataFrame]:
+    """
+    Limpia y deduplica un DataFrame leído por lotes, con el mismo
+    resultado que `limpiar_contratos` sobre su concatenación.
+
+    Parameters
+    ----------
+    lotes : callable
+        Devuelve un iterable nuevo de DataFrames, en el orden del feed,
+        cada vez que se llama. Se recorre dos veces: la primera para
+        decidir qué fila sobrevive de cada `id_entry_num` y la segunda
+        para emitirlas.
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        Lotes limpios con solo las filas supervivientes, en el orden
+        del feed
+    """
+    ganadoras = _versiones_ganadoras(lotes())
+
+    inicio = 0
+    for lote in lotes():
+        fin = inicio + len(lote)
+
+        desde, hasta = np.searchsorted(ganadoras, [inicio, fin])
+        filas = ganadoras[desde:hasta] - inicio
+        inicio = fin
+
+        if len(filas):
+            yield _preparar(lote.iloc[filas])
+
+
+def concatenar_lotes(lotes: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Une los lotes limpios en un DataFrame con columnas categóricas.
+    """
+    lotes = list(lotes)
+    if not lotes:
+        return pd.DataFrame()
+
+    return categorizar(pd.concat(lotes, ignore_index=True))
+
+
+# ======================================================
+# BAJAS
+# ======================================================
+
+# Columnas de una baja: el resto de campos de la fila van vacíos
+COLUMNAS_BAJA = [
+    "id_entry_num",
+    "id_entry",
+    "fecha_actualizacion",
+    "fecha_baja",
+]
+
+
+def separar_bajas(df: pd.DataFrame) -> tuple:
+    """
+    Separa un DataFrame limpio en contratos y bajas.
+
+    Un mismo contrato puede aparecer en ambos (su última publicación y
+    su última baja): las bajas se cargan después de los contratos.
+
+    Returns
+    -------
+    tuple
+        (contratos, bajas con las columnas de `COLUMNAS_BAJA`)
+    """
+    if "fecha_baja" not in df.columns:
+        # Checkpoints anteriores a las bajas
+        return df, pd.DataFrame(columns=COLUMNAS_BAJA)
+
+    es_baja = _es_baja(df)
+    contratos = df[~es_baja].drop(columns="fecha_baja")
+
+    return contratos, df.loc[es_baja, COLUMNAS_BAJA]
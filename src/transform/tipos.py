@@ -0,0 +1,178 @@
+"""
+Tipos del dataset de contratos.
+
+Responsabilidad:
+- Conversores vectorizados a tipos compactos: enteros con nulos
+  (Int32), indicadores booleanos (boolean)
+- Columnas categóricas (códigos y catálogos de baja cardinalidad)
+  del DataFrame parseado
+- Esquema Arrow explícito del dataset analítico exportado:
+  categóricas codificadas como diccionario, importes float64, número
+  de ofertas Int32, indicador PYME booleano y fechas timestamp[s]
+
+Este módulo NO:
+- parsea XML
+- accede a la base de datos
+"""
+
+import pandas as pd
+import pyarrow as pa
+
+
+# Valores de texto de un indicador booleano (xsd:boolean y TINYINT)
+_BOOLEANOS = {
+    "true": True,
+    "false": False,
+    "1": True,
+    "0": False,
+}
+
+
+# ======================================================
+# CONVERSORES
+# ======================================================
+
+def a_enteros(serie: pd.Series) -> pd.Series:
+    """
+    Convierte una columna en enteros con nulos (Int32).
+
+    Los valores no numéricos o con decimales quedan como nulos.
+    """
+    numeros = pd.to_numeric(serie, errors="coerce")
+    return numeros.where(numeros % 1 == 0).astype("Int32")
+
+
+def a_booleanos(serie: pd.Series) -> pd.Series:
+    """
+    Convierte un indicador ("true"/"false", 1/0) en booleano con nulos.
+
+    Las columnas numéricas se comparan como números: un TINYINT(1) con
+    nulos llega de la base de datos como float64 (1.0 / 0.0), que como
+    texto no coincidiría con "1" / "0".
+    """
+    if pd.api.types.is_bool_dtype(serie):
+        return serie.astype("boolean")
+
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.map({1: True, 0: False}).astype("boolean")
+
+    texto = serie.astype("string").str.strip().str.lower()
+    return texto.map(_BOOLEANOS).astype("boolean")
+
+
+# ======================================================
+# DATAFRAME PARSEADO
+# ======================================================
+
+# Códigos y catálogos del DataFrame de `load_all_atom_folders`
+COLUMNAS_CATEGORICAS = [
+    "estado",
+    "tipo_organo_codigo",
+    "tipo_organo_nombre",
+    "actividad_organo_codigo",
+    "actividad_organo_nombre",
+    "pais_organo",
+    "codigo_tipo_contrato",
+    "nombre_tipo_contrato",
+    "codigo_subtipo_contrato",
+    "codigo_region_nuts",
+    "duracion_contrato_unidad",
+    "pais_empresa",
+]
+
+
+def categorizar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte en `category` las columnas de `COLUMNAS_CATEGORICAS`.
+
+    Se aplica sobre el DataFrame ya concatenado: concatenar lotes con
+    categorías distintas devolvería columnas de texto.
+    """
+    columnas = [c for c in COLUMNAS_CATEGORICAS if c in df.columns]
+    return df.astype({columna: "category" for columna in columnas})
+
+
+# ======================================================
+# DATASET ANALÍTICO
+# ======================================================
+
+_TEXTO = pa.string()
+_CATEGORIA = pa.dictionary(pa.int32(), pa.string())
+_IMPORTE = pa.float64()
+_FECHA = pa.timestamp("s")
+
+ESQUEMA_DATASET = pa.schema(
+    [
+        ("id_entry_num", _TEXTO),
+        ("id_entry", _TEXTO),
+        ("titulo", _TEXTO),
+        ("id_licitacion", _TEXTO),
+        ("fecha_actualizacion", _FECHA),
+        ("fecha_adjudicacion", _FECHA),
+        ("estado", _CATEGORIA),
+        ("tipo_contrato", _CATEGORIA),
+        ("codigo_subtipo_contrato", _CATEGORIA),
+        ("importe_estimado", _IMPORTE),
+        ("importe_total", _IMPORTE),
+        ("importe_sin_impuestos", _IMPORTE),
+        ("codigo_cpv_principal", _CATEGORIA),
+        ("codigo_region_nuts", _CATEGORIA),
+        ("ofertas_recibidas", pa.int32()),
+        ("id_plataforma", _TEXTO),
+        ("empresa_nombre", _CATEGORIA),
+        ("nif_empresa", _TEXTO),
+        ("empresa_es_pyme", pa.bool_()),
+        ("empresa_pais", _CATEGORIA),
+        ("organo_nombre", _CATEGORIA),
+        ("organo_dir3", _CATEGORIA),
+        ("organo_postalcode", _CATEGORIA),
+        ("organo_localidad", _CATEGORIA),
+        ("organo_email", _TEXTO),
+        ("organo_telefono", _TEXTO),
+        ("organo_nif", _TEXTO),
+        ("tipo_organo", _CATEGORIA),
+        ("actividad_organo", _CATEGORIA),
+    ]
+)
+
+
+def aplicar_esquema(
+    df: pd.DataFrame,
+    esquema: pa.Schema = ESQUEMA_DATASET
+) -> pd.DataFrame:
+    """
+    Ajusta los tipos de pandas de `df` al esquema Arrow (DECIMAL ->
+    float64, DATETIME -> datetime64[s], TINYINT(1) -> boolean, ...).
+    """
+    for campo in esquema:
+        serie = df[campo.name]
+        tipo = campo.type
+
+        if pa.types.is_timestamp(tipo):
+            df[campo.name] = (
+                pd.to_datetime(serie, errors="coerce").astype("datetime64[s]")
+            )
+        elif pa.types.is_floating(tipo):
+            df[campo.name] = pd.to_numeric(serie, errors="coerce")
+        elif pa.types.is_integer(tipo):
+            df[campo.name] = a_enteros(serie)
+        elif pa.types.is_boolean(tipo):
+            df[campo.name] = a_booleanos(serie)
+        else:
+            texto = serie.astype(str).astype(object).where(serie.notna(), None)
+            if pa.types.is_dictionary(tipo):
+                texto = texto.astype("category")
+            df[campo.name] = texto
+
+    return df
+
+
+def a_tabla_arrow(
+    df: pd.DataFrame,
+    esquema: pa.Schema = ESQUEMA_DATASET
+) -> pa.Table:
+    """
+    Convierte un DataFrame ya tipado con `aplicar_esquema` en una tabla
+    Arrow con exactamente `esquema`.
+    """
+    return pa.Table.from_pandas(df, schema=esquema, preserve_index=False)
@@ -0,0 +1,77 @@
+-- Esquema original (sql/ddl.sql antes de las claves naturales, fecha_carga
+-- y fecha_baja) traducido a SQLite: base de datos de partida para probar
+-- las migraciones de src.db.schema
+
+CREATE TABLE `empresa` (
+  `empresa_id` INTEGER PRIMARY KEY,
+  `nif_empresa` VARCHAR(150) NULL DEFAULT NULL,
+  `empresa_nombre` VARCHAR(580) NULL DEFAULT NULL,
+  `empresa_es_pyme` VARCHAR(20) NULL DEFAULT NULL,
+  `empresa_pais` VARCHAR(100) NULL DEFAULT NULL);
+
+CREATE TABLE `tipo_actividad_organo` (
+  `codigo_actividad_organo` VARCHAR(10) NOT NULL,
+  `nombre_actividad_organo` VARCHAR(255) NULL DEFAULT NULL,
+  PRIMARY KEY (`codigo_actividad_organo`));
+
+CREATE TABLE `tipo_organo` (
+  `codigo_tipo_organo` VARCHAR(10) NOT NULL,
+  `nombre_tipo_organo` VARCHAR(100) NULL DEFAULT NULL,
+  PRIMARY KEY (`codigo_tipo_organo`));
+
+CREATE TABLE `organo` (
+  `organo_id` INTEGER PRIMARY KEY,
+  `organo_dir3` VARCHAR(20) NULL DEFAULT NULL,
+  `organo_nombre` VARCHAR(300) NULL DEFAULT NULL,
+  `tipo_organo_codigo` VARCHAR(10) NULL DEFAULT NULL,
+  `actividad_organo_codigo` VARCHAR(10) NULL DEFAULT NULL,
+  `organo_postalcode` VARCHAR(20) NULL DEFAULT NULL,
+  `organo_localidad` VARCHAR(255) NULL DEFAULT NULL,
+  `organo_email` VARCHAR(255) NULL DEFAULT NULL,
+  `organo_telefono` VARCHAR(30) NULL DEFAULT NULL,
+  `organo_nif` VARCHAR(20) NULL DEFAULT NULL,
+  CONSTRAINT `FK_org_actividad_organo`
+    FOREIGN KEY (`actividad_organo_codigo`)
+    REFERENCES `tipo_actividad_organo` (`codigo_actividad_organo`),
+  CONSTRAINT `FK_org_tipo_organo`
+    FOREIGN KEY (`tipo_organo_codigo`)
+    REFERENCES `tipo_organo` (`codigo_tipo_organo`));
+
+CREATE INDEX `FK_org_tipoorg_idx` ON `organo` (`tipo_organo_codigo`);
+CREATE INDEX `FK_org_actividad_organo_idx`
+  ON `organo` (`actividad_organo_codigo`);
+
+CREATE TABLE `tipo_contrato` (
+  `codigo_tipo_contrato` VARCHAR(10) NOT NULL,
+  `nombre_contrato` VARCHAR(100) NOT NULL,
+  PRIMARY KEY (`codigo_tipo_contrato`));
+
+CREATE TABLE `contrato` (
+  `id_entry_num` VARCHAR(45) NOT NULL,
+  `id_entry` VARCHAR(255) NULL DEFAULT NULL,
+  `titulo` VARCHAR(4500) NULL DEFAULT NULL,
+  `id_licitacion` VARCHAR(120) NULL DEFAULT NULL,
+  `fecha_actualizacion` DATETIME NULL DEFAULT NULL,
+  `fecha_adjudicacion` DATETIME NULL DEFAULT NULL,
+  `estado` VARCHAR(30) NULL DEFAULT NULL,
+  `codigo_tipo_contrato` VARCHAR(10) NULL DEFAULT NULL,
+  `codigo_subtipo_contrato` VARCHAR(10) NULL DEFAULT NULL,
+  `importe_estimado` NUMERIC(15,2) NULL DEFAULT NULL,
+  `importe_total` NUMERIC(15,2) NULL DEFAULT NULL,
+  `importe_sin_impuestos` NUMERIC(15,2) NULL DEFAULT NULL,
+  `codigo_cpv_principal` VARCHAR(20) NULL DEFAULT NULL,
+  `codigo_region_nuts` VARCHAR(10) NULL DEFAULT NULL,
+  `ofertas_recibidas` VARCHAR(10) NULL DEFAULT NULL,
+  `id_plataforma` VARCHAR(50) NULL DEFAULT NULL,
+  `contr_organo_id` INTEGER NULL,
+  `contr_empresa_id` INTEGER NULL,
+  PRIMARY KEY (`id_entry_num`),
+  CONSTRAINT `FK_contr_empresa`
+    FOREIGN KEY (`contr_empresa_id`)
+    REFERENCES `empresa` (`empresa_id`),
+  CONSTRAINT `FK_contr_organo`
+    FOREIGN KEY (`contr_organo_id`)
+    REFERENCES `organo` (`organo_id`),
+  CONSTRAINT `FK_contr_tipo_contrato`
+    FOREIGN KEY (`codigo_tipo_contrato`)
+    REFERENCES `tipo_contrato` (`codigo_tipo_contrato`));
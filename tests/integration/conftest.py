@@ -0,0 +1,21 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+
+# El backend se decide al importar src.db.engine: los tests de
+# integración usan siempre un SQLite temporal, nunca la base de datos
+# configurada
+os.environ["DATABASE_URL"] = "sqlite:///" + str(
+    Path(tempfile.mkdtemp()) / "contratos_test.db"
+)
+
+
+@pytest.fixture(scope="session")
+def esquema():
+    """Crea el esquema en la base de datos de prueba."""
+    from src.db.schema import ejecutar_schema
+
+    ejecutar_schema()
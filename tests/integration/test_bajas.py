@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from src.transform.cleaning import limpiar_contratos, separar_bajas
+
+
+URL = (
+    "https://contrataciondelestado.es/sindicacion/"
+    "licitacionesPerfilContratante/"
+)
+
+
+def _entrada(id_num, fecha, titulo=None, fecha_baja=None):
+    """Fila del parser: una publicación o, con `fecha_baja`, una baja."""
+    return {
+        "id_entry": f"{URL}{id_num}",
+        "titulo": titulo,
+        "id_licitacion": None,
+        "fecha_actualizacion": pd.Timestamp(fecha),
+        "fecha_adjudicacion": pd.Timestamp("2024-01-15"),
+        "estado": "ADJ",
+        "codigo_tipo_contrato": None,
+        "codigo_subtipo_contrato": None,
+        "importe_estimado": 100.0,
+        "importe_total": 121.0,
+        "importe_sin_impuestos": 100.0,
+        "codigo_cpv_principal": None,
+        "codigo_region_nuts": None,
+        "ofertas_recibidas": 1,
+        "id_plataforma": None,
+        "organo_id": None,
+        "empresa_id": None,
+        "fecha_baja": pd.Timestamp(fecha_baja) if fecha_baja else pd.NaT,
+    }
+
+
+def _cargar(filas):
+    from src.db.insert import insertar_bajas, insertar_contratos
+
+    contratos, bajas = separar_bajas(limpiar_contratos(pd.DataFrame(filas)))
+    if not contratos.empty:
+        insertar_contratos(contratos)
+    insertar_bajas(bajas)
+
+
+def _contrato(id_num):
+    from src.db.engine import get_engine
+
+    with get_engine().connect() as conn:
+        return conn.exec_driver_sql(
+            "SELECT titulo, fecha_baja IS NOT NULL FROM contrato "
+            "WHERE id_entry_num = ?",
+            (str(id_num),)
+        ).one()
+
+
+@pytest.mark.usefixtures("esquema")
+class TestBajas:
+    """Tests para la baja lógica de contratos retirados del feed."""
+
+    def test_baja_conserva_datos(self):
+        """Publicación y baja en la misma carga: el contrato queda dado
+        de baja con los datos de su última publicación."""
+        _cargar([
+            _entrada(101, "2024-01-01", titulo="v1"),
+            _entrada(101, "2024-02-01", titulo="v2"),
+            _entrada(101, "2024-03-01", fecha_baja="2024-03-01"),
+        ])
+
+        assert tuple(_contrato(101)) == ("v2", 1)
+
+    def test_baja_con_la_misma_version(self):
+        """Una baja con la misma versión que la publicación se aplica."""
+        _cargar([_entrada(102, "2024-01-01", titulo="v1")])
+        _cargar([_entrada(102, "2024-01-01", fecha_baja="2024-01-01")])
+
+        assert tuple(_contrato(102)) == ("v1", 1)
+
+    def test_publicacion_posterior_da_de_alta(self):
+        """Una publicación posterior a la baja la anula."""
+        _cargar([
+            _entrada(103, "2024-02-01", fecha_baja="2024-02-01"),
+            _entrada(103, "2024-01-01", titulo="v1"),
+            _entrada(103, "2024-03-01", titulo="v3"),
+        ])
+
+        assert tuple(_contrato(103)) == ("v3", 0)
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from benchmarks.feed_sintetico import generar_feeds
+from benchmarks.servidor_feed import RUTA, servir
+from src.descarga import cosechar
+
+
+ARCHIVOS = 6
+
+
+@pytest.fixture(scope="module")
+def origen(tmp_path_factory):
+    """Feed sintético de varias páginas encadenadas."""
+    destino = tmp_path_factory.mktemp("origen")
+    generar_feeds(destino, entries_por_archivo=10, archivos=ARCHIVOS)
+    return destino
+
+
+def _cosechar(servidor_feed, trabajo, **opciones):
+    return asyncio.run(cosechar(
+        url=servidor_feed.url_feed,
+        destino=trabajo / "destino",
+        espera_base=0.01,
+        estado_path=trabajo / "estado.json",
+        **opciones
+    ))
+
+
+def _coinciden(servidor_feed, trabajo):
+    """Cada página descargada es la que sirve el servidor, en la
+    carpeta de su año."""
+    descargadas = sorted((trabajo / "destino").glob("*/*.atom"))
+    for path in descargadas:
+        servida = servidor_feed.pagina(f"{RUTA}{path.name}")
+        (original,) = servidor_feed.directorio.glob(f"*/{path.name}")
+        assert path.parent.name == original.parent.name
+        assert path.read_bytes() == servida.contenido
+    return len(descargadas)
+
+
+class TestCosechar:
+    """Tests para la descarga del feed contra el servidor local."""
+
+    def test_descarga_y_repeticion(self, origen, tmp_path):
+        """Con fallos 503 se descargan todas las páginas; una segunda
+        ejecución sin cambios solo pide la página principal (304)."""
+        with servir(origen, fallos=0.2, semilla=3) as servidor_feed:
+            paginas = _cosechar(servidor_feed, tmp_path, concurrencia=4)
+            assert len(paginas) == ARCHIVOS
+            assert _coinciden(servidor_feed, tmp_path) == ARCHIVOS
+
+            servidor_feed.fallos = 0.0
+            repetidas = _cosechar(servidor_feed, tmp_path, concurrencia=4)
+
+        assert not any(p.estado == "descargada" for p in repetidas)
+        assert servidor_feed.no_modificadas >= 1
+
+    def test_reanuda_tras_max_paginas(self, origen, tmp_path):
+        """Una ejecución cortada por `max_paginas` se completa en la
+        siguiente."""
+        with servir(origen) as servidor_feed:
+            primera = _cosechar(
+                servidor_feed, tmp_path, concurrencia=2, max_paginas=2
+            )
+            assert _coinciden(servidor_feed, tmp_path) == len(primera) == 2
+
+            _cosechar(servidor_feed, tmp_path, concurrencia=2)
+            assert _coinciden(servidor_feed, tmp_path) == ARCHIVOS
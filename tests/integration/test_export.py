@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+
+from src.db.export_dataset import exportar_dataset
+
+
+def _insertar(id_num, fecha_adjudicacion):
+    from src.db.engine import get_engine
+
+    with get_engine().begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO contrato (id_entry_num, titulo, "
+            "fecha_adjudicacion, fecha_carga) VALUES (?, ?, ?, ?)",
+            (
+                str(id_num),
+                f"exportado {id_num}",
+                fecha_adjudicacion,
+                pd.Timestamp.now().isoformat(sep=" "),
+            )
+        )
+
+
+def _archivos(destino):
+    """{partición: inode de su archivo} de la versión publicada."""
+    return {
+        path.parent.relative_to(destino).as_posix(): path.stat().st_ino
+        for path in destino.glob("anio=*/mes=*/part-0.parquet")
+    }
+
+
+@pytest.mark.usefixtures("esquema")
+class TestExportacion:
+    """Tests para la exportación versionada del dataset analítico."""
+
+    def test_completa_publica_version(self, tmp_path):
+        """La exportación completa escribe las particiones en una
+        versión nueva y publica el directorio como enlace a ella."""
+        destino = tmp_path / "dataset.parquet"
+        _insertar(9001, "2031-01-10 00:00:00")
+        _insertar(9002, "2031-02-10 00:00:00")
+
+        filas = exportar_dataset(destino=destino)
+        primera = destino.resolve()
+        exportar_dataset(destino=destino)
+
+        assert destino.is_symlink()
+        assert destino.resolve().name.startswith("dataset.parquet.v")
+        assert destino.resolve() != primera
+        assert {"anio=2031/mes=1", "anio=2031/mes=2"} <= set(
+            _archivos(destino)
+        )
+        assert len(pd.read_parquet(destino)) == filas
+
+    def test_incremental_nueva_version(self, tmp_path):
+        """La exportación incremental publica otra versión con solo las
+        particiones cambiadas reescritas (el resto, enlaces duros a la
+        anterior) y deja intacta la versión anterior."""
+        destino = tmp_path / "dataset.parquet"
+        _insertar(9011, "2032-01-10 00:00:00")
+        _insertar(9012, "2032-02-10 00:00:00")
+
+        exportar_dataset(destino=destino)
+
+        primera = destino.resolve()
+        antes = _archivos(destino)
+        total = len(pd.read_parquet(destino))
+
+        _insertar(9013, "2032-02-20 00:00:00")
+        exportar_dataset(destino=destino, incremental=True)
+
+        segunda = destino.resolve()
+        despues = _archivos(destino)
+        assert segunda != primera
+        assert set(despues) == set(antes)
+        assert despues["anio=2032/mes=2"] != antes["anio=2032/mes=2"]
+        assert {
+            clave: inode for clave, inode in despues.items()
+            if clave != "anio=2032/mes=2"
+        } == {
+            clave: inode for clave, inode in antes.items()
+            if clave != "anio=2032/mes=2"
+        }
+
+        # La versión anterior sigue completa para quien la esté leyendo
+        assert len(pd.read_parquet(primera)) == total
+        assert len(pd.read_parquet(destino)) == total + 1
+
+    def test_incremental_sin_cambios(self, tmp_path):
+        """Sin particiones cambiadas no se publica otra versión."""
+        destino = tmp_path / "dataset.parquet"
+        exportar_dataset(destino=destino)
+        version = destino.resolve()
+
+        assert exportar_dataset(destino=destino, incremental=True) == 0
+        assert destino.resolve() == version
@@ -0,0 +1,100 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+
+TABLA = "fusion_prueba"
+
+
+@pytest.fixture
+def tabla_fusion(esquema):
+    """Tabla con clave primaria y columna de versión, vacía."""
+    from src.db.engine import get_engine
+
+    with get_engine().begin() as conn:
+        conn.exec_driver_sql(
+            f"CREATE TABLE `{TABLA}` (clave VARCHAR(10) PRIMARY KEY, "
+            "valor VARCHAR(10), version DATETIME)"
+        )
+    yield
+    with get_engine().begin() as conn:
+        conn.exec_driver_sql(f"DROP TABLE `{TABLA}`")
+
+
+def _versiones():
+    """Tres versiones de tres claves, una sin fecha."""
+    filas = []
+    for clave, dia in itertools.product("abc", [3, 1, 2]):
+        filas.append({
+            "clave": clave,
+            "valor": f"{clave}{dia}",
+            "version": pd.Timestamp(f"2024-01-0{dia}"),
+        })
+    filas.append({"clave": "d", "valor": "d0", "version": pd.NaT})
+    return pd.DataFrame(filas)
+
+
+def _filas():
+    from src.db.engine import get_engine
+
+    with get_engine().connect() as conn:
+        return conn.exec_driver_sql(
+            f"SELECT clave, valor FROM `{TABLA}` ORDER BY clave"
+        ).fetchall()
+
+
+def _fusionar_en_lotes(lotes, chunk_size=2):
+    from src.db.bulk import fusionar_dataframe
+    from src.db.engine import get_engine
+
+    with get_engine().begin() as conn:
+        conn.exec_driver_sql(f"DELETE FROM `{TABLA}`")
+
+    for lote in lotes:
+        fusionar_dataframe(
+            lote, TABLA, "clave", "version", chunk_size=chunk_size
+        )
+
+    return _filas()
+
+
+@pytest.mark.usefixtures("tabla_fusion")
+class TestFusionarDataframe:
+    """Tests para la fusión por versión desde la tabla de staging."""
+
+    def test_no_depende_del_orden(self):
+        """Cualquier orden de lotes y de filas da la versión más
+        reciente de cada clave."""
+        df = _versiones()
+        esperado = [("a", "a3"), ("b", "b3"), ("c", "c3"), ("d", "d0")]
+
+        por_fila = [df.iloc[[i]] for i in range(len(df))]
+        ordenes = [
+            [df],
+            [df.iloc[::-1]],
+            por_fila,
+            por_fila[::-1],
+            [df.sample(frac=1, random_state=7)],
+            [df.iloc[5:], df.iloc[:5]],
+        ]
+
+        for lotes in ordenes:
+            assert _fusionar_en_lotes(lotes) == esperado
+            assert _fusionar_en_lotes(lotes, chunk_size=1) == esperado
+
+    def test_version_igual(self):
+        """Una versión igual solo sobrescribe con `incluir_iguales`."""
+        from src.db.bulk import fusionar_dataframe
+
+        df = _versiones().iloc[[0]]
+        cambiado = df.assign(valor="otro")
+        _fusionar_en_lotes([df])
+
+        fusionar_dataframe(cambiado, TABLA, "clave", "version")
+        assert _filas() == [("a", "a3")]
+
+        fusionar_dataframe(
+            cambiado, TABLA, "clave", "version", incluir_iguales=True
+        )
+        assert _filas() == [("a", "otro")]
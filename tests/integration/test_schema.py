@@ -0,0 +1,117 @@
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.db import claves, engine
+
+
+DDL_BASELINE = (
+    Path(__file__).parent.parent / "fixtures" / "ddl_sqlite_baseline.sql"
+)
+
+
+@pytest.fixture
+def bd_baseline(tmp_path, monkeypatch):
+    """
+    Base de datos SQLite con el esquema original, empresas y órganos
+    duplicados y contratos que apuntan a los duplicados.
+    """
+    ruta = tmp_path / "baseline.db"
+    conn = sqlite3.connect(ruta)
+    conn.executescript(DDL_BASELINE.read_text(encoding="utf-8"))
+    conn.executemany(
+        "INSERT INTO empresa (empresa_id, nif_empresa, empresa_nombre) "
+        "VALUES (?, ?, ?)",
+        [(1, "A1", "Uno"), (2, "A1", "Uno"), (3, "B2", None)]
+    )
+    conn.executemany(
+        "INSERT INTO organo (organo_id, organo_dir3, organo_nombre, "
+        "organo_nif, tipo_organo_codigo) VALUES (?, ?, ?, ?, ?)",
+        [(1, "L01", "Ayto", "P1", None), (2, "L01", "Ayto", "P1", None)]
+    )
+    conn.executemany(
+        "INSERT INTO contrato (id_entry_num, contr_empresa_id, "
+        "contr_organo_id) VALUES (?, ?, ?)",
+        [("1", 2, 2), ("2", 1, 1), ("3", 3, None)]
+    )
+    conn.commit()
+    conn.close()
+
+    # La URL se lee al crear el engine: se apunta a la base de datos
+    # de partida solo durante el test
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{ruta}")
+    monkeypatch.setattr(claves, "INTERIM_DATA_DIR", tmp_path)
+    engine._url.cache_clear()
+    engine.get_engine.cache_clear()
+
+    yield ruta
+
+    engine.get_engine().dispose()
+    engine._url.cache_clear()
+    engine.get_engine.cache_clear()
+
+
+class TestMigracionClavesNaturales:
+    """Tests para la migración de una base de datos con el esquema
+    original."""
+
+    def test_fusiona_duplicados_y_crea_clave(self, bd_baseline):
+        """Los duplicados se fusionan en el id menor y la clave queda
+        NOT NULL y UNIQUE."""
+        from src.db.schema import ejecutar_schema
+
+        ejecutar_schema()
+        ejecutar_schema()
+
+        conn = sqlite3.connect(bd_baseline)
+        empresas = pd.read_sql(
+            "SELECT empresa_id, nif_empresa, empresa_nombre, empresa_clave "
+            "FROM empresa ORDER BY empresa_id", conn
+        )
+        contratos = conn.execute(
+            "SELECT id_entry_num, contr_empresa_id, contr_organo_id "
+            "FROM contrato ORDER BY id_entry_num"
+        ).fetchall()
+        organos = conn.execute("SELECT organo_id FROM organo").fetchall()
+        no_nulas = {
+            fila[1]: fila[3]
+            for fila in conn.execute("PRAGMA table_info(empresa)")
+        }
+        indices = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = 'organo'"
+        ).fetchall()
+
+        assert empresas["empresa_id"].tolist() == [1, 3]
+        assert empresas["empresa_clave"].tolist() == claves.clave_natural(
+            empresas, claves.COLUMNAS_CLAVE["empresa"]
+        ).tolist()
+        assert contratos == [("1", 1, 1), ("2", 1, 1), ("3", 3, None)]
+        assert organos == [(1,)]
+        assert no_nulas["empresa_clave"] == 1
+        assert ("FK_org_tipoorg_idx",) in indices
+
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute(
+                "INSERT INTO empresa (empresa_clave) VALUES (?)",
+                (empresas["empresa_clave"][0],)
+            )
+        conn.close()
+
+    def test_upsert_tras_migrar(self, bd_baseline):
+        """Tras migrar, la carga reutiliza los ids existentes."""
+        from src.db.insert import insertar_empresas
+        from src.db.schema import ejecutar_schema
+
+        ejecutar_schema()
+        df = insertar_empresas(pd.DataFrame({
+            "nif_empresa": ["A1", "C3"],
+            "empresa_ganadora": ["Uno", "Tres"],
+            "pais_empresa": ["ES", "PT"],
+            "es_pyme_empresa": pd.array([True, None], dtype="boolean"),
+        }))
+        claves.guardar_claves()
+
+        assert df["empresa_id"].tolist() == [1, 4]
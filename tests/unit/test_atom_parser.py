@@ -0,0 +1,113 @@
+import importlib.util
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.atom_parser import iter_atom_batches, parse_atom_file
+from src.config import RAW_DATA_DIR, ZONA_HORARIA
+from src.fuentes import FuenteAtom
+from src.metricas import extraer_parseo
+
+
+FIXTURES = Path(__file__).parent.parent / "fixtures"
+MUESTRA = RAW_DATA_DIR / "2020" / "contratosMenoresPerfilesContratantes.atom"
+
+
+def _parser_original():
+    spec = importlib.util.spec_from_file_location(
+        "atom_parser_original", FIXTURES / "atom_parser_original.py"
+    )
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _valores(serie: pd.Series) -> list:
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+@pytest.fixture(scope="module")
+def original():
+    return _parser_original().parse_atom_file(MUESTRA)
+
+
+@pytest.fixture(scope="module")
+def actual():
+    return parse_atom_file(MUESTRA)
+
+
+class TestEquivalencia:
+    """Tests del parser por lotes frente al `parse_entry` original."""
+
+    def test_mismos_valores(self, original, actual):
+        """Salvo las columnas tipadas a propósito, los valores de las
+        202 filas de la muestra son los mismos."""
+        tipadas = {
+            "fecha_actualizacion",
+            "ofertas_recibidas",
+            "es_pyme_empresa",
+        }
+
+        assert len(actual) == len(original) == 202
+        for columna in original.columns.difference(list(tipadas)):
+            assert _valores(actual[columna]) == _valores(
+                original[columna]
+            ), columna
+
+    def test_columnas_tipadas(self, original, actual):
+        """Fechas en hora local sin zona, enteros y booleanos."""
+        fechas = original["fecha_actualizacion"].dt.tz_convert(
+            ZONA_HORARIA
+        ).dt.tz_localize(None)
+        ofertas = pd.to_numeric(original["ofertas_recibidas"])
+        pyme = original["es_pyme_empresa"].map(
+            {"true": True, "false": False}
+        )
+
+        assert actual["fecha_actualizacion"].tolist() == fechas.tolist()
+        assert _valores(actual["ofertas_recibidas"]) == _valores(ofertas)
+        assert _valores(actual["es_pyme_empresa"]) == _valores(pyme)
+
+    def test_columnas_nuevas(self, original, actual):
+        """Las columnas que el original no crea nunca quedan vacías
+        en la muestra (no hay bajas ni errores)."""
+        nuevas = actual.columns.difference(original.columns)
+
+        assert set(nuevas) == {
+            "duracion_contrato_valor",
+            "duracion_contrato_unidad",
+            "fecha_baja",
+            "parse_error",
+        }
+        assert actual[nuevas].isna().all().all()
+
+    def test_lotes(self, actual):
+        """Por lotes se obtienen las mismas filas en el mismo orden."""
+        lotes = list(iter_atom_batches(MUESTRA, batch_size=50))
+
+        assert [len(lote) for lote in lotes] == [50, 50, 50, 50, 2]
+        pd.testing.assert_frame_equal(
+            pd.concat(lotes, ignore_index=True), actual
+        )
+
+
+class TestXmlMalFormado:
+    """Tests de la recuperación tras un entry con XML inválido."""
+
+    def test_solo_se_descarta_el_entry_roto(self, actual, tmp_path):
+        """Un "&" sin escapar en un entry descarta solo ese entry."""
+        datos = MUESTRA.read_bytes()
+        inicio = [m.start() for m in re.finditer(rb"<entry>", datos)][10]
+        titulo = datos.index(b"<title>", inicio) + len(b"<title>")
+        roto = tmp_path / "roto.atom"
+        roto.write_bytes(datos[:titulo] + b"a & b " + datos[titulo:])
+
+        df = parse_atom_file(roto)
+        contadores = extraer_parseo(FuenteAtom(roto).id)
+
+        esperado = actual.drop(index=10).reset_index(drop=True)
+        assert contadores["descartados"] == 1
+        assert contadores["entries"] == 201
+        pd.testing.assert_frame_equal(df, esperado)
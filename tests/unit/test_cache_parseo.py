@@ -0,0 +1,115 @@
+import pytest
+
+from src import cache_parseo
+from src.config import RAW_DATA_DIR
+from src.fuentes import FuenteAtom
+
+
+MUESTRA = FuenteAtom(
+    RAW_DATA_DIR / "2020" / "contratosMenoresPerfilesContratantes.atom"
+)
+
+
+@pytest.fixture
+def hashes_contados(monkeypatch):
+    """Cuenta las llamadas a `hash_archivo` de la caché del parseo."""
+    llamadas = []
+    hash_archivo = cache_parseo.hash_archivo
+
+    def contar(fuente):
+        llamadas.append(fuente)
+        return hash_archivo(fuente)
+
+    monkeypatch.setattr(cache_parseo, "hash_archivo", contar)
+    return llamadas
+
+
+class TestHashesFeeds:
+    """Tests para el índice de hashes por tamaño y mtime."""
+
+    def test_solo_lee_archivos_cambiados(self, tmp_path, hashes_contados):
+        """Un feed con el mismo tamaño y mtime no se vuelve a leer."""
+        feeds = tmp_path / "feeds"
+        feeds.mkdir()
+        a = FuenteAtom(feeds / "a.atom")
+        b = FuenteAtom(feeds / "b.atom")
+        a.path.write_bytes(b"<feed>a</feed>")
+        b.path.write_bytes(b"<feed>b</feed>")
+
+        primera = cache_parseo.hashes_feeds([a, b], base=tmp_path)
+        segunda = cache_parseo.hashes_feeds([a, b], base=tmp_path)
+        assert segunda == primera
+        assert len(hashes_contados) == 2
+
+        b.path.write_bytes(b"<feed>b modificado</feed>")
+        tercera = cache_parseo.hashes_feeds([a, b], base=tmp_path)
+
+        assert hashes_contados[2:] == [b]
+        assert tercera[a] == primera[a]
+        assert tercera[b] != primera[b]
+
+    def test_reutiliza_hashes_conocidos(self, tmp_path, hashes_contados):
+        """Los hashes ya calculados por el manifiesto no se recalculan."""
+        a = FuenteAtom(tmp_path / "a.atom")
+        a.path.write_bytes(b"<feed/>")
+
+        hashes = cache_parseo.hashes_feeds(
+            [a], {a: "conocido"}, base=tmp_path
+        )
+
+        assert hashes == {a: "conocido"}
+        assert hashes_contados == []
+
+
+@pytest.fixture
+def parseos(monkeypatch):
+    """Cuenta los parseos del XML y limpia la huella del parser."""
+    llamadas = []
+    parse_atom_file = cache_parseo.parse_atom_file
+
+    def contar(fuente):
+        llamadas.append(fuente)
+        return parse_atom_file(fuente)
+
+    monkeypatch.setattr(cache_parseo, "parse_atom_file", contar)
+    cache_parseo.huella_parser.cache_clear()
+    yield llamadas
+    cache_parseo.huella_parser.cache_clear()
+
+
+def _otro_formato(monkeypatch):
+    monkeypatch.setattr(
+        cache_parseo, "FORMATO_PARSER", cache_parseo.FORMATO_PARSER + 1
+    )
+
+
+def _otra_ruta(monkeypatch):
+    campos = list(cache_parseo.CAMPOS_ENTRY)
+    campos[1] = campos[1]._replace(ruta="atom:subtitle")
+    monkeypatch.setattr(cache_parseo, "CAMPOS_ENTRY", campos)
+
+
+class TestHuellaParser:
+    """Tests para la invalidación de la caché al cambiar el parser."""
+
+    @pytest.mark.parametrize("cambiar", [_otro_formato, _otra_ruta])
+    def test_cambio_invalida_la_cache(
+        self, cambiar, tmp_path, monkeypatch, parseos
+    ):
+        """Con otra especificación del parser el feed se vuelve a
+        parsear y la caché anterior se borra al desalojar."""
+        primero = cache_parseo.parse_atom_file_cache(MUESTRA, base=tmp_path)
+        cache_parseo.parse_atom_file_cache(MUESTRA, base=tmp_path)
+        assert len(parseos) == 1
+        anterior = cache_parseo.ruta_cache("x", tmp_path).parent
+
+        cambiar(monkeypatch)
+        cache_parseo.huella_parser.cache_clear()
+        segundo = cache_parseo.parse_atom_file_cache(MUESTRA, base=tmp_path)
+
+        assert len(parseos) == 2
+        assert cache_parseo.ruta_cache("x", tmp_path).parent != anterior
+        assert len(segundo) == len(primero)
+
+        assert cache_parseo.desalojar(base=tmp_path) > 0
+        assert not anterior.exists()
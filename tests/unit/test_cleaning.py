@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from src.transform.cleaning import (
+    extraer_id_entry_num,
+    limpiar_contratos,
+    limpiar_contratos_por_lotes,
+    separar_bajas,
+)
+
+
+URL = (
+    "https://contrataciondelestado.es/sindicacion/"
+    "licitacionesPerfilContratante/"
+)
+
+
+class TestExtraerIdEntryNum:
+    """Tests para el número final de `id_entry`."""
+
+    def test_solo_digitos_decimales(self):
+        """Un superíndice al final no se toma como número."""
+        ids = pd.Series([URL + "123", URL + "12\u00b3", "sin-numero"])
+
+        assert extraer_id_entry_num(ids).fillna("").tolist() == [
+            "123", "", ""
+        ]
+
+
+class TestLimpiarContratos:
+    """Tests para la deduplicación de publicaciones y bajas."""
+
+    @pytest.fixture
+    def df_feed(self):
+        """Dos publicaciones y una baja del mismo contrato, y otro
+        contrato sin baja."""
+        return pd.DataFrame({
+            "id_entry": [URL + "1", URL + "1", URL + "2", URL + "1"],
+            "titulo": ["v1", "v2", "otro", None],
+            "fecha_actualizacion": pd.to_datetime([
+                "2024-01-01", "2024-02-01", "2024-01-01", "2024-03-01",
+            ]),
+            "fecha_baja": pd.to_datetime([
+                None, None, None, "2024-03-01",
+            ]),
+        })
+
+    def test_conserva_publicacion_y_baja(self, df_feed):
+        """La baja no elimina la última publicación del contrato."""
+        contratos, bajas = separar_bajas(limpiar_contratos(df_feed))
+
+        assert sorted(contratos["titulo"]) == ["otro", "v2"]
+        assert bajas["id_entry_num"].tolist() == ["1"]
+
+    def test_por_lotes_igual_que_en_memoria(self, df_feed):
+        """El resultado por lotes coincide con el de todo el DataFrame."""
+        def lotes():
+            return (df_feed.iloc[i:i + 2] for i in (0, 2))
+
+        por_lotes = pd.concat(limpiar_contratos_por_lotes(lotes))
+
+        pd.testing.assert_frame_equal(
+            por_lotes, limpiar_contratos(df_feed.copy())
+        )
@@ -0,0 +1,105 @@
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.feed_sintetico import generar_feeds
+from src.feed_index import (
+    PaginaFeed,
+    indexar_feeds,
+    ordenar_paginas,
+    paginas_desde_checkpoint,
+)
+from src.fuentes import FuenteAtom
+
+
+def _pagina(archivo, nombre, siguiente, hora):
+    return PaginaFeed(
+        FuenteAtom(Path(archivo)),
+        nombre,
+        siguiente,
+        datetime(2024, 1, 1, hora) if hora is not None else None
+    )
+
+
+def _archivos(paginas):
+    return [pagina.fuente.path.name for pagina in paginas]
+
+
+class TestOrdenarPaginas:
+    """Tests para el orden de las páginas por la cadena rel="next"."""
+
+    def test_sigue_la_cadena_y_no_la_fecha(self):
+        """Una página con <updated> desordenado se coloca según su
+        enlace rel="next"."""
+        paginas = [
+            _pagina("c.atom", "c", None, 1),
+            _pagina("principal.atom", "principal", "b", 3),
+            _pagina("b.atom", "b", "c", 5),
+        ]
+
+        assert _archivos(ordenar_paginas(paginas)) == [
+            "c.atom", "b.atom", "principal.atom"
+        ]
+
+    def test_descargas_de_la_pagina_principal(self):
+        """Dos descargas de la página principal forman dos cadenas que
+        se intercalan por fecha sin repetir páginas."""
+        paginas = [
+            _pagina("2024/principal.atom", "principal", "p1", 4),
+            _pagina("2023/principal.atom", "principal", "p0", 2),
+            _pagina("p1.atom", "p1", "p0", 3),
+            _pagina("p0.atom", "p0", None, 1),
+        ]
+
+        ordenadas = ordenar_paginas(paginas)
+
+        assert [p.fuente.id for p in ordenadas] == [
+            "p0.atom",
+            "2023/principal.atom",
+            "p1.atom",
+            "2024/principal.atom",
+        ]
+
+    def test_enlace_roto_y_ciclo(self, capsys):
+        """Un enlace a una página que no está en disco corta la cadena;
+        las páginas en un ciclo se añaden por fecha."""
+        paginas = [
+            _pagina("principal.atom", "principal", "falta", 9),
+            _pagina("x.atom", "x", "y", 2),
+            _pagina("y.atom", "y", "x", 1),
+        ]
+
+        assert _archivos(ordenar_paginas(paginas)) == [
+            "y.atom", "x.atom", "principal.atom"
+        ]
+        assert "falta" in capsys.readouterr().out
+
+    def test_feed_generado(self, tmp_path):
+        """Las páginas de un feed en disco quedan de la más antigua a
+        la más reciente, con la página principal al final."""
+        generar_feeds(tmp_path, entries_por_archivo=2, archivos=4)
+
+        ordenadas = _archivos(ordenar_paginas(indexar_feeds(tmp_path)))
+
+        assert ordenadas[-1] == "contratosMenoresPerfilesContratantes.atom"
+        assert ordenadas[:-1] == sorted(ordenadas[:-1])
+        assert len(ordenadas) == 4
+
+
+class TestPaginasDesdeCheckpoint:
+    """Tests para el corte del recorrido en el último checkpoint."""
+
+    def test_corta_en_la_ultima_pagina_ingerida(self):
+        """Se detiene en la primera página ya ingerida que no supera el
+        checkpoint; sin checkpoint se recorren todas."""
+        paginas = [
+            _pagina(f"p{hora}.atom", f"p{hora}", None, hora)
+            for hora in range(1, 5)
+        ]
+        conocidas = {pagina.fuente for pagina in paginas[:2]}
+
+        nuevas = paginas_desde_checkpoint(
+            paginas, datetime(2024, 1, 1, 2), conocidas
+        )
+
+        assert _archivos(nuevas) == ["p3.atom", "p4.atom"]
+        assert paginas_desde_checkpoint(paginas, None, conocidas) == paginas
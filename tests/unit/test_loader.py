@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from benchmarks.feed_sintetico import generar_feeds
+from src import cache_parseo
+from src.loader import iter_atom_folders, load_all_atom_folders
+from src.transform.tipos import categorizar
+
+
+@pytest.fixture(scope="module")
+def feeds(tmp_path_factory):
+    """Cinco páginas encadenadas con republicaciones y bajas."""
+    destino = tmp_path_factory.mktemp("feeds")
+    generar_feeds(
+        destino,
+        entries_por_archivo=40,
+        archivos=5,
+        republicacion=0.2,
+        bajas=0.05,
+        semilla=1
+    )
+    return destino
+
+
+@pytest.fixture
+def cache_temporal(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_parseo, "PARSE_CACHE_DIR", tmp_path)
+
+
+class TestCargaParalela:
+    """Tests para el parseo de los feeds en un pool de procesos."""
+
+    def test_mismas_filas_en_el_mismo_orden(self, feeds):
+        """Con varios procesos el resultado es idéntico al secuencial."""
+        secuencial = load_all_atom_folders(feeds, workers=1, cache=False)
+        paralelo = load_all_atom_folders(feeds, workers=3, cache=False)
+
+        assert len(secuencial) > 200
+        pd.testing.assert_frame_equal(paralelo, secuencial)
+
+    def test_cache_y_streaming(self, feeds, cache_temporal):
+        """La caché del parseo y el modo en streaming no cambian el
+        resultado ni su orden."""
+        referencia = load_all_atom_folders(feeds, workers=1, cache=False)
+
+        llenar = load_all_atom_folders(feeds, workers=3)
+        desde_cache = load_all_atom_folders(feeds, workers=3)
+        por_archivo = [
+            df for _, df in iter_atom_folders(feeds, workers=2)
+            if not df.empty
+        ]
+        flujo = categorizar(pd.concat(por_archivo, ignore_index=True))
+
+        pd.testing.assert_frame_equal(llenar, referencia)
+        pd.testing.assert_frame_equal(desde_cache, referencia)
+        pd.testing.assert_frame_equal(flujo, referencia)
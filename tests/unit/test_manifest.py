@@ -0,0 +1,97 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from src import manifest
+from src.fuentes import FuenteAtom
+
+
+@pytest.fixture
+def hashes_contados(monkeypatch):
+    """Cuenta las llamadas a `hash_archivo` del manifiesto."""
+    llamadas = []
+    hash_archivo = manifest.hash_archivo
+
+    def contar(fuente):
+        llamadas.append(fuente)
+        return hash_archivo(fuente)
+
+    monkeypatch.setattr(manifest, "hash_archivo", contar)
+    return llamadas
+
+
+@pytest.fixture
+def feeds(tmp_path):
+    """Dos feeds registrados en un manifiesto."""
+    fuentes = []
+    for nombre in ("a", "b"):
+        path = tmp_path / "2024" / f"{nombre}.atom"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(f"<feed>{nombre}</feed>".encode("utf-8"))
+        fuentes.append(FuenteAtom(path))
+
+    registro = {}
+    for fuente in fuentes:
+        manifest.registrar_archivo(
+            registro, fuente, tmp_path, datetime(2024, 1, 1)
+        )
+    return fuentes, registro
+
+
+class TestArchivosPendientes:
+    """Tests para la detección de feeds nuevos o modificados."""
+
+    def test_sin_cambios_no_se_leen(self, feeds, tmp_path, hashes_contados):
+        """Con el mismo tamaño y mtime no se calcula ningún hash."""
+        fuentes, registro = feeds
+
+        assert manifest.archivos_pendientes(
+            fuentes, registro, tmp_path
+        ) == {}
+        assert hashes_contados == []
+
+    def test_tocado_se_actualiza(self, feeds, tmp_path, hashes_contados):
+        """Un feed con otro mtime y el mismo contenido se rehashea, no
+        se vuelve a procesar y queda al día en el manifiesto."""
+        fuentes, registro = feeds
+        a = fuentes[0]
+        os.utime(a.path, (1_000_000, 1_000_000))
+
+        assert manifest.archivos_pendientes(
+            fuentes, registro, tmp_path
+        ) == {}
+        assert hashes_contados == [a]
+        assert registro[a.clave(tmp_path)]["mtime"] == 1_000_000
+
+        manifest.archivos_pendientes(fuentes, registro, tmp_path)
+        assert hashes_contados == [a]
+
+    def test_modificados_y_nuevos(self, feeds, tmp_path, hashes_contados):
+        """Los feeds con otro contenido y los no registrados quedan
+        pendientes con su hash."""
+        fuentes, registro = feeds
+        fuentes[1].path.write_bytes(b"<feed>b modificado</feed>")
+        nuevo = FuenteAtom(tmp_path / "2024" / "c.atom")
+        nuevo.path.write_bytes(b"<feed>c</feed>")
+
+        pendientes = manifest.archivos_pendientes(
+            fuentes + [nuevo], registro, tmp_path
+        )
+
+        assert pendientes == {
+            fuentes[1]: manifest.hash_archivo(fuentes[1]),
+            nuevo: manifest.hash_archivo(nuevo),
+        }
+
+    def test_guardar_y_cargar(self, feeds, tmp_path):
+        """El manifiesto guardado se recupera igual y el checkpoint es
+        el máximo atom:updated registrado."""
+        _, registro = feeds
+        path = tmp_path / "manifest.json"
+
+        manifest.guardar_manifest(registro, path)
+
+        assert manifest.cargar_manifest(path) == registro
+        assert manifest.checkpoint(registro) == datetime(2024, 1, 1)
+        assert manifest.cargar_manifest(tmp_path / "no_existe.json") == {}
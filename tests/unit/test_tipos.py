@@ -0,0 +1,36 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.transform.tipos import a_booleanos
+
+
+class TestABooleanos:
+    """Tests para la conversión de indicadores booleanos."""
+
+    @pytest.mark.parametrize("serie", [
+        pd.Series(["true", "false", None]),
+        pd.Series(["1", "0", None]),
+        pd.Series([1.0, 0.0, None]),
+        pd.Series([1, 0, None], dtype="Int8"),
+        pd.Series([True, False, None], dtype="boolean"),
+    ])
+    def test_convierte_indicadores(self, serie):
+        """Texto, enteros y floats con nulos dan el mismo resultado."""
+        assert a_booleanos(serie).tolist() == [True, False, pd.NA]
+
+    def test_chunk_sql_con_nulos(self):
+        """Un TINYINT(1) con NULL leído con read_sql no pierde valores."""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE empresa (empresa_es_pyme TINYINT(1))")
+        conn.executemany(
+            "INSERT INTO empresa VALUES (?)", [(1,), (0,), (None,)]
+        )
+
+        chunk = pd.read_sql("SELECT empresa_es_pyme FROM empresa", conn)
+
+        assert chunk["empresa_es_pyme"].dtype == "float64"
+        assert a_booleanos(chunk["empresa_es_pyme"]).tolist() == [
+            True, False, pd.NA
+        ]